@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Assumptions Tab Layout
+The rows of the v2 "Assumptions" tab, generated from the engine dicts, and
+the reader that maps an edited tab back to an assumption dict. Both sides
+use the same label tables, so a workbook written by create_conservative_v2.py
+always reads back to the assumptions it was built from.
+
+Rows are matched by (Category, Parameter) label, not by position, so added
+blank rows, reordered sections or an extra market block still read back.
+Only "YES" rows and the Ramp rows are read; AUTO rows (LTV) are recalculated
+by the engine. A market's ramp_curves are listed as "NO" rows for reference;
+they live in the assumption JSON and do not read back from the tab.
+
+The reader opens the workbook in openpyxl read-only mode and streams the
+Assumptions sheet alone (cached values, not formulas). read_assumptions_csv()
+reads the same tab saved as CSV, or the older four-column assumptions.csv
+layout (its labels are mapped onto the tab's).
+"""
+
+import csv
+
+from projection_engine import resolve_assumptions
+from ramp_curves import curve_label
+
+SHEET_TITLE = "Assumptions"
+HEADER = ["Category", "Parameter", "Value", "Notes", "Adjustable?"]
+RAMP_HEADER = ["RAMP SCHEDULES (Conservative)", "Quarter", "Ads %", "GBP %", "Website %"]
+RAMP_CATEGORY = "Ramp"
+RAMP_COLUMNS = ('ads', 'gbp', 'web')
+RAMP_LABELS = {'ads': "Ads", 'gbp': "GBP", 'web': "Website"}
+
+MGMT_FEE_LABEL = "Monthly Mgmt Fee (Both Locations)"
+LTV_LABEL = "LTV Per Job (Calculated)"
+
+# (field, parameter label, note); a str.format note gets the field's value
+GENERAL_ROWS = [
+    ('qualified_rate', "Qualified Lead % (of all calls)", "Industry avg: 40-60%"),
+    ('closing_rate', "Closing Rate (Qualified → Job)", "Conservative: {:.0%}"),
+]
+
+# Written for every market that has the field, in this order
+MARKET_ROWS = [
+    ('max_web', "Max Monthly Website Leads", "At full 18-month maturity"),
+    ('max_ppc', "Max Monthly PPC Leads", "At full ad spend"),
+    ('max_gbp', "Max Monthly GBP Leads", "At full GBP maturity"),
+    ('cpl', "Cost Per Qualified Lead (PPC)", "Water damage CPL"),
+    ('mit_avg', "Mitigation Average", "Per job, from client data"),
+    ('abate_avg', "Abatement Average", "Per job, from client data"),
+    ('abate_conv', "Abatement Conversion %", "{:.0%} of mit → abate"),
+    ('recon_avg', "Reconstruction Average", "Per job, from client data"),
+    ('recon_conv', "Reconstruction Conversion %", "{:.0%} of mit → recon"),
+    ('recon_fee', "Recon Referral Fee", "Refer out, no direct rev"),
+]
+
+GENERAL_FIELDS = {label: field for field, label, _ in GENERAL_ROWS}
+MARKET_FIELDS = {label: field for field, label, _ in MARKET_ROWS}
+
+RAMP_JUSTIFICATION = [
+    ["RAMP JUSTIFICATION", "", "", "", ""],
+    ["Ads (Fastest)", "Q1: 30% testing", "Q2: 60% optimizing", "Q5-Q6: 100% mature", "90-day sprint, then scale"],
+    ["GBP (Medium)", "Q1: 10% just live", "Q3: 45% building reviews", "Q6: 100% mature", "4-6 month typical build"],
+    ["Website (Slowest)", "Q1-Q2: 0% no traffic", "Q3: 5% first rankings", "Q6: 60% still growing", "12-18 months to full maturity"],
+]
+
+BLANK = ["", "", "", "", ""]
+
+# Older assumptions.csv (Category, Parameter, Value, Notes) -> tab labels
+LEGACY_LABELS = {
+    "Monthly Management Fee (Both Locations)": MGMT_FEE_LABEL,
+    "Qualified Lead % of Calls": "Qualified Lead % (of all calls)",
+    "Closing Rate (Qualified to Job)": "Closing Rate (Qualified → Job)",
+    "CPL (Cost Per Lead)": "Cost Per Qualified Lead (PPC)",
+    "Recon Referral Fee Per Job": "Recon Referral Fee",
+}
+LEGACY_IGNORED = {"Base Monthly Ad Spend Per Location", "LTV Per Job"}  # no v2 input / derived
+LEGACY_RAMPS = {"Ramp - Ads": 'ads', "Ramp - GBP": 'gbp', "Ramp - Website": 'web'}
+
+
+# ============================================================
+# WRITE
+# ============================================================
+def _note(template, value):
+    return template.format(value) if '{' in template else template
+
+
+def _ltv_note(market):
+    parts = ["Mit"]
+    if 'abate_conv' in market:
+        parts.append("(Abate% × Abate)")
+    if 'recon_conv' in market:
+        parts.append("(Recon% × Recon)")
+    if 'recon_fee' in market:
+        parts.append("Referral Fee")
+    return " + ".join(parts)
+
+
+def assumption_rows(general, ramps, markets):
+    """Every row of the Assumptions tab below the header, as plain lists"""
+    n = len(markets)
+    fee = general['mgmt_fee_monthly']
+    split = "/".join([f"{100 / n:g}"] * n)
+    per_location = f"{fee:,.0f}" if fee == round(fee) else f"{fee:,.2f}"
+
+    # Unrounded so the tab reads back to the same fee; money_fmt handles display
+    rows = [["GENERAL INPUTS", "", "", "", ""],
+            ["General", MGMT_FEE_LABEL, fee * n,
+             f"Split {split} = ${per_location}/location", "YES"]]
+    for field, label, note in GENERAL_ROWS:
+        rows.append(["General", label, general[field], _note(note, general[field]), "YES"])
+    rows.append(BLANK)
+
+    for m in markets:
+        name = m['name']
+        rows.append([f"{name.upper()} MARKET DATA", "", "", "", ""])
+        for field, label, note in MARKET_ROWS:
+            if field in m:
+                rows.append([name, label, m[field], _note(note, m[field]), "YES"])
+        rows.append([name, LTV_LABEL, round(m['ltv']), _ltv_note(m), "AUTO"])
+        for ch, spec in (m.get('ramp_curves') or {}).items():
+            rows.append([name, f"{RAMP_LABELS[ch]} Ramp Curve", curve_label(spec),
+                         "Set in the assumption JSON (ramp_curves)", "NO"])
+        rows.append(BLANK)
+
+    rows.append(RAMP_HEADER)
+    for q_label, ramp in ramps.items():
+        rows.append([RAMP_CATEGORY, q_label] + [ramp[ch] for ch in RAMP_COLUMNS])
+    rows.append(BLANK)
+    rows.extend(RAMP_JUSTIFICATION)
+    return rows
+
+
+# ============================================================
+# READ
+# ============================================================
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        text = value.strip().replace('$', '').replace(',', '')
+        try:
+            return float(text[:-1]) / 100 if text.endswith('%') else float(text)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_assumption_rows(rows):
+    """
+    (assumptions, warnings) from Assumptions-tab rows below the header (tuples
+    of cell values). assumptions is a resolve_assumptions() dict.
+    """
+    general, ramps, markets, warnings = {}, {}, {}, []
+    fee_total = None
+
+    for row_num, row in enumerate(rows, start=2):
+        cells = list(row[:5]) + [None] * (5 - len(row[:5]))
+        category = str(cells[0]).strip() if cells[0] is not None else ""
+        param = str(cells[1]).strip() if cells[1] is not None else ""
+        if not category or not param:
+            continue
+
+        if category == RAMP_CATEGORY:
+            values = [_number(v) for v in cells[2:5]]
+            if None in values:
+                warnings.append(f"row {row_num}: ramp {param} has a non-numeric value")
+                continue
+            ramps[param] = dict(zip(RAMP_COLUMNS, values))
+            continue
+        if cells[4] != "YES":
+            continue  # section headers, AUTO rows, notes
+
+        value = _number(cells[2])
+        if value is None:
+            warnings.append(f"row {row_num}: {category} / {param} is not a number ({cells[2]!r})")
+            continue
+        if category == "General":
+            if param == MGMT_FEE_LABEL:
+                fee_total = value
+            elif param in GENERAL_FIELDS:
+                general[GENERAL_FIELDS[param]] = value
+            else:
+                warnings.append(f"row {row_num}: unknown general parameter {param!r}")
+        elif param in MARKET_FIELDS:
+            markets.setdefault(category, {'name': category})[MARKET_FIELDS[param]] = value
+        elif param != LTV_LABEL:
+            warnings.append(f"row {row_num}: unknown parameter {category} / {param!r}")
+
+    if fee_total is not None:
+        general['mgmt_fee_monthly'] = fee_total / max(len(markets), 1)
+
+    assumptions = {'general': general, 'markets': list(markets.values())}
+    if ramps:
+        assumptions['ramps'] = ramps
+    return assumptions, warnings
+
+
+def _legacy_rows(rows):
+    """Older assumptions.csv rows as Assumptions-tab rows"""
+    ramps = {}
+    for row in rows:
+        cells = list(row[:3]) + [None] * (3 - len(row[:3]))
+        category, param, value = (str(c).strip() if c is not None else "" for c in cells)
+        if category in LEGACY_RAMPS:
+            ramps.setdefault(param, {})[LEGACY_RAMPS[category]] = value
+        elif category and param and param not in LEGACY_IGNORED:
+            yield [category, LEGACY_LABELS.get(param, param), value, "", "YES"]
+    for q_label, values in ramps.items():
+        yield [RAMP_CATEGORY, q_label] + [values.get(ch) for ch in RAMP_COLUMNS]
+
+
+def read_assumptions_csv(path):
+    """(assumptions, warnings) from an Assumptions tab saved as CSV, or the older layout"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        raise ValueError(f"{path}: empty file")
+    body = rows[1:] if "Adjustable?" in rows[0] else list(_legacy_rows(rows[1:]))
+    assumptions, warnings = parse_assumption_rows(body)
+    try:
+        resolve_assumptions(assumptions)
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from exc
+    return assumptions, warnings
+
+
+def read_assumptions(path):
+    """(assumptions, warnings) from a workbook's Assumptions tab, read-only"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if SHEET_TITLE not in wb.sheetnames:
+            raise ValueError(f"{path}: no {SHEET_TITLE!r} tab")
+        ws = wb[SHEET_TITLE]
+        assumptions, warnings = parse_assumption_rows(
+            ws.iter_rows(min_row=2, max_col=5, values_only=True))
+    finally:
+        wb.close()
+    # Validate now so a bad workbook fails with its own name attached
+    try:
+        resolve_assumptions(assumptions)
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from exc
+    return assumptions, warnings
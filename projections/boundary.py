@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Adaptive Goal-Boundary Mapping
+Maps where a metric crosses a threshold (by default combined Q6 monthly
+revenue ≥ $300k) over two or three levers, without a uniform grid.
+
+The lever box starts as a coarse grid of cells. Each pass evaluates every
+new cell corner in one vector_engine batch, keeps cells whose corners all
+pass or all fail as finished, and splits only the cells where the threshold
+flips into 4 (2 levers) or 8 (3 levers) children. After `depth` passes the
+boundary is resolved to initial × 2^depth cells per axis for a small share
+of the full grid's evaluations.
+
+A boundary that enters and leaves a coarse cell between two corners with
+the same outcome is not seen; raise `initial` if the region is curved on
+that scale.
+
+Output:
+  boundary cells  the finest flipped cells, with the metric range at their corners
+  polyline        (2 levers) the crossing traced through those cells by linear
+                  interpolation along their edges (marching squares)
+  heatmap tab     the metric over the box, interpolated from the finished cells,
+                  filled green/red by the threshold, plus the polyline table
+
+Payback and cash breakeven metrics are NaN where the month is never reached.
+Such corners count as below the threshold, the crossing on an edge to one
+sits at the edge midpoint, and heatmap cells next to them read "never".
+
+Spec (JSON):
+  {
+    "base": {...},                                  # optional, same shape as project()
+    "metric": "q6_monthly", "threshold": 300000,    # any scenario_grid column
+    "axes": [
+      {"target": "general.closing_rate", "range": [0.30, 0.70]},
+      {"target": "*.ramp_gbp", "curve": "logistic", "param": "midpoint",
+       "range": [4, 14], "params": {"steepness": 0.30}}
+    ],
+    "initial": 8, "depth": 6
+  }
+
+Ramp levers sweep one parameter of a ramp_curves.py curve.
+
+Usage:
+  python3 boundary.py                                # closing rate × GBP ramp speed
+  python3 boundary.py spec.json --json boundary.json --xlsx boundary.xlsx
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, goal_monthly
+from vector_engine import (MONTHS_PER_QUARTER, parse_target, scenario_inputs, evaluate_market,
+                           summary_columns, summary_column_names)
+from ramp_curves import compile_curve
+from cash_flow import cash_columns, cash_column_names
+
+DEFAULT_SPEC = {
+    'metric': 'q6_monthly',
+    'threshold': goal_monthly,
+    'axes': [
+        {'target': 'general.closing_rate', 'range': [0.30, 0.70]},
+        {'target': '*.ramp_gbp', 'curve': 'logistic', 'param': 'midpoint', 'range': [4, 14],
+         'params': {'steepness': 0.30}},
+    ],
+    'initial': 8,
+    'depth': 6,
+}
+HEATMAP_CELLS = 40
+
+
+# ============================================================
+# LEVERS
+# ============================================================
+class Lever:
+    """One continuous axis: a number input, or one parameter of a ramp curve"""
+
+    def __init__(self, spec, horizon):
+        self.target = spec['target']
+        self.scope, self.field = parse_target(self.target)
+        self.lo, self.hi = (float(v) for v in spec['range'])
+        if not self.hi > self.lo:
+            raise ValueError(f"{self.target}: range must be [low, high] with low < high")
+        self.horizon = horizon
+        self.curve = None
+        if self.field.startswith('ramp_'):
+            if 'curve' not in spec or 'param' not in spec:
+                raise ValueError(f"{self.target}: ramp levers need a 'curve' and the 'param' to sweep")
+            self.curve = {'curve': spec['curve'], 'params': dict(spec.get('params') or {})}
+            self.param = spec['param']
+        self.label = f"{self.target} ({self.param})" if self.curve else self.target
+
+    def at(self, fraction):
+        """Lever values for positions in [0, 1]"""
+        return self.lo + (self.hi - self.lo) * np.asarray(fraction, dtype=float)
+
+    def inputs(self, values):
+        """Override values for scenario_inputs: the numbers, or (n, months) ramps"""
+        if self.curve is None:
+            return values
+        spec = dict(self.curve, params=dict(self.curve['params'], **{self.param: values.tolist()}))
+        table, _ = compile_curve(spec, self.horizon)
+        return table
+
+    def to_json(self):
+        return {'target': self.target, 'param': self.param if self.curve else None,
+                'range': [self.lo, self.hi]}
+
+
+class BoundaryProblem:
+    """Spec resolved against the base assumptions, evaluated in batches"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.general, self.ramps, self.markets = resolve_assumptions(spec.get('base'))
+        horizon = len(self.ramps) * MONTHS_PER_QUARTER
+        self.levers = [Lever(a, horizon) for a in spec.get('axes', [])]
+        if len(self.levers) not in (2, 3):
+            raise ValueError("boundary mapping needs two or three axes")
+        self.metric = spec.get('metric', 'q6_monthly')
+        self.threshold = float(spec.get('threshold', goal_monthly))
+        self.cash_flow = self.metric in cash_column_names(self.markets)
+        if not self.cash_flow and self.metric not in summary_column_names(self.markets, len(self.ramps)):
+            raise ValueError(f"unknown metric {self.metric!r}")
+        self.initial = int(spec.get('initial', 8))
+        self.depth = int(spec.get('depth', 6))
+        if self.initial < 1 or self.depth < 0:
+            raise ValueError("initial must be >= 1 and depth >= 0")
+        self.evaluations = 0
+
+    @property
+    def dims(self):
+        return len(self.levers)
+
+    def evaluate(self, fractions):
+        """Metric for an (n, dims) array of positions in the unit box"""
+        n = len(fractions)
+        if n == 0:
+            return np.zeros(0)
+        overrides = [(lever.target, lever.inputs(lever.at(fractions[:, j])))
+                     for j, lever in enumerate(self.levers)]
+        inputs = scenario_inputs(self.markets, self.general, self.ramps, overrides)
+        self.evaluations += n
+        if self.cash_flow:
+            results = {name: evaluate_market(i) for name, i in inputs.items()}
+            return np.asarray(cash_columns(inputs, n, results=results)[self.metric], dtype=float)
+        return np.asarray(summary_columns(inputs, n)[self.metric], dtype=float)
+
+
+# ============================================================
+# REFINEMENT
+# ============================================================
+class BoundaryMap:
+    """
+    Quadtree/octree over the unit box on an integer lattice of
+    initial × 2^depth steps per axis. Cells are keyed by their lower corner;
+    evaluated corners are kept as sorted (key, value) arrays.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.dims = problem.dims
+        self.resolution = problem.initial * 2 ** problem.depth
+        self.lattice = (self.resolution + 1,) * self.dims
+        self.offsets = np.array(list(itertools.product((0, 1), repeat=self.dims)), dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros(0)
+        self.split = []      # per level: sorted keys of the cells that were split
+        self.leaves = []     # (level, lower corners (n, dims), corner values (n, 2^dims))
+
+    def cell_size(self, level):
+        return 2 ** (self.problem.depth - level)
+
+    def _key(self, points):
+        return np.ravel_multi_index(tuple(points.T), self.lattice)
+
+    def corner_values(self, lower, level):
+        """(n, 2^dims) metric at each cell's corners, evaluating only new points"""
+        corners = lower[:, None, :] + self.offsets[None, :, :] * self.cell_size(level)
+        keys = self._key(corners.reshape(-1, self.dims))
+        new = np.setdiff1d(keys, self.keys)
+        if len(new):
+            points = np.stack(np.unravel_index(new, self.lattice), axis=1)
+            values = self.problem.evaluate(points / self.resolution)
+            keys_all = np.concatenate([self.keys, new])
+            order = np.argsort(keys_all)
+            self.keys = keys_all[order]
+            self.values = np.concatenate([self.values, values])[order]
+        return self.values[np.searchsorted(self.keys, keys)].reshape(len(lower), -1)
+
+    def run(self):
+        p = self.problem
+        size = self.cell_size(0)
+        lower = np.array(list(itertools.product(range(p.initial), repeat=self.dims)),
+                         dtype=np.int64) * size
+        for level in range(p.depth + 1):
+            values = self.corner_values(lower, level)
+            passed = values >= p.threshold
+            flipped = passed.any(axis=1) & ~passed.all(axis=1)
+            last = level == p.depth
+            keep = ~flipped | last
+            self.leaves.append((level, lower[keep], values[keep]))
+            if last or not flipped.any():
+                break
+            parents = lower[flipped]
+            self.split.append(np.sort(self._key(parents)))
+            half = self.cell_size(level + 1)
+            lower = (parents[:, None, :] + self.offsets[None, :, :] * half).reshape(-1, self.dims)
+        return self
+
+    # ------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------
+    def boundary_cells(self):
+        """(lower corners, corner values) of the finest flipped cells"""
+        level, lower, values = self.leaves[-1]
+        if level != self.problem.depth:
+            return np.zeros((0, self.dims), dtype=np.int64), np.zeros((0, 2 ** self.dims))
+        passed = values >= self.problem.threshold
+        flipped = passed.any(axis=1) & ~passed.all(axis=1)
+        return lower[flipped], values[flipped]
+
+    def locate(self, fractions):
+        """(level, lower corner) of the finished cell holding each position"""
+        points = np.minimum((np.asarray(fractions) * self.resolution).astype(np.int64),
+                            self.resolution - 1)
+        level = np.zeros(len(points), dtype=np.int64)
+        lower = points // self.cell_size(0) * self.cell_size(0)
+        active = np.ones(len(points), dtype=bool)
+        for lvl, split in enumerate(self.split):
+            inside = active & np.isin(self._key(lower), split)
+            active = inside
+            if not inside.any():
+                break
+            size = self.cell_size(lvl + 1)
+            lower[inside] = points[inside] // size * size
+            level[inside] = lvl + 1
+        return level, lower
+
+    def interpolate(self, fractions):
+        """Metric at arbitrary positions, multilinear within the finished cells"""
+        fractions = np.asarray(fractions, dtype=float)
+        level, lower = self.locate(fractions)
+        size = (2 ** (self.problem.depth - level))[:, None]
+        local = np.clip(fractions * self.resolution - lower, 0, size) / size
+        keys = self._key((lower[:, None, :] + self.offsets[None, :, :] * size[:, :, None])
+                         .reshape(-1, self.dims))
+        corner = self.values[np.searchsorted(self.keys, keys)].reshape(len(fractions), -1)
+        weight = np.prod(np.where(self.offsets[None, :, :] == 1, local[:, None, :],
+                                  1 - local[:, None, :]), axis=2)
+        return (weight * corner).sum(axis=1)
+
+    def polylines(self):
+        """2 levers: crossing polylines in lever units (marching squares + chaining)"""
+        if self.dims != 2:
+            return []
+        lower, values = self.boundary_cells()
+        t = self.problem.threshold
+        size = self.cell_size(self.problem.depth)
+        # Corner order from offsets: (0,0) (0,1) (1,0) (1,1). Edges go round the
+        # square but always interpolate from the lower corner, so a neighbouring
+        # cell computes the bit-identical point on a shared edge.
+        edges = ((0, 1), (1, 3), (2, 3), (0, 2))
+        segments = []
+        for low, v in zip(lower.tolist(), values.tolist()):
+            points = []
+            for a, b in edges:
+                if (v[a] >= t) != (v[b] >= t):
+                    w = (t - v[a]) / (v[b] - v[a])
+                    if np.isnan(w):
+                        w = 0.5   # a corner that never reaches the metric: no slope to follow
+                    pa, pb = self.offsets[a], self.offsets[b]
+                    points.append(tuple(low[j] + size * (pa[j] + w * (pb[j] - pa[j]))
+                                        for j in range(2)))
+            # Two crossings per cell, or four at a saddle (paired in edge order)
+            segments.extend(zip(points[0::2], points[1::2]))
+        return [[tuple(lever.at(c / self.resolution) for lever, c in zip(self.problem.levers, pt))
+                 for pt in line] for line in _chain(segments)]
+
+    def summary(self):
+        p = self.problem
+        lower, values = self.boundary_cells()
+        size = self.cell_size(p.depth)
+        centers = (lower + size / 2) / self.resolution
+        return {
+            'metric': p.metric, 'threshold': p.threshold,
+            'axes': [lever.to_json() for lever in p.levers],
+            'resolution': self.resolution,
+            'evaluations': p.evaluations,
+            'full_grid_evaluations': int(np.prod(self.lattice, dtype=np.int64)),
+            'leaf_cells': sum(len(leaf[1]) for leaf in self.leaves),
+            'boundary_cells': [
+                {'center': [float(lever.at(c)) for lever, c in zip(p.levers, center)],
+                 'metric_min': lo, 'metric_max': hi}
+                for center, (lo, hi) in zip(centers, map(_metric_range, values))
+            ],
+            'polylines': [[[float(x) for x in pt] for pt in line] for line in self.polylines()],
+        }
+
+
+def _metric_range(values):
+    """(min, max) of the non-NaN corner values; None for a bound no corner reaches"""
+    finite = values[~np.isnan(values)]
+    return (float(finite.min()), float(finite.max())) if len(finite) else (None, None)
+
+
+def _chain(segments):
+    """Join segments that share endpoints into polylines"""
+    ends = {}
+    for i, (a, b) in enumerate(segments):
+        ends.setdefault(a, []).append(i)
+        ends.setdefault(b, []).append(i)
+    used = [False] * len(segments)
+
+    def extend(line):
+        while True:
+            nxt = [i for i in ends[line[-1]] if not used[i]]
+            if not nxt:
+                return line
+            used[nxt[0]] = True
+            a, b = segments[nxt[0]]
+            line.append(b if a == line[-1] else a)
+
+    # Start open lines from a loose end so they come out whole; then closed loops
+    loose = [i for i, (a, b) in enumerate(segments) if len(ends[a]) == 1 or len(ends[b]) == 1]
+    lines = []
+    for i in loose + list(range(len(segments))):
+        if used[i]:
+            continue
+        used[i] = True
+        line = extend(list(segments[i]))
+        lines.append(extend(line[::-1]))
+    return lines
+
+
+def map_boundary(spec=None):
+    """Run the adaptive refinement; returns the BoundaryMap"""
+    return BoundaryMap(BoundaryProblem(spec or DEFAULT_SPEC)).run()
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def add_boundary_sheet(wb, bmap, cells=HEATMAP_CELLS, slices=5, title="Goal Boundary"):
+    """
+    Heatmap of the metric (rows = 2nd lever, columns = 1st lever; one block
+    per slice of the 3rd lever), filled by the threshold, then the polyline.
+    """
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (section_fill, goal_met_fill, goal_miss_fill, thin_border,
+                                 money_fmt, decimal_fmt, style_header, auto_width)
+
+    p = bmap.problem
+    if title in wb.sheetnames:
+        del wb[title]
+    ws = wb.create_sheet(title)
+    x_lever, y_lever = p.levers[0], p.levers[1]
+    ws.append([f"{p.metric} ≥ {p.threshold:,.0f}", f"rows: {y_lever.label}",
+               f"columns: {x_lever.label}",
+               f"{p.evaluations:,} evaluations (full grid: "
+               f"{int(np.prod(bmap.lattice, dtype=np.int64)):,})"])
+    style_header(ws)
+
+    centers = (np.arange(cells) + 0.5) / cells
+    fmt = money_fmt if abs(p.threshold) >= 1000 else decimal_fmt
+    z_positions = [None] if p.dims == 2 else ((np.arange(slices) + 0.5) / slices).tolist()
+    for z in z_positions:
+        ws.append([])
+        if z is not None:
+            ws.append([f"{p.levers[2].label} = {p.levers[2].at(z):g}"])
+            ws.cell(row=ws.max_row, column=1).fill = section_fill
+            ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+        ws.append([""] + [round(float(x_lever.at(x)), 4) for x in centers])
+        for cell in ws[ws.max_row][1:]:
+            cell.font = Font(bold=True)
+        gx, gy = np.meshgrid(centers, centers[::-1])
+        points = np.stack([gx.ravel(), gy.ravel()] + ([np.full(gx.size, z)] if z is not None
+                                                      else []), axis=1)
+        grid = bmap.interpolate(points).reshape(cells, cells)
+        for y, row in zip(centers[::-1], grid):
+            ws.append([round(float(y_lever.at(y)), 4)]
+                      + ["never" if np.isnan(v) else round(float(v)) for v in row])
+            ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+            for cell, v in zip(ws[ws.max_row][1:], row):
+                cell.border = thin_border
+                if np.isnan(v):
+                    cell.alignment = Alignment(horizontal='center')
+                    continue
+                cell.number_format = fmt
+                cell.fill = goal_met_fill if v >= p.threshold else goal_miss_fill
+
+    lines = bmap.polylines()
+    if lines:
+        ws.append([])
+        ws.append(["BOUNDARY", x_lever.label, y_lever.label])
+        for cell in ws[ws.max_row]:
+            cell.fill = section_fill
+            cell.font = Font(bold=True)
+        for i, line in enumerate(lines):
+            for x, y in line:
+                ws.append([f"line {i + 1}", float(x), float(y)])
+                for cell in ws[ws.max_row][:3]:
+                    cell.border = thin_border
+                    cell.alignment = Alignment(horizontal='center')
+    auto_width(ws, min_w=10)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive threshold-boundary map over 2-3 levers")
+    parser.add_argument('spec', nargs='?', help="boundary spec JSON (default: closing rate × GBP ramp)")
+    parser.add_argument('--depth', type=int, help="override the spec's refinement depth")
+    parser.add_argument('--json', help="write the boundary cells and polylines to this file")
+    parser.add_argument('--xlsx', help="add/replace a 'Goal Boundary' tab in this workbook")
+    args = parser.parse_args()
+
+    spec = dict(DEFAULT_SPEC)
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+    if args.depth is not None:
+        spec['depth'] = args.depth
+
+    t0 = time.perf_counter()
+    try:
+        bmap = map_boundary(spec)
+    except ValueError as exc:
+        parser.error(str(exc))
+    result = bmap.summary()
+    elapsed = time.perf_counter() - t0
+
+    share = result['evaluations'] / result['full_grid_evaluations']
+    print(f"  {result['metric']} ≥ {result['threshold']:,.0f} over "
+          + " × ".join(lever.label for lever in bmap.problem.levers))
+    print(f"  Resolution:       {result['resolution']} cells per axis")
+    print(f"  Evaluations:      {result['evaluations']:,} "
+          f"({share:.2%} of a {result['full_grid_evaluations']:,}-point grid)")
+    print(f"  Boundary cells:   {len(result['boundary_cells']):,}")
+    for i, line in enumerate(result['polylines']):
+        print(f"  Line {i + 1}: {len(line):,} points from ({line[0][0]:g}, {line[0][1]:g}) "
+              f"to ({line[-1][0]:g}, {line[-1][1]:g})")
+    print(f"  {elapsed:.2f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ Created: {args.json}")
+    if args.xlsx:
+        from openpyxl import Workbook, load_workbook
+        if os.path.exists(args.xlsx):
+            wb = load_workbook(args.xlsx)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+        add_boundary_sheet(wb, bmap)
+        wb.save(args.xlsx)
+        print(f"✅ Created: {args.xlsx}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Cash Flow & Working Capital
+Revenue in the v2 model is booked in the month the job is sold, but
+restoration work is mostly insurance-paid and collected months later, while
+ad spend and the management fee go out immediately. This spreads each
+revenue type over a collection-lag distribution and reports, per market and
+combined:
+
+  cash in / cash out / net cash per month
+  cumulative cash position
+  peak funding need      (deepest point of the cumulative position)
+  cash breakeven month   (from here on the position stays >= 0)
+  receivables            (booked but not yet collected) at month 18
+
+Cash out is the marketing spend only (ad spend + management fee), the same
+cost base as ROI; job costs are outside this model.
+
+Everything works on vector_engine monthly arrays of shape (scenarios,
+months): the lag distributions fold into one cash-per-job weight per lag
+month, collections are a handful of shifted multiply-adds on the jobs
+series, and the position is one cumsum, so the same code runs inside
+scenario_grid.py (grid spec "cash_flow": true).
+
+COLLECTION_LAGS are illustrative; replace with the client's aging report.
+
+Usage:
+  python3 cash_flow.py                        # v2 defaults, monthly table
+  python3 cash_flow.py --json
+  python3 cash_flow.py --xlsx cash.xlsx
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from vector_engine import default_inputs, evaluate_market, slug, MONTHS_PER_QUARTER
+
+# Share of each revenue type collected 0, 1, 2, ... months after the job month
+COLLECTION_LAGS = {
+    'mit': (0.10, 0.30, 0.35, 0.15, 0.10),    # insurance carriers: mostly 30-90 days
+    'abate': (0.10, 0.25, 0.35, 0.20, 0.10),
+    'recon': (0.00, 0.20, 0.30, 0.30, 0.20),  # progress billing, final draw last
+    'referral': (0.00, 1.00),                 # referral partner pays the next month
+}
+STREAM_FIELDS = {
+    'mit': ('mit_avg', None),
+    'abate': ('abate_avg', 'abate_conv'),
+    'recon': ('recon_avg', 'recon_conv'),
+    'referral': ('recon_fee', None),
+}
+MARKET_CASH_METRICS = ('peak_funding', 'breakeven_month', 'ending_receivables')
+CASH_METRICS = ('cash_peak_funding', 'cash_breakeven_month', 'cash_ending_receivables')
+
+
+def _column(value):
+    value = np.asarray(value, dtype=float)
+    return value[:, None] if value.ndim == 1 else value
+
+
+def check_lags(lags):
+    for kind, weights in lags.items():
+        if abs(sum(weights) - 1.0) > 1e-9 or min(weights) < 0:
+            raise ValueError(f"collection lags for {kind} must be >= 0 and sum to 1")
+    return lags
+
+
+# ============================================================
+# CASH FLOW
+# ============================================================
+def collection_weights(inputs, lags=COLLECTION_LAGS):
+    """
+    Cash collected per job 0, 1, 2, ... months after the job month, summed
+    over revenue types (scalars or (n, 1) columns). The split follows the LTV
+    components; if 'ltv' was set directly they are scaled to sum to it, and a
+    market with no components collects on the mitigation schedule.
+    """
+    per_job = {}
+    for kind, (avg, conv) in STREAM_FIELDS.items():
+        value = _column(inputs.get(avg, 0))
+        per_job[kind] = value * _column(inputs.get(conv, 0)) if conv else value
+    parts = sum(per_job.values())
+    ltv = _column(inputs['ltv'])
+    shape = np.broadcast_shapes(np.shape(parts), np.shape(ltv))
+    scale = np.divide(ltv, parts, out=np.zeros(shape), where=parts > 0)
+    unsplit = np.where(parts > 0, 0.0, ltv)
+
+    width = max(len(w) for w in lags.values())
+    weight = lambda kind, lag: lags[kind][lag] if lag < len(lags[kind]) else 0.0
+    return [sum(per_job[k] * scale * weight(k, lag) for k in per_job) + unsplit * weight('mit', lag)
+            for lag in range(width)]
+
+
+def collect(jobs, weights):
+    """Cash received per month from monthly jobs (collections past the horizon drop off)"""
+    months = jobs.shape[-1]
+    cash = np.zeros(jobs.shape)
+    for lag, w in enumerate(weights[:months]):
+        cash[..., lag:] += jobs[..., :months - lag] * w
+    return cash
+
+
+def cash_position(cash_in, cash_out, revenue):
+    """Monthly series plus per-scenario peak funding, breakeven month and receivables"""
+    net = cash_in - cash_out
+    position = np.cumsum(net, axis=-1)
+    months = position.shape[-1]
+
+    negative = position < 0
+    any_negative = negative.any(axis=-1)
+    last_negative = months - 1 - np.argmax(negative[..., ::-1], axis=-1)
+    breakeven = np.where(~any_negative, 1.0,
+                         np.where(last_negative == months - 1, np.nan, last_negative + 2.0))
+    return {
+        'cash_in': cash_in, 'cash_out': cash_out, 'net_cash': net, 'position': position,
+        'receivables': np.cumsum(revenue - cash_in, axis=-1),
+        'peak_funding': np.maximum(-position.min(axis=-1), 0.0),
+        'breakeven_month': breakeven,
+        'ending_receivables': (revenue - cash_in).sum(axis=-1),
+    }
+
+
+def market_cash_flow(inputs, lags=COLLECTION_LAGS, result=None):
+    """Cash flow for a batch of scenarios of one market (vector_engine inputs)"""
+    result = result if result is not None else evaluate_market(inputs)
+    cash_in = collect(np.asarray(result['jobs'], dtype=float), collection_weights(inputs, lags))
+    return cash_position(cash_in, np.asarray(result['total_cost'], dtype=float),
+                         np.asarray(result['revenue'], dtype=float))
+
+
+def cash_flow(inputs_by_market, lags=COLLECTION_LAGS, results=None):
+    """
+    ({market name: market_cash_flow}, combined) for vector_engine inputs;
+    pass vector_engine.evaluate() results to skip re-evaluating the markets.
+    """
+    check_lags(lags)
+    per_market = {}
+    for name, inputs in inputs_by_market.items():
+        result = results[name] if results is not None else evaluate_market(inputs)
+        flow = market_cash_flow(inputs, lags, result)
+        flow['revenue'] = np.asarray(result['revenue'], dtype=float)
+        per_market[name] = flow
+    total = lambda k: sum(f[k] for f in per_market.values())
+    combined = cash_position(total('cash_in'), total('cash_out'), total('revenue'))
+    return per_market, combined
+
+
+def cash_columns(inputs_by_market, n=None, lags=COLLECTION_LAGS, results=None):
+    """Flat {column: (n,)} for the sweep runners: CASH_METRICS + '<market>_<metric>'"""
+    per_market, combined = cash_flow(inputs_by_market, lags, results)
+    out = {f"cash_{k}": combined[k] for k in MARKET_CASH_METRICS}
+    for name, flow in per_market.items():
+        for k in MARKET_CASH_METRICS:
+            out[f"{slug(name)}_{k}"] = flow[k]
+    if n is not None:
+        out = {k: np.broadcast_to(v, (n,)) for k, v in out.items()}
+    return out
+
+
+def cash_column_names(market_list):
+    return list(CASH_METRICS) + [
+        f"{slug(m['name'])}_{k}" for m in market_list for k in MARKET_CASH_METRICS]
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def add_cash_flow_sheet(wb, per_market, combined, title="Cash Flow"):
+    """Monthly cash table per market and combined, v2 style"""
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (section_fill, total_fill, goal_miss_fill, thin_border,
+                                 money_fmt, style_header, auto_width)
+
+    if title in wb.sheetnames:
+        del wb[title]
+    ws = wb.create_sheet(title)
+    ws.append(["Month", "Revenue Booked", "Cash In", "Cash Out", "Net Cash",
+               "Cash Position", "Receivables"])
+    style_header(ws)
+
+    blocks = list(per_market.items()) + [("Combined", dict(combined, revenue=sum(
+        f['revenue'] for f in per_market.values())))]
+    for name, flow in blocks:
+        ws.append([name.upper(), "", "", "", "", "", ""])
+        months = flow['position'].shape[-1]
+        for m in range(months):
+            ws.append([m + 1] + [round(float(np.ravel(flow[k])[m])) for k in
+                                 ('revenue', 'cash_in', 'cash_out', 'net_cash', 'position',
+                                  'receivables')])
+        breakeven = float(np.ravel(flow['breakeven_month'])[0])
+        ws.append(["Peak funding need", "", "", "", "",
+                   round(float(np.ravel(flow['peak_funding'])[0])), ""])
+        ws.append(["Cash breakeven month", "", "", "", "",
+                   "not by month 18" if np.isnan(breakeven) else int(breakeven), ""])
+        ws.append(["", "", "", "", "", "", ""])
+
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        label = row[0].value
+        if label in (None, ""):
+            continue
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            if idx:
+                cell.alignment = Alignment(horizontal='center')
+                cell.number_format = money_fmt
+        if isinstance(label, str) and label.isupper():
+            for cell in row:
+                cell.fill = section_fill
+                cell.font = Font(bold=True)
+        elif isinstance(label, str):
+            for cell in row:
+                cell.fill = total_fill
+                cell.font = Font(bold=True)
+        elif isinstance(row[5].value, (int, float)) and row[5].value < 0:
+            row[5].fill = goal_miss_fill
+    auto_width(ws)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def _summary(flow):
+    breakeven = float(np.ravel(flow['breakeven_month'])[0])
+    return {
+        'peak_funding': round(float(np.ravel(flow['peak_funding'])[0])),
+        'breakeven_month': None if np.isnan(breakeven) else int(breakeven),
+        'ending_receivables': round(float(np.ravel(flow['ending_receivables'])[0])),
+        'monthly': {k: np.ravel(flow[k]).round().tolist()
+                    for k in ('cash_in', 'cash_out', 'net_cash', 'position')},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monthly cash flow with collection lags")
+    parser.add_argument('--json', action='store_true', help="print the result as JSON")
+    parser.add_argument('--xlsx', help="add/replace a 'Cash Flow' tab in this workbook")
+    args = parser.parse_args()
+
+    per_market, combined = cash_flow(default_inputs())
+    result = {name: _summary(f) for name, f in per_market.items()}
+    result['Combined'] = _summary(combined)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for name, s in result.items():
+            print(f"  {name.upper()}")
+            print("  " + "-" * 60)
+            m = s['monthly']
+            for i in range(len(m['position'])):
+                quarter = f"Q{i // MONTHS_PER_QUARTER + 1}"
+                print(f"  M{i + 1:<3d}{quarter:4s} in ${m['cash_in'][i]:>9,.0f}  "
+                      f"out ${m['cash_out'][i]:>8,.0f}  position ${m['position'][i]:>11,.0f}")
+            be = s['breakeven_month']
+            print(f"  Peak funding need:   ${s['peak_funding']:,}")
+            print(f"  Cash breakeven:      {'month ' + str(be) if be else 'not by month 18'}")
+            print(f"  Receivables (M18):   ${s['ending_receivables']:,}")
+            print()
+
+    if args.xlsx:
+        from openpyxl import Workbook, load_workbook
+        if os.path.exists(args.xlsx):
+            wb = load_workbook(args.xlsx)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+        add_cash_flow_sheet(wb, per_market, combined)
+        wb.save(args.xlsx)
+        print(f"✅ Created: {args.xlsx}")
+
+
+if __name__ == '__main__':
+    main()
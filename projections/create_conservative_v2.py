@@ -6,582 +6,693 @@ Goal: ~$300k/month COMBINED revenue by Q6 (month 18)
 Key changes from v1:
 - Much slower ramp schedules across all channels
 - Ads: 30% Q1 → gradual climb to 100% by Q5
-- GBP: 10% Q1 → slow build to 100% by Q6  
+- GBP: 10% Q1 → slow build to 100% by Q6
 - Website: Doesn't start producing until Q3, only 60% by Q6
 - Ad spend calculated correctly: qualified PPC leads × CPL
 - Realistic early quarters (no overpromising)
+
+build_workbook() takes the same assumption dict as projection_engine.project(),
+so refresh_workbooks.py can rebuild a workbook from an edited Assumptions tab.
+openpyxl is only imported when a tab is written, so the summary modes run
+the engine alone.
+
+Usage:
+  python3 create_conservative_v2.py                         # full workbook + report
+  python3 create_conservative_v2.py --summary-only          # report only, no workbook
+  python3 create_conservative_v2.py --json                  # summary as JSON
+  python3 create_conservative_v2.py --tabs assumptions,combined
+  python3 create_conservative_v2.py --sobol-samples 4096    # add the Global Sensitivity tab
 """
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+import argparse
+import json
+import math
+import os
 
 # ============================================================
-# STYLES
+# CALCULATION ENGINE
 # ============================================================
-header_font = Font(bold=True, color="FFFFFF", size=11)
-header_fill = PatternFill(start_color="2F5496", end_color="2F5496", fill_type="solid")
-section_fill = PatternFill(start_color="D6E4F0", end_color="D6E4F0", fill_type="solid")
-total_fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
-goal_met_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-goal_miss_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-ramp_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-input_fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-
-thin_border = Border(
-    left=Side(style='thin'), right=Side(style='thin'),
-    top=Side(style='thin'), bottom=Side(style='thin')
-)
-
-money_fmt = '"$"#,##0'
-pct_fmt = '0%'
-decimal_fmt = '#,##0.0'
-roi_fmt = '0.0"x"'
-
-def style_header(ws, row=1):
-    for cell in ws[row]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = thin_border
-
-def apply_borders(ws, start_row=2):
-    for row in ws.iter_rows(min_row=start_row, max_row=ws.max_row):
-        for cell in row:
-            cell.border = thin_border
+# Ramps, market assumptions and calculate_quarter() live in projection_engine
+# so the projection service and analysis tools share the exact same math.
+from projection_engine import resolve_assumptions, goal_monthly
+from projection_frame import ProjectionFrame, ADDITIVE_METRICS
+from assumptions_sheet import SHEET_TITLE, HEADER, assumption_rows
+from vector_engine import slug, evaluate, market_inputs, market_summary, MONTHS_PER_QUARTER, PAYBACK_METRICS
 
-def auto_width(ws, min_w=14):
-    for col in ws.columns:
-        max_len = 0
-        col_letter = col[0].column_letter
-        for cell in col:
-            try:
-                if cell.value:
-                    max_len = max(max_len, len(str(cell.value)))
-            except:
-                pass
-        ws.column_dimensions[col_letter].width = max(min_w, min(max_len + 3, 30))
+# PROJECTIONS_OUTPUT_DIR redirects the output (golden.py regenerates into a temp dir)
+output_dir = os.environ.get("PROJECTIONS_OUTPUT_DIR", "/Users/jameslarosa/Desktop/Random AI Prjects/AI Wireframe Builder/projections")
+output_path = os.path.join(output_dir, "Conservative_v2_Projections.xlsx")
 
 
 # ============================================================
-# CONSERVATIVE RAMP SCHEDULES
+# TAB 1: ASSUMPTIONS
 # ============================================================
-# These are MUCH slower than v1
-ramps = {
-    'Q1': {'ads': 0.30, 'gbp': 0.10, 'web': 0.00},  # Months 1-3: Just starting ads, GBP barely live
-    'Q2': {'ads': 0.60, 'gbp': 0.25, 'web': 0.00},  # Months 4-6: Ads optimizing, GBP building reviews
-    'Q3': {'ads': 0.80, 'gbp': 0.45, 'web': 0.05},  # Months 7-9: Ads strong, GBP gaining, website starting
-    'Q4': {'ads': 0.90, 'gbp': 0.65, 'web': 0.15},  # Months 10-12: Near-peak ads, GBP growing, website crawling
-    'Q5': {'ads': 1.00, 'gbp': 0.85, 'web': 0.35},  # Months 13-15: Full ads, GBP strong, website picking up
-    'Q6': {'ads': 1.00, 'gbp': 1.00, 'web': 0.60},  # Months 16-18: Full ads+GBP, website at 60% (still growing)
-}
+def write_assumptions_sheet(ws1, general, ramps, markets):
+    from openpyxl.styles import Font
+    from workbook_styles import section_fill, input_fill, thin_border, style_header, auto_width
 
-# ============================================================
-# MARKET ASSUMPTIONS
-# ============================================================
-qualified_rate = 0.50  # 50% of calls are qualified
-closing_rate = 0.50    # 50% of qualified leads close
-mgmt_fee_monthly = 5500 / 2  # $2,750/month per location
-
-tucson = {
-    'name': 'Tucson',
-    'max_web': 20, 'max_ppc': 15, 'max_gbp': 30,
-    'cpl': 700,
-    'mit_avg': 4589, 'abate_avg': 7484, 'abate_conv': 0.30,
-    'recon_avg': 7452, 'recon_conv': 0.55,
-    'ltv': 4589 + (0.30 * 7484) + (0.55 * 7452)  # = $10,933.80
-}
+    ws1.title = SHEET_TITLE
+    ws1.append(HEADER)
+    style_header(ws1)
 
-denver = {
-    'name': 'Denver',
-    'max_web': 35, 'max_ppc': 30, 'max_gbp': 50,
-    'cpl': 800,
-    'mit_avg': 6100, 'recon_fee': 0,
-    'ltv': 6100
-}
+    for row_data in assumption_rows(general, ramps, markets):
+        ws1.append(row_data)
 
-# ============================================================
-# CALCULATION ENGINE
-# ============================================================
-def calculate_quarter(market, ramp, quarter_label):
-    """Calculate one quarter of projections for a location"""
-    # Qualified leads per quarter (max × ramp × qualified% × 3 months)
-    web_leads = market['max_web'] * ramp['web'] * qualified_rate * 3
-    ppc_leads = market['max_ppc'] * ramp['ads'] * qualified_rate * 3
-    gbp_leads = market['max_gbp'] * ramp['gbp'] * qualified_rate * 3
-    total_leads = web_leads + ppc_leads + gbp_leads
-
-    # Costs
-    # Ad spend = qualified PPC leads × CPL (this IS the ad spend to acquire those leads)
-    ad_spend = ppc_leads * market['cpl']
-    mgmt_fee = mgmt_fee_monthly * 3  # quarterly
-    total_cost = ad_spend + mgmt_fee
-
-    # Revenue
-    jobs = total_leads * closing_rate
-    revenue = jobs * market['ltv']
-    monthly_revenue = revenue / 3
-    roi = revenue / total_cost if total_cost > 0 else 0
-
-    return {
-        'quarter': quarter_label,
-        'web_leads': round(web_leads, 1),
-        'ppc_leads': round(ppc_leads, 1),
-        'gbp_leads': round(gbp_leads, 1),
-        'total_leads': round(total_leads, 1),
-        'ad_spend': round(ad_spend),
-        'mgmt_fee': round(mgmt_fee),
-        'total_cost': round(total_cost),
-        'jobs': round(jobs, 1),
-        'revenue': round(revenue),
-        'monthly_rev': round(monthly_revenue),
-        'roi': round(roi, 1)
-    }
-
-
-def calc_all_quarters(market):
-    """Calculate all 6 quarters for a market"""
-    results = []
-    for q_label, ramp in ramps.items():
-        results.append(calculate_quarter(market, ramp, q_label))
-    return results
-
-
-tucson_data = calc_all_quarters(tucson)
-denver_data = calc_all_quarters(denver)
+    # Format
+    for row in ws1.iter_rows(min_row=2, max_row=ws1.max_row):
+        for cell in row:
+            cell.border = thin_border
 
+        # Section headers
+        cat = str(row[0].value) if row[0].value else ""
+        if cat.isupper() and len(cat) > 3:
+            for cell in row:
+                cell.fill = section_fill
+                cell.font = Font(bold=True)
 
-# ============================================================
-# BUILD WORKBOOK
-# ============================================================
-wb = Workbook()
+        # Highlight adjustable inputs
+        if row[4].value == "YES":
+            row[2].fill = input_fill
 
+    format_assumption_values(ws1)
+    auto_width(ws1)
 
-# ============================================================
-# TAB 1: ASSUMPTIONS
-# ============================================================
-ws1 = wb.active
-ws1.title = "Assumptions"
-
-ws1.append(["Category", "Parameter", "Value", "Notes", "Adjustable?"])
-style_header(ws1)
-
-# General section
-ws1.append(["GENERAL INPUTS", "", "", "", ""])
-ws1.append(["General", "Monthly Mgmt Fee (Both Locations)", 5500, "Split 50/50 = $2,750/location", "YES"])
-ws1.append(["General", "Qualified Lead % (of all calls)", 0.50, "Industry avg: 40-60%", "YES"])
-ws1.append(["General", "Closing Rate (Qualified → Job)", 0.50, "Conservative: 50%", "YES"])
-ws1.append(["", "", "", "", ""])
-
-# Tucson
-ws1.append(["TUCSON MARKET DATA", "", "", "", ""])
-ws1.append(["Tucson", "Max Monthly Website Leads", 20, "At full 18-month maturity", "YES"])
-ws1.append(["Tucson", "Max Monthly PPC Leads", 15, "At full ad spend", "YES"])
-ws1.append(["Tucson", "Max Monthly GBP Leads", 30, "At full GBP maturity", "YES"])
-ws1.append(["Tucson", "Cost Per Qualified Lead (PPC)", 700, "Water damage CPL", "YES"])
-ws1.append(["Tucson", "Mitigation Average", 4589, "Per job, from client data", "YES"])
-ws1.append(["Tucson", "Abatement Average", 7484, "Per job, from client data", "YES"])
-ws1.append(["Tucson", "Abatement Conversion %", 0.30, "30% of mit → abate", "YES"])
-ws1.append(["Tucson", "Reconstruction Average", 7452, "Per job, from client data", "YES"])
-ws1.append(["Tucson", "Reconstruction Conversion %", 0.55, "55% of mit → recon", "YES"])
-ws1.append(["Tucson", "LTV Per Job (Calculated)", round(tucson['ltv']), "Mit + (Abate% × Abate) + (Recon% × Recon)", "AUTO"])
-ws1.append(["", "", "", "", ""])
-
-# Denver
-ws1.append(["DENVER MARKET DATA", "", "", "", ""])
-ws1.append(["Denver", "Max Monthly Website Leads", 35, "At full 18-month maturity", "YES"])
-ws1.append(["Denver", "Max Monthly PPC Leads", 30, "At full ad spend", "YES"])
-ws1.append(["Denver", "Max Monthly GBP Leads", 50, "At full GBP maturity", "YES"])
-ws1.append(["Denver", "Cost Per Qualified Lead (PPC)", 800, "Water damage CPL", "YES"])
-ws1.append(["Denver", "Mitigation Average", 6100, "Per job, from client data", "YES"])
-ws1.append(["Denver", "Recon Referral Fee", 0, "Refer out, no direct rev", "YES"])
-ws1.append(["Denver", "LTV Per Job (Calculated)", round(denver['ltv']), "Mit + Referral Fee", "AUTO"])
-ws1.append(["", "", "", "", ""])
-
-# Ramp schedules
-ws1.append(["RAMP SCHEDULES (Conservative)", "Quarter", "Ads %", "GBP %", "Website %"])
-for q_label, ramp in ramps.items():
-    ws1.append(["Ramp", q_label, ramp['ads'], ramp['gbp'], ramp['web']])
-ws1.append(["", "", "", "", ""])
-
-# Ramp justification
-ws1.append(["RAMP JUSTIFICATION", "", "", "", ""])
-ws1.append(["Ads (Fastest)", "Q1: 30% testing", "Q2: 60% optimizing", "Q5-Q6: 100% mature", "90-day sprint, then scale"])
-ws1.append(["GBP (Medium)", "Q1: 10% just live", "Q3: 45% building reviews", "Q6: 100% mature", "4-6 month typical build"])
-ws1.append(["Website (Slowest)", "Q1-Q2: 0% no traffic", "Q3: 5% first rankings", "Q6: 60% still growing", "12-18 months to full maturity"])
-
-# Format
-for row in ws1.iter_rows(min_row=2, max_row=ws1.max_row):
-    for cell in row:
-        cell.border = thin_border
-    
-    # Format values
-    val = row[2].value
-    param = str(row[1].value) if row[1].value else ""
-    
-    if isinstance(val, float) and 0 < val <= 1:
-        row[2].number_format = pct_fmt
-    elif any(word in param for word in ["Cost", "Average", "Fee", "LTV", "Mitigation", "Abatement", "Reconstruction"]):
-        if isinstance(val, (int, float)) and val > 1:
-            row[2].number_format = money_fmt
-    
-    # Section headers
-    cat = str(row[0].value) if row[0].value else ""
-    if cat.isupper() and len(cat) > 3:
-        for cell in row:
-            cell.fill = section_fill
-            cell.font = Font(bold=True)
-    
-    # Highlight adjustable inputs
-    if row[4].value == "YES":
-        row[2].fill = input_fill
 
-# Format ramp percentages  
-for row in ws1.iter_rows(min_row=2, max_row=ws1.max_row):
-    if row[0].value == "Ramp":
-        for cell in [row[2], row[3], row[4]]:
-            if isinstance(cell.value, float):
-                cell.number_format = pct_fmt
-                cell.fill = ramp_fill
+def format_assumption_values(ws1):
+    """Number formats and ramp fills that follow the values (report_template.py reapplies them)"""
+    from openpyxl.styles import PatternFill
+    from workbook_styles import ramp_fill, money_fmt, pct_fmt
+
+    for row in ws1.iter_rows(min_row=2, max_row=ws1.max_row):
+        # Format values
+        val = row[2].value
+        param = str(row[1].value) if row[1].value else ""
 
-auto_width(ws1)
+        if isinstance(val, float) and 0 < val <= 1:
+            row[2].number_format = pct_fmt
+        elif (any(word in param for word in ["Cost", "Average", "Fee", "LTV", "Mitigation", "Abatement", "Reconstruction"])
+              and isinstance(val, (int, float)) and val > 1):
+            row[2].number_format = money_fmt
+        else:
+            row[2].number_format = 'General'
+
+    # Format ramp percentages
+    for row in ws1.iter_rows(min_row=2, max_row=ws1.max_row):
+        if row[0].value == "Ramp":
+            for cell in [row[2], row[3], row[4]]:
+                if isinstance(cell.value, float):
+                    cell.number_format = pct_fmt
+                    cell.fill = ramp_fill
+                else:
+                    cell.number_format = 'General'
+                    cell.fill = PatternFill()
 
 
 # ============================================================
-# TAB 2: TUCSON PROJECTIONS
+# TABS 2-3: MARKET PROJECTIONS
 # ============================================================
-ws2 = wb.create_sheet("Tucson Projections")
-
 headers = [
     "Quarter", "Months",
     "Website Leads", "PPC Leads", "GBP Leads", "Total Qualified Leads",
     "Ad Spend (Google)", "Mgmt Fee Share", "Total Cost",
     "Jobs Closed", "Revenue (Qtr)", "Monthly Revenue (Avg)", "ROI"
 ]
-ws2.append(headers)
-style_header(ws2)
-
-month_labels = ["1-3", "4-6", "7-9", "10-12", "13-15", "16-18"]
-
-for i, row_data in enumerate(tucson_data):
-    ws2.append([
-        row_data['quarter'], month_labels[i],
-        row_data['web_leads'], row_data['ppc_leads'], row_data['gbp_leads'], row_data['total_leads'],
-        row_data['ad_spend'], row_data['mgmt_fee'], row_data['total_cost'],
-        row_data['jobs'], row_data['revenue'], row_data['monthly_rev'], row_data['roi']
-    ])
-
-# Totals
-ws2.append([
-    'TOTAL', '1-18',
-    sum(d['web_leads'] for d in tucson_data),
-    sum(d['ppc_leads'] for d in tucson_data),
-    sum(d['gbp_leads'] for d in tucson_data),
-    sum(d['total_leads'] for d in tucson_data),
-    sum(d['ad_spend'] for d in tucson_data),
-    sum(d['mgmt_fee'] for d in tucson_data),
-    sum(d['total_cost'] for d in tucson_data),
-    sum(d['jobs'] for d in tucson_data),
-    sum(d['revenue'] for d in tucson_data),
-    None,  # No avg for totals
-    round(sum(d['revenue'] for d in tucson_data) / sum(d['total_cost'] for d in tucson_data), 1)
-])
-
-# Format
-for row in ws2.iter_rows(min_row=2, max_row=ws2.max_row):
-    for idx, cell in enumerate(row):
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal='center')
-        if idx in [6, 7, 8, 10, 11]:  # Money
-            cell.number_format = money_fmt
-        elif idx == 12:  # ROI
-            cell.number_format = roi_fmt
-        elif idx in [2, 3, 4, 5, 9]:  # Counts
-            cell.number_format = decimal_fmt
-    
-    if row[0].value == 'TOTAL':
-        for cell in row:
-            cell.fill = total_fill
-            cell.font = Font(bold=True)
 
-auto_width(ws2)
 
+def market_rows(frame, name, totals):
+    """Header, one row per quarter and the TOTAL row of a market tab"""
+    rows = [headers]
+    # Columns after Quarter/Months follow projection_frame.METRICS
+    for quarter, months, row_data in zip(frame.periods, frame.months, frame.rows(name)):
+        rows.append([quarter, months] + row_data)
+
+    # Totals
+    rows.append(
+        ['TOTAL', '1-18']
+        + totals[:-1]
+        + [None,  # No avg for totals
+           totals[-1]]
+    )
+    return rows
+
+
+def write_market_sheet(wb, frame, name, totals):
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (total_fill, thin_border, money_fmt, decimal_fmt, roi_fmt,
+                                 style_header, auto_width)
+
+    ws = wb.create_sheet(f"{name} Projections")
+    rows = market_rows(frame, name, totals)
+    ws.append(rows[0])
+    style_header(ws)
+    for row_data in rows[1:]:
+        ws.append(row_data)
+
+    # Format
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            cell.alignment = Alignment(horizontal='center')
+            if idx in [6, 7, 8, 10, 11]:  # Money
+                cell.number_format = money_fmt
+            elif idx == 12:  # ROI
+                cell.number_format = roi_fmt
+            elif idx in [2, 3, 4, 5, 9]:  # Counts
+                cell.number_format = decimal_fmt
 
-# ============================================================
-# TAB 3: DENVER PROJECTIONS
-# ============================================================
-ws3 = wb.create_sheet("Denver Projections")
-ws3.append(headers)
-style_header(ws3)
-
-for i, row_data in enumerate(denver_data):
-    ws3.append([
-        row_data['quarter'], month_labels[i],
-        row_data['web_leads'], row_data['ppc_leads'], row_data['gbp_leads'], row_data['total_leads'],
-        row_data['ad_spend'], row_data['mgmt_fee'], row_data['total_cost'],
-        row_data['jobs'], row_data['revenue'], row_data['monthly_rev'], row_data['roi']
-    ])
-
-ws3.append([
-    'TOTAL', '1-18',
-    sum(d['web_leads'] for d in denver_data),
-    sum(d['ppc_leads'] for d in denver_data),
-    sum(d['gbp_leads'] for d in denver_data),
-    sum(d['total_leads'] for d in denver_data),
-    sum(d['ad_spend'] for d in denver_data),
-    sum(d['mgmt_fee'] for d in denver_data),
-    sum(d['total_cost'] for d in denver_data),
-    sum(d['jobs'] for d in denver_data),
-    sum(d['revenue'] for d in denver_data),
-    None,
-    round(sum(d['revenue'] for d in denver_data) / sum(d['total_cost'] for d in denver_data), 1)
-])
-
-for row in ws3.iter_rows(min_row=2, max_row=ws3.max_row):
-    for idx, cell in enumerate(row):
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal='center')
-        if idx in [6, 7, 8, 10, 11]:
-            cell.number_format = money_fmt
-        elif idx == 12:
-            cell.number_format = roi_fmt
-        elif idx in [2, 3, 4, 5, 9]:
-            cell.number_format = decimal_fmt
-    if row[0].value == 'TOTAL':
-        for cell in row:
-            cell.fill = total_fill
-            cell.font = Font(bold=True)
+        if row[0].value == 'TOTAL':
+            for cell in row:
+                cell.fill = total_fill
+                cell.font = Font(bold=True)
 
-auto_width(ws3)
+    auto_width(ws)
 
 
 # ============================================================
 # TAB 4: COMBINED SUMMARY
 # ============================================================
-ws4 = wb.create_sheet("Combined Summary")
-
-combined_headers = [
-    "Quarter", "Months",
-    "Tucson Leads", "Denver Leads", "Total Qualified Leads",
-    "Total Ad Spend", "Total Mgmt Fees", "Total Investment",
-    "Total Jobs", "Total Revenue (Qtr)",
-    "Monthly Revenue (Avg)", "Combined ROI",
-    "$300k Goal Progress"
-]
-ws4.append(combined_headers)
-style_header(ws4)
-
-combined_data = []
-for i in range(6):
-    t = tucson_data[i]
-    d = denver_data[i]
-    
-    total_leads = t['total_leads'] + d['total_leads']
-    total_ad = t['ad_spend'] + d['ad_spend']
-    total_mgmt = t['mgmt_fee'] + d['mgmt_fee']
-    total_inv = t['total_cost'] + d['total_cost']
-    total_jobs = t['jobs'] + d['jobs']
-    total_rev = t['revenue'] + d['revenue']
-    monthly_rev = total_rev / 3
-    combined_roi = total_rev / total_inv if total_inv > 0 else 0
-    goal_pct = monthly_rev / 300000
-    
-    row_data = [
-        t['quarter'], month_labels[i],
-        t['total_leads'], d['total_leads'], round(total_leads, 1),
-        round(total_ad), round(total_mgmt), round(total_inv),
-        round(total_jobs, 1), round(total_rev),
-        round(monthly_rev), round(combined_roi, 1),
-        goal_pct
-    ]
-    combined_data.append(row_data)
-    ws4.append(row_data)
-
-# Totals
-total_rev_all = sum(r[9] for r in combined_data)
-total_inv_all = sum(r[7] for r in combined_data)
-ws4.append([
-    'TOTAL', '1-18',
-    sum(r[2] for r in combined_data),
-    sum(r[3] for r in combined_data),
-    sum(r[4] for r in combined_data),
-    sum(r[5] for r in combined_data),
-    sum(r[6] for r in combined_data),
-    total_inv_all,
-    sum(r[8] for r in combined_data),
-    total_rev_all,
-    None,
-    round(total_rev_all / total_inv_all, 1),
-    None
-])
-
-# Goal status rows
-ws4.append([])
-q6_monthly = combined_data[-1][10]
-ws4.append(["", "", "", "", "", "", "", "", "", "Q6 Monthly Revenue:", q6_monthly, "", ""])
-ws4.append(["", "", "", "", "", "", "", "", "", "Target:", 300000, "", ""])
-ws4.append(["", "", "", "", "", "", "", "", "", "Status:", 
-            "GOAL MET" if q6_monthly >= 300000 else "BELOW TARGET",
-            "", ""])
-
-# Format
-for row in ws4.iter_rows(min_row=2, max_row=ws4.max_row):
-    for idx, cell in enumerate(row):
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal='center')
-        
-        if idx in [5, 6, 7, 9, 10]:  # Money
-            cell.number_format = money_fmt
-        elif idx == 11:  # ROI
-            cell.number_format = roi_fmt
-        elif idx == 12:  # Goal %
-            cell.number_format = '0%'
-        elif idx in [2, 3, 4, 8]:  # Counts
-            cell.number_format = decimal_fmt
-    
-    if row[0].value == 'TOTAL':
-        for cell in row:
-            cell.fill = total_fill
-            cell.font = Font(bold=True)
-
-# Color the goal progress column
-for row_idx in range(2, 2 + len(combined_data)):
-    cell = ws4.cell(row=row_idx, column=13)
-    if cell.value:
-        if cell.value >= 1.0:
-            cell.fill = goal_met_fill
-        elif cell.value >= 0.75:
-            cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+def _combined_columns(n):
+    """Column positions after the n per-market lead columns"""
+    return range(2 + n, 12 + n)
+
+
+def payback_months(summary, flow):
+    """PAYBACK_METRICS plus cash_breakeven_month as ints (None = not reached)"""
+    values = dict({k: summary[k] for k in PAYBACK_METRICS},
+                  cash_breakeven_month=flow['breakeven_month'])
+    return {k: None if math.isnan(v) else int(v) for k, v in values.items()}
+
+
+def payback_data(general, ramps, markets):
+    """
+    {'Combined' and each market name: payback months} from the monthly engine:
+    PAYBACK_METRICS on booked revenue plus cash_flow.py's cash breakeven month
+    (collections lag the booking). None = not within the projection.
+    """
+    from cash_flow import cash_flow
+
+    inputs = {m['name']: market_inputs(m, general, ramps) for m in markets}
+    results, combined = evaluate(inputs)
+    per_market, combined_cash = cash_flow(inputs, results=results)
+
+    out = {'Combined': payback_months(combined, combined_cash)}
+    out.update((name, payback_months(market_summary(r), per_market[name]))
+               for name, r in results.items())
+    return out
+
+
+def combined_rows(frame, payback=None):
+    """
+    Header, quarter rows, TOTAL row, payback rows (when payback_data()'s
+    'Combined' entry is given) and goal status rows of the Combined Summary
+    """
+    n = len(frame)
+    combined = frame.combined()
+
+    combined_headers = (
+        ["Quarter", "Months"]
+        + [f"{name} Leads" for name in frame.markets]
+        + ["Total Qualified Leads",
+           "Total Ad Spend", "Total Mgmt Fees", "Total Investment",
+           "Total Jobs", "Total Revenue (Qtr)",
+           "Monthly Revenue (Avg)", "Combined ROI", "Cumulative ROI",
+           f"${goal_monthly // 1000}k Goal Progress"]
+    )
+    rows = [combined_headers]
+
+    market_leads = frame['total_leads'].T.tolist()
+    totals_by_quarter = combined.rows(0, ('total_leads', 'ad_spend', 'mgmt_fee', 'total_cost',
+                                          'jobs', 'revenue', 'monthly_rev', 'roi', 'goal_pct'))
+    combined_data = []
+    cum_rev = cum_inv = 0
+    for quarter, months, leads, c in zip(combined.periods, combined.months,
+                                         market_leads, totals_by_quarter):
+        # Revenue and investment to date, from the rounded quarter figures
+        cum_rev, cum_inv = cum_rev + c[5], cum_inv + c[3]
+        cum_roi = round(cum_rev / cum_inv, 1) if cum_inv > 0 else 0
+        row_data = [quarter, months] + leads + c[:-1] + [cum_roi, c[-1]]
+        combined_data.append(row_data)
+    rows.extend(combined_data)
+
+    leads_col, ad_col, mgmt_col, inv_col, jobs_col, rev_col, mo_col, roi_col, cum_col, goal_col = _combined_columns(n)
+
+    # Totals
+    total_rev_all = sum(r[rev_col] for r in combined_data)
+    total_inv_all = sum(r[inv_col] for r in combined_data)
+    rows.append(
+        ['TOTAL', '1-18']
+        + [sum(r[2 + j] for r in combined_data) for j in range(n)]
+        + [sum(r[leads_col] for r in combined_data),
+           sum(r[ad_col] for r in combined_data),
+           sum(r[mgmt_col] for r in combined_data),
+           total_inv_all,
+           sum(r[jobs_col] for r in combined_data),
+           total_rev_all,
+           None,
+           round(total_rev_all / total_inv_all, 1),
+           None,
+           None]
+    )
+    pad = [""] * rev_col
+
+    # Payback rows
+    if payback is not None:
+        horizon = f"Not by month {len(combined.periods) * MONTHS_PER_QUARTER}"
+        rows.append([])
+        for label, key in (("Payback Month:", 'payback_month'),
+                           ("Run-Rate Breakeven Month:", 'run_rate_breakeven_month'),
+                           ("Cash Breakeven Month:", 'cash_breakeven_month')):
+            rows.append(pad + [label, horizon if payback[key] is None else payback[key], "", ""])
+
+    # Goal status rows
+    rows.append([])
+    q6_monthly = combined_data[-1][mo_col]
+    rows.append(pad + ["Q6 Monthly Revenue:", q6_monthly, "", ""])
+    rows.append(pad + ["Target:", goal_monthly, "", ""])
+    rows.append(pad + ["Status:",
+                       "GOAL MET" if q6_monthly >= goal_monthly else "BELOW TARGET",
+                       "", ""])
+    return rows
+
+
+def write_combined_sheet(wb, frame, payback=None):
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (total_fill, thin_border, money_fmt, decimal_fmt, roi_fmt,
+                                 style_header, auto_width)
+
+    ws4 = wb.create_sheet("Combined Summary")
+    n = len(frame)
+    rows = combined_rows(frame, payback)
+    ws4.append(rows[0])
+    style_header(ws4)
+    for row_data in rows[1:]:
+        ws4.append(row_data)
+    leads_col, ad_col, mgmt_col, inv_col, jobs_col, rev_col, mo_col, roi_col, cum_col, goal_col = _combined_columns(n)
+
+    # Format
+    for row in ws4.iter_rows(min_row=2, max_row=ws4.max_row):
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            cell.alignment = Alignment(horizontal='center')
+
+            if idx in [ad_col, mgmt_col, inv_col, rev_col, mo_col]:  # Money
+                cell.number_format = money_fmt
+            elif idx in [roi_col, cum_col]:  # ROI
+                cell.number_format = roi_fmt
+            elif idx == goal_col:  # Goal %
+                cell.number_format = '0%'
+            elif 2 <= idx <= leads_col or idx == jobs_col:  # Counts
+                cell.number_format = decimal_fmt
+
+        if row[0].value == 'TOTAL':
+            for cell in row:
+                cell.fill = total_fill
+                cell.font = Font(bold=True)
+
+    # Style payback rows (month numbers, not money)
+    for row in ws4.iter_rows(min_row=2, max_row=ws4.max_row - 4):
+        if isinstance(row[rev_col].value, str) and row[rev_col].value.endswith("Month:"):
+            for cell in row:
+                cell.font = Font(bold=True)
+            row[mo_col].number_format = 'General'
+
+    # Style goal status
+    for row_idx in range(ws4.max_row - 2, ws4.max_row + 1):
+        for cell in ws4[row_idx]:
+            cell.font = Font(bold=True, size=12)
+        ws4.cell(row=row_idx, column=mo_col + 1).number_format = money_fmt
+
+    color_goal_cells(ws4)
+    auto_width(ws4)
+
+
+def color_goal_cells(ws4):
+    """Fills that follow the values: goal progress per quarter and the status cell"""
+    from openpyxl.styles import Font, PatternFill
+    from workbook_styles import goal_met_fill, goal_miss_fill
+
+    n = sum(1 for cell in ws4[1] if cell.value is not None) - 12
+    periods = next(r for r in range(2, ws4.max_row + 1) if ws4.cell(row=r, column=1).value == 'TOTAL') - 2
+    mo_col, goal_col = _combined_columns(n)[6], _combined_columns(n)[9]
+    # Color the goal progress column
+    for row_idx in range(2, 2 + periods):
+        cell = ws4.cell(row=row_idx, column=goal_col + 1)
+        if cell.value:
+            if cell.value >= 1.0:
+                cell.fill = goal_met_fill
+            elif cell.value >= 0.75:
+                cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+            else:
+                cell.fill = goal_miss_fill
         else:
-            cell.fill = goal_miss_fill
-
-# Style goal status
-for row_idx in range(ws4.max_row - 2, ws4.max_row + 1):
-    for cell in ws4[row_idx]:
-        cell.font = Font(bold=True, size=12)
-    ws4.cell(row=row_idx, column=11).number_format = money_fmt
+            cell.fill = PatternFill()  # a template's fill from another client
 
-if q6_monthly >= 300000:
-    ws4.cell(row=ws4.max_row, column=11).fill = goal_met_fill
-    ws4.cell(row=ws4.max_row, column=11).font = Font(bold=True, size=14, color="006100")
-else:
-    ws4.cell(row=ws4.max_row, column=11).fill = goal_miss_fill
-
-auto_width(ws4)
+    status = ws4.cell(row=ws4.max_row, column=mo_col + 1)
+    if status.value == "GOAL MET":
+        status.fill = goal_met_fill
+        status.font = Font(bold=True, size=14, color="006100")
+    else:
+        status.fill = goal_miss_fill
+        status.font = Font(bold=True, size=12)
 
 
 # ============================================================
 # TAB 5: SENSITIVITIES & NOTES
 # ============================================================
-ws5 = wb.create_sheet("Sensitivities & Notes")
-
-ws5.append(["Scenario", "Variable", "Change", "Q6 Monthly Impact", "Notes"])
-style_header(ws5)
-
-# Calculate sensitivities
-base_q6 = q6_monthly
-
-# 60% closing rate
-close_60_q6 = base_q6 * (0.60 / 0.50)
-close_40_q6 = base_q6 * (0.40 / 0.50)
-
-sensitivity_data = [
-    ["CLOSING RATE SCENARIOS", "", "", "", ""],
-    ["Closing Rate +10%", "50% → 60%", "+20% revenue", round(close_60_q6), "Strong ops, good phone skills"],
-    ["Closing Rate -10%", "50% → 40%", "-20% revenue", round(close_40_q6), "Poor intake or slow dispatch"],
-    ["", "", "", "", ""],
-    
-    ["COST PER LEAD SCENARIOS", "", "", "", ""],
-    ["CPL +20%", "Tucson $840, Denver $960", "Higher ad costs", round(base_q6), "Revenue unchanged, ROI drops ~17%"],
-    ["CPL -15% (plumbing keywords)", "Tucson $595, Denver $680", "Lower ad costs", round(base_q6), "Revenue unchanged, ROI improves ~18%"],
-    ["", "", "", "", ""],
-    
-    ["TIMELINE SCENARIOS", "", "", "", ""],
-    ["Website delays to Q4", "Web ramp: 0/0/0/5/20/45", "Slower organic", round(base_q6 * 0.88), "Still above $250k/month"],
-    ["GBP builds faster", "GBP ramp: 15/35/55/75/95/100", "+10-15% leads", round(base_q6 * 1.08), "If reviews come in strong"],
-    ["", "", "", "", ""],
-    
-    ["GROWTH ACCELERATION", "", "", "", ""],
-    ["Add plumbing keywords Q3", "New PPC category", "CPL drops 10-20%", "N/A", "Target emergency plumbing searches"],
-    ["2nd Denver GBP in Q2", "New location profile", "+20-30 leads/mo by Q4", "N/A", "Target downtown Denver market"],
-    ["2nd Tucson GBP in Q4", "New location profile", "+15-20 leads/mo by Q6", "N/A", "Target east Tucson suburbs"],
-    ["", "", "", "", ""],
-    
-    ["CONSERVATIVE MODEL NOTES", "", "", "", ""],
-    ["Ads (PPC)", "Fastest channel", "30% Q1 → 100% Q5", "", "90-day sprint, conservative start"],
-    ["GBP (Local SEO)", "Medium channel", "10% Q1 → 100% Q6", "", "Reviews build over 4-6 months"],
-    ["Website (Traditional SEO)", "Slowest channel", "0% Q1-Q2 → 60% Q6", "", "12-18 months for real organic traffic"],
-    ["Website NOT at 100% by Q6", "Still growing post-Q6", "60% at month 18", "", "Continued growth beyond 18 months"],
-    ["", "", "", "", ""],
-    
-    ["FORMULAS", "", "", "", ""],
-    ["Qualified Leads (Qtr)", "=Max Monthly Leads × Ramp% × Qualified% × 3", "", "", "3 months per quarter"],
-    ["Ad Spend (Qtr)", "=Qualified PPC Leads × CPL", "", "", "CPL is cost per QUALIFIED lead"],
-    ["Mgmt Fee (Qtr)", "=$5,500 ÷ 2 × 3 months", "", "", "$2,750/location/month"],
-    ["Jobs (Qtr)", "=Total Qualified Leads × Closing Rate", "", "", "50% close rate baseline"],
-    ["Revenue (Qtr)", "=Jobs × LTV per Job", "", "", "Tucson $10,933 / Denver $6,100"],
-    ["ROI", "=Quarterly Revenue ÷ Quarterly Total Cost", "", "", ""],
-    ["Tucson LTV", "=$4,589 + (30% × $7,484) + (55% × $7,452)", "", "$10,933", ""],
-    ["Denver LTV", "=$6,100 + $0 referral fee", "", "$6,100", ""],
-]
+def _money(value):
+    return f"${round(value):,}"
+
+
+def _ltv_formula(m):
+    parts = [_money(m['mit_avg'])]
+    for conv, avg in (('abate_conv', 'abate_avg'), ('recon_conv', 'recon_avg')):
+        if conv in m:
+            parts.append(f"({m[conv]:.0%} × {_money(m[avg])})")
+    if 'recon_fee' in m:
+        parts.append(f"{_money(m['recon_fee'])} referral fee")
+    return "=" + " + ".join(parts)
+
+
+def sensitivity_rows(general, markets, q6_monthly, growth=None):
+    """
+    Header plus the scenario, notes and formula rows of Sensitivities & Notes.
+    growth: {GROWTH ACCELERATION row: change in Q6 monthly revenue}
+    (growth_levers.sheet_impacts()); rows without one show N/A.
+    """
+    # Calculate sensitivities
+    base_q6 = q6_monthly
+    close = general['closing_rate']
+    n = len(markets)
+    fee_total = general['mgmt_fee_monthly'] * n
+
+    # Closing rate ±10 points (revenue scales with the closing rate)
+    close_up_q6 = base_q6 * ((close + 0.10) / close)
+    close_down_q6 = base_q6 * ((close - 0.10) / close)
+
+    def with_lever(row):
+        return round(base_q6 + growth[row]) if row in (growth or {}) else "N/A"
+
+    def cpl_at(factor):
+        return ", ".join(f"{m['name']} {_money(m['cpl'] * factor)}" for m in markets)
+
+    sensitivity_data = [
+        ["Scenario", "Variable", "Change", "Q6 Monthly Impact", "Notes"],
+        ["CLOSING RATE SCENARIOS", "", "", "", ""],
+        ["Closing Rate +10%", f"{close:.0%} → {close + 0.10:.0%}", "+20% revenue", round(close_up_q6), "Strong ops, good phone skills"],
+        ["Closing Rate -10%", f"{close:.0%} → {close - 0.10:.0%}", "-20% revenue", round(close_down_q6), "Poor intake or slow dispatch"],
+        ["", "", "", "", ""],
+
+        ["COST PER LEAD SCENARIOS", "", "", "", ""],
+        ["CPL +20%", cpl_at(1.20), "Higher ad costs", round(base_q6), "Revenue unchanged, ROI drops ~17%"],
+        ["CPL -15% (plumbing keywords)", cpl_at(0.85), "Lower ad costs", round(base_q6), "Revenue unchanged, ROI improves ~18%"],
+        ["", "", "", "", ""],
+
+        ["TIMELINE SCENARIOS", "", "", "", ""],
+        ["Website delays to Q4", "Web ramp: 0/0/0/5/20/45", "Slower organic", round(base_q6 * 0.88), "Still above $250k/month"],
+        ["GBP builds faster", "GBP ramp: 15/35/55/75/95/100", "+10-15% leads", round(base_q6 * 1.08), "If reviews come in strong"],
+        ["", "", "", "", ""],
+
+        ["GROWTH ACCELERATION", "", "", "", ""],
+        ["Add plumbing keywords Q3", "New PPC category", "CPL drops 10-20%", with_lever("Add plumbing keywords Q3"), "Target emergency plumbing searches"],
+        ["2nd Denver GBP in Q2", "New location profile", "+20-30 leads/mo by Q4", with_lever("2nd Denver GBP in Q2"), "Target downtown Denver market"],
+        ["2nd Tucson GBP in Q4", "New location profile", "+15-20 leads/mo by Q6", with_lever("2nd Tucson GBP in Q4"), "Target east Tucson suburbs"],
+        ["", "", "", "", ""],
+
+        ["CONSERVATIVE MODEL NOTES", "", "", "", ""],
+        ["Ads (PPC)", "Fastest channel", "30% Q1 → 100% Q5", "", "90-day sprint, conservative start"],
+        ["GBP (Local SEO)", "Medium channel", "10% Q1 → 100% Q6", "", "Reviews build over 4-6 months"],
+        ["Website (Traditional SEO)", "Slowest channel", "0% Q1-Q2 → 60% Q6", "", "12-18 months for real organic traffic"],
+        ["Website NOT at 100% by Q6", "Still growing post-Q6", "60% at month 18", "", "Continued growth beyond 18 months"],
+        ["", "", "", "", ""],
+
+        ["FORMULAS", "", "", "", ""],
+        ["Qualified Leads (Qtr)", "=Max Monthly Leads × Ramp% × Qualified% × 3", "", "", "3 months per quarter"],
+        ["Ad Spend (Qtr)", "=Qualified PPC Leads × CPL", "", "", "CPL is cost per QUALIFIED lead"],
+        ["Mgmt Fee (Qtr)", f"={_money(fee_total)} ÷ {n} × 3 months", "", "", f"{_money(general['mgmt_fee_monthly'])}/location/month"],
+        ["Jobs (Qtr)", "=Total Qualified Leads × Closing Rate", "", "", f"{close:.0%} close rate baseline"],
+        ["Revenue (Qtr)", "=Jobs × LTV per Job", "", "", " / ".join(f"{m['name']} {_money(m['ltv'])}" for m in markets)],
+        ["ROI", "=Quarterly Revenue ÷ Quarterly Total Cost", "", "", ""],
+    ]
+    for m in markets:
+        sensitivity_data.append([f"{m['name']} LTV", _ltv_formula(m), "", _money(m['ltv']), ""])
+    return sensitivity_data
+
 
-for row_data in sensitivity_data:
-    ws5.append(row_data)
+def write_sensitivities_sheet(wb, general, markets, q6_monthly, growth=None):
+    from openpyxl.styles import Font
+    from workbook_styles import section_fill, thin_border, style_header, auto_width
 
-for row in ws5.iter_rows(min_row=2, max_row=ws5.max_row):
-    for cell in row:
-        cell.border = thin_border
-    
-    cat = str(row[0].value) if row[0].value else ""
-    if cat.isupper() and len(cat) > 3:
+    ws5 = wb.create_sheet("Sensitivities & Notes")
+    rows = sensitivity_rows(general, markets, q6_monthly, growth)
+    ws5.append(rows[0])
+    style_header(ws5)
+    for row_data in rows[1:]:
+        ws5.append(row_data)
+
+    for row in ws5.iter_rows(min_row=2, max_row=ws5.max_row):
         for cell in row:
-            cell.fill = section_fill
-            cell.font = Font(bold=True)
-    
-    # Money format for impact column
-    if isinstance(row[3].value, (int, float)) and row[3].value > 1000:
-        row[3].number_format = money_fmt
+            cell.border = thin_border
+
+        cat = str(row[0].value) if row[0].value else ""
+        if cat.isupper() and len(cat) > 3:
+            for cell in row:
+                cell.fill = section_fill
+                cell.font = Font(bold=True)
+
+    format_sensitivity_values(ws5)
+    auto_width(ws5)
 
-auto_width(ws5)
+
+def format_sensitivity_values(ws5):
+    """Money format for impact column (report_template.py reapplies it)"""
+    from workbook_styles import money_fmt
+
+    for row in ws5.iter_rows(min_row=2, max_row=ws5.max_row):
+        if isinstance(row[3].value, (int, float)) and row[3].value > 1000:
+            row[3].number_format = money_fmt
+        else:
+            row[3].number_format = 'General'
+
+
+# Styling that depends on cell values rather than layout, by sheet title
+VALUE_STYLES = {
+    SHEET_TITLE: format_assumption_values,
+    "Combined Summary": color_goal_cells,
+    "Sensitivities & Notes": format_sensitivity_values,
+}
+
+
+# ============================================================
+# BUILD WORKBOOK
+# ============================================================
+# Tab selector keys, in workbook order; 'markets' stands for every market tab
+# and a market's slug ('tucson', 'denver') for just that one.
+TABS = ('assumptions', 'markets', 'combined', 'sensitivities', 'marginal', 'sobol')
+
+
+def compute(assumptions=None):
+    """Engine only (no openpyxl): the result dict build_workbook() returns"""
+    general, ramps, markets = resolve_assumptions(assumptions)
+    frame = ProjectionFrame.compute(general, ramps, markets)
+    return {'general': general, 'ramps': ramps, 'markets': markets,
+            'frame': frame, 'summary': frame.summary(),
+            'payback': payback_data(general, ramps, markets)}
+
+
+def select_tabs(tabs, markets):
+    """Set of tab keys to render; tabs=None or 'all' means every tab"""
+    market_keys = [slug(m['name']) for m in markets]
+    if tabs is None or tabs == 'all':
+        return set(TABS) | set(market_keys)
+    if isinstance(tabs, str):
+        tabs = [t for t in tabs.split(',') if t.strip()]
+    selected = set()
+    for tab in (t.strip().lower() for t in tabs):
+        if tab == 'markets':
+            selected.update(market_keys)
+        elif tab in TABS or tab in market_keys:
+            selected.add(tab)
+        else:
+            raise ValueError(f"unknown tab {tab!r}; choose from "
+                             f"{', '.join(TABS[:1] + tuple(market_keys) + TABS[1:])}")
+    if not selected:
+        raise ValueError("no tabs selected")
+    return selected
+
+
+def build_workbook(assumptions=None, sobol_samples=0, tabs=None):
+    """
+    (wb, result) for one assumption dict (None = the v2 defaults).
+    result has 'markets', 'frame' (a ProjectionFrame) and 'summary';
+    tabs picks which tabs to render (see select_tabs). The Global
+    Sensitivity tab is opt-in: it is only written when sobol_samples > 0.
+    """
+    from openpyxl import Workbook
+
+    result = compute(assumptions)
+    general, ramps, markets = result['general'], result['ramps'], result['markets']
+    frame, summary = result['frame'], result['summary']
+    selected = select_tabs(tabs, markets)
+
+    wb = Workbook()
+    if 'assumptions' in selected:
+        write_assumptions_sheet(wb.active, general, ramps, markets)
+    else:
+        wb.remove(wb.active)
+    totals = frame.totals()
+    total_rows = [totals[k].tolist() for k in ADDITIVE_METRICS + ('roi',)]
+    for i, m in enumerate(markets):
+        if slug(m['name']) in selected:
+            write_market_sheet(wb, frame, m['name'], [col[i] for col in total_rows])
+    if 'combined' in selected:
+        write_combined_sheet(wb, frame, result['payback']['Combined'])
+    if 'sensitivities' in selected:
+        from growth_levers import sheet_impacts
+        write_sensitivities_sheet(wb, general, markets, summary['q6_monthly'],
+                                  sheet_impacts(assumptions))
+
+    # ============================================================
+    # TAB 6: MARGINAL IMPACT
+    # ============================================================
+    # Exact partial derivatives of the headline outputs (see marginal.py)
+    if 'marginal' in selected:
+        from marginal import marginal_impacts, add_marginal_sheet
+        add_marginal_sheet(wb, marginal_impacts(assumptions))
+
+    # ============================================================
+    # TAB 7: GLOBAL SENSITIVITY
+    # ============================================================
+    # Sobol first/total-order indices over every input (see sensitivity.py).
+    # Kept in-process: callers may run this from a worker or at import time,
+    # so it must not spawn worker processes.
+    if sobol_samples and 'sobol' in selected:
+        from sensitivity import run_sobol, add_sensitivity_sheet
+        add_sensitivity_sheet(wb, run_sobol(samples=sobol_samples, workers=1,
+                                            assumptions=assumptions))
+
+    return wb, result
+
+
+def report_rows(assumptions=None, sobol_samples=0, tabs=None):
+    """
+    (sheets, result): [(sheet title, rows)] with the values build_workbook()
+    writes, in workbook order, without openpyxl (see report_template.py)
+    """
+    result = compute(assumptions)
+    general, ramps, markets = result['general'], result['ramps'], result['markets']
+    frame, summary = result['frame'], result['summary']
+    selected = select_tabs(tabs, markets)
+
+    sheets = []
+    if 'assumptions' in selected:
+        sheets.append((SHEET_TITLE, [HEADER] + assumption_rows(general, ramps, markets)))
+    totals = frame.totals()
+    total_rows = [totals[k].tolist() for k in ADDITIVE_METRICS + ('roi',)]
+    for i, m in enumerate(markets):
+        if slug(m['name']) in selected:
+            sheets.append((f"{m['name']} Projections",
+                           market_rows(frame, m['name'], [col[i] for col in total_rows])))
+    if 'combined' in selected:
+        sheets.append(("Combined Summary", combined_rows(frame, result['payback']['Combined'])))
+    if 'sensitivities' in selected:
+        from growth_levers import sheet_impacts
+        sheets.append(("Sensitivities & Notes", sensitivity_rows(
+            general, markets, summary['q6_monthly'], sheet_impacts(assumptions))))
+    if 'marginal' in selected:
+        from marginal import marginal_impacts, marginal_rows
+        sheets.append(("Marginal Impact", marginal_rows(marginal_impacts(assumptions))))
+    if sobol_samples and 'sobol' in selected:
+        from sensitivity import run_sobol, sobol_rows
+        sheets.append(("Global Sensitivity", sobol_rows(
+            run_sobol(samples=sobol_samples, workers=1, assumptions=assumptions))))
+    return sheets, result
 
 
 # ============================================================
 # SAVE & REPORT
 # ============================================================
-output_path = "/Users/jameslarosa/Desktop/Random AI Prjects/AI Wireframe Builder/projections/Conservative_v2_Projections.xlsx"
-wb.save(output_path)
-
-print(f"✅ Created: {output_path}")
-print()
-print("=" * 65)
-print("  CONSERVATIVE 18-MONTH PROJECTION SUMMARY")
-print("=" * 65)
-print()
-print("  TUCSON (LTV: $10,933/job)")
-print("  " + "-" * 50)
-for d in tucson_data:
-    print(f"  {d['quarter']} | Leads: {d['total_leads']:6.1f} | Jobs: {d['jobs']:5.1f} | Monthly: ${d['monthly_rev']:>8,}")
-print(f"  {'TOTAL':2s} | Revenue: ${sum(d['revenue'] for d in tucson_data):>10,}")
-print()
-print("  DENVER (LTV: $6,100/job)")
-print("  " + "-" * 50)
-for d in denver_data:
-    print(f"  {d['quarter']} | Leads: {d['total_leads']:6.1f} | Jobs: {d['jobs']:5.1f} | Monthly: ${d['monthly_rev']:>8,}")
-print(f"  {'TOTAL':2s} | Revenue: ${sum(d['revenue'] for d in denver_data):>10,}")
-print()
-print("  COMBINED")
-print("  " + "-" * 50)
-for i in range(6):
-    mo_rev = tucson_data[i]['monthly_rev'] + denver_data[i]['monthly_rev']
-    pct = mo_rev / 300000 * 100
-    bar = "█" * int(pct / 5) + "░" * (20 - int(pct / 5))
-    print(f"  Q{i+1} | Monthly: ${mo_rev:>8,} | {bar} {pct:.0f}% of $300k")
-print()
-total_rev = sum(d['revenue'] for d in tucson_data) + sum(d['revenue'] for d in denver_data)
-total_cost = sum(d['total_cost'] for d in tucson_data) + sum(d['total_cost'] for d in denver_data)
-print(f"  18-Month Total Revenue:    ${total_rev:>10,}")
-print(f"  18-Month Total Investment: ${total_cost:>10,}")
-print(f"  Overall ROI:               {total_rev/total_cost:.1f}x")
-print(f"  Q6 Monthly Revenue:        ${q6_monthly:>10,}")
-print(f"  $300k Goal:                {'✅ MET' if q6_monthly >= 300000 else '❌ NOT MET'}")
-print()
+def print_report(result):
+    markets, frame = result['markets'], result['frame']
+    totals = frame.totals()
+    summary = result['summary']
+
+    print()
+    print("=" * 65)
+    print("  CONSERVATIVE 18-MONTH PROJECTION SUMMARY")
+    print("=" * 65)
+    print()
+    for i, m in enumerate(markets):
+        print(f"  {m['name'].upper()} (LTV: ${round(m['ltv']):,}/job)")
+        print("  " + "-" * 50)
+        for q, (leads, jobs, monthly) in zip(frame.periods, frame.rows(i, ('total_leads', 'jobs', 'monthly_rev'))):
+            print(f"  {q} | Leads: {leads:6.1f} | Jobs: {jobs:5.1f} | Monthly: ${monthly:>8,}")
+        print(f"  {'TOTAL':2s} | Revenue: ${int(totals['revenue'][i]):>10,}")
+        print()
+    print("  COMBINED")
+    print("  " + "-" * 50)
+    # Sum of the rounded per-market monthly figures, as printed above
+    for i, mo_rev in enumerate(frame['monthly_rev'].sum(axis=0).tolist()):
+        pct = mo_rev / goal_monthly * 100
+        bar = "█" * int(pct / 5) + "░" * (20 - int(pct / 5))
+        print(f"  Q{i+1} | Monthly: ${mo_rev:>8,} | {bar} {pct:.0f}% of ${goal_monthly // 1000}k")
+    print()
+    total_rev = summary['total_revenue']
+    total_cost = summary['total_investment']
+    q6_monthly = summary['q6_monthly']
+    print(f"  18-Month Total Revenue:    ${total_rev:>10,}")
+    print(f"  18-Month Total Investment: ${total_cost:>10,}")
+    print(f"  Overall ROI:               {total_rev/total_cost:.1f}x")
+    print(f"  Q6 Monthly Revenue:        ${q6_monthly:>10,}")
+    for label, key in (("Payback month:", 'payback_month'),
+                       ("Cash breakeven month:", 'cash_breakeven_month')):
+        month = result['payback']['Combined'][key]
+        print(f"  {label:27s}{month if month else 'not within the projection'}")
+    print(f"  ${goal_monthly // 1000}k Goal:                {'✅ MET' if summary['goal_met'] else '❌ NOT MET'}")
+    print()
+
+
+def summary_data(result):
+    """JSON-ready version of the console report"""
+    markets, frame, payback = result['markets'], result['frame'], result['payback']
+    totals = frame.totals()
+    return dict(result['summary'], **payback['Combined'], markets=[
+        {'name': m['name'], 'ltv': m['ltv'],
+         'total_revenue': int(totals['revenue'][i]),
+         'monthly_rev': frame['monthly_rev'][i].tolist(),
+         **payback[m['name']]}
+        for i, m in enumerate(markets)
+    ], combined_monthly_rev=frame['monthly_rev'].sum(axis=0).tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conservative 18-month projection workbook (v2)")
+    parser.add_argument('--summary-only', action='store_true',
+                        help="run the engine and print the report; no workbook (or openpyxl)")
+    parser.add_argument('--json', action='store_true',
+                        help="print the summary as JSON instead of the report (implies --summary-only)")
+    parser.add_argument('--tabs', default=None,
+                        help="comma-separated tabs to render: " + ", ".join(TABS)
+                        + " or a market name (default: all)")
+    parser.add_argument('--sobol-samples', type=int, default=0,
+                        help="include the Global Sensitivity tab (N rows; default: leave it out)")
+    args = parser.parse_args()
+
+    if args.summary_only or args.json:
+        result = compute()
+        if args.json:
+            print(json.dumps(summary_data(result), indent=2))
+        else:
+            print_report(result)
+        return
+
+    try:
+        wb, result = build_workbook(sobol_samples=args.sobol_samples, tabs=args.tabs)
+    except ValueError as exc:
+        parser.error(str(exc))
+    wb.save(output_path)
+    print(f"✅ Created: {output_path}")
+    print_report(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,8 @@ Generate 18-Month Conservative Projection Model for Restoration Marketing
 Goal: $300k/month combined revenue by Q6
 """
 
+import os
+
 try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
@@ -479,7 +481,9 @@ for row in ws5.iter_rows(min_row=2, max_row=ws5.max_row):
 auto_width(ws5)
 
 # Save file
-output_path = "/Users/jameslarosa/Desktop/Random AI Prjects/AI Wireframe Builder/projections/Conservative_18Mo_Projections.xlsx"
+# PROJECTIONS_OUTPUT_DIR redirects the output (golden.py regenerates into a temp dir)
+output_dir = os.environ.get("PROJECTIONS_OUTPUT_DIR", "/Users/jameslarosa/Desktop/Random AI Prjects/AI Wireframe Builder/projections")
+output_path = os.path.join(output_dir, "Conservative_18Mo_Projections.xlsx")
 wb.save(output_path)
 print(f"✅ Created: {output_path}")
 print(f"\n📊 Key Results:")
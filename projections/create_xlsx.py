@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Generate Excel file with all projection tabs"""
 
+import os
+
 try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
@@ -238,6 +240,8 @@ for row in ws5.iter_rows(min_row=2):
 auto_width(ws5)
 
 # Save
-output_path = "/Users/jameslarosa/Desktop/Random AI Prjects/AI Wireframe Builder/projections/18_Month_Projections.xlsx"
+# PROJECTIONS_OUTPUT_DIR redirects the output (golden.py regenerates into a temp dir)
+output_dir = os.environ.get("PROJECTIONS_OUTPUT_DIR", "/Users/jameslarosa/Desktop/Random AI Prjects/AI Wireframe Builder/projections")
+output_path = os.path.join(output_dir, "18_Month_Projections.xlsx")
 wb.save(output_path)
 print(f"✅ Created: {output_path}")
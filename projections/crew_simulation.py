@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Crew-Capacity Simulation
+The v2 model turns every qualified lead × closing rate into a job. Here jobs
+need crews: a discrete-event simulation per market where sold jobs arrive
+over time, each phase (mitigation → abatement → reconstruction) holds one
+crew for a number of crew-days, and work that cannot start within its
+patience window is lost to a competitor. Crews are hired with a lead time
+when the previous month ran hot.
+
+Reports realized vs sold jobs, crew utilization, revenue actually earned
+inside the 18 months, and revenue lost to capacity, with P10/P90 across
+replications.
+
+Event loop: arrivals are drawn up front (Poisson per month, vectorized) and
+merged with a per-market heap of crew-finish, hire and month-end review
+events, so the heap only ever holds work in progress. Markets and
+replications are independent and can be spread across processes.
+
+CREW_DEFAULTS, CREW_DAYS and PATIENCE_DAYS are illustrative; set them per
+client (crew counts, typical job lengths) before quoting results.
+
+Usage:
+  python3 crew_simulation.py                                 # v2 markets, 200 replications
+  python3 crew_simulation.py --replications 1000 --crews tucson=3,denver=5 --json
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, market_ramps
+from projection_frame import ProjectionFrame
+from vector_engine import MONTHS_PER_QUARTER, slug
+
+DAYS_PER_MONTH = 30
+PHASES = ('mit', 'abate', 'recon')
+CREW_DAYS = {'mit': 4.0, 'abate': 6.0, 'recon': 18.0}      # mean crew-days per phase
+DURATION_SHAPE = 4.0                                         # gamma shape (CV 50%)
+PATIENCE_DAYS = {'mit': 1.0, 'abate': 10.0, 'recon': 30.0}  # emergency vs scheduled work
+
+CREW_DEFAULTS = {
+    'Tucson': {'crews': 2, 'max_crews': 8},
+    'Denver': {'crews': 3, 'max_crews': 12},
+}
+DEFAULT_CREW = {'crews': 2, 'max_crews': 10}
+HIRE_LEAD_DAYS = 45
+HIRE_UTILIZATION = 0.85  # hire when a month's utilization reaches this (or work was lost)
+
+MONTHLY_OUTPUTS = ('jobs_sold', 'jobs_done', 'jobs_lost', 'revenue', 'lost_revenue',
+                   'busy_days', 'crew_days', 'crews')
+PARALLEL_MIN_RUNS = 2000
+
+_FINISH, _HIRE, _REVIEW = 0, 1, 2
+
+
+# ============================================================
+# INPUTS
+# ============================================================
+def monthly_job_rates(market, general, ramps):
+    """Expected sold jobs per month (the v2 quarter figures spread evenly)"""
+    per_quarter = [(market['max_web'] * r['web'] + market['max_ppc'] * r['ads']
+                    + market['max_gbp'] * r['gbp']) * general['qualified_rate']
+                   * general['closing_rate'] for r in market_ramps(market, ramps).values()]
+    return np.repeat(per_quarter, MONTHS_PER_QUARTER)
+
+
+def phase_revenue(market):
+    """Revenue earned when each phase completes; a referral fee lands with mitigation"""
+    return (market.get('mit_avg', 0) + market.get('recon_fee', 0),
+            market.get('abate_avg', 0),
+            market.get('recon_avg', 0))
+
+
+def crew_settings(market, crews=None):
+    setting = dict(CREW_DEFAULTS.get(market['name'], DEFAULT_CREW))
+    setting.setdefault('hire_lead_days', HIRE_LEAD_DAYS)
+    setting.setdefault('hire_utilization', HIRE_UTILIZATION)
+    setting.update((crews or {}).get(slug(market['name']), {}))
+    return setting
+
+
+# ============================================================
+# EVENT LOOP
+# ============================================================
+def simulate_market(market, job_rates, crew, rng, dpm=DAYS_PER_MONTH):
+    """One replication for one market -> {output: (months,) array}"""
+    months = len(job_rates)
+    horizon = months * dpm
+
+    counts = rng.poisson(job_rates)
+    n = int(counts.sum())
+    arrive = np.sort((np.repeat(np.arange(months), counts) + rng.random(n)) * dpm).tolist()
+    needs = [np.ones(n, dtype=bool),
+             rng.random(n) < market.get('abate_conv', 0),
+             rng.random(n) < (market.get('recon_conv', 0) if 'recon_avg' in market else 0)]
+    durations = [rng.gamma(DURATION_SHAPE, CREW_DAYS[p] / DURATION_SHAPE, n).tolist()
+                 for p in PHASES]
+    needs = [a.tolist() for a in needs]
+    revenue = phase_revenue(market)
+    patience = [PATIENCE_DAYS[p] for p in PHASES]
+
+    # Plain lists in the loop: scalar updates on numpy arrays are much slower
+    out = {k: [0.0] * months for k in MONTHLY_OUTPUTS}
+    done, lost = out['jobs_done'], out['jobs_lost']
+    earned, lost_rev, busy = out['revenue'], out['lost_revenue'], out['busy_days']
+    crew_days = out['crew_days']
+
+    crews = crew['crews']
+    free = crews
+    pending = 0
+    crew_days[:] = [crews * dpm] * months
+    queues = (deque(), deque(), deque())
+    heap = [(m * dpm, _REVIEW, m, 0) for m in range(1, months)]
+    heap.sort()
+
+    def next_phase(job, phase):
+        for p in range(phase + 1, 3):
+            if needs[p][job]:
+                return p
+        return None
+
+    def lose(job, phase, when):
+        month = min(int(when // dpm), months - 1)
+        value = sum(revenue[p] for p in range(phase, 3) if needs[p][job])
+        lost_rev[month] += value
+        if phase == 0:
+            lost[month] += 1
+
+    def add_busy(start, end):
+        end = min(end, horizon)
+        m = int(start // dpm)
+        while start < end:
+            edge = min((m + 1) * dpm, end)
+            busy[m] += edge - start
+            start, m = edge, m + 1
+
+    def dispatch(now):
+        nonlocal free
+        while free:
+            for phase, queue in enumerate(queues):  # mitigation first
+                if queue:
+                    break
+            else:
+                return
+            ready, job = queue.popleft()
+            if now - ready > patience[phase]:
+                lose(job, phase, ready + patience[phase])
+                continue
+            free -= 1
+            end = now + durations[phase][job]
+            add_busy(now, end)
+            heappush(heap, (end, _FINISH, job, phase))
+
+    i = 0
+    inf = float('inf')
+    while True:
+        t_arrive = arrive[i] if i < n else inf
+        t_event = heap[0][0] if heap else inf
+        if t_arrive <= t_event:
+            if t_arrive >= horizon:
+                break
+            queues[0].append((t_arrive, i))
+            i += 1
+            dispatch(t_arrive)
+            continue
+        if t_event >= horizon:
+            break
+        now, kind, a, b = heappop(heap)
+        if kind == _FINISH:
+            free += 1
+            month = int(now // dpm)
+            earned[month] += revenue[b]
+            if b == 0:
+                done[month] += 1
+            p = next_phase(a, b)
+            if p is not None:
+                queues[p].append((now, a))
+        elif kind == _HIRE:
+            free += 1
+            crews += 1
+            pending -= 1
+            month = int(now // dpm)
+            crew_days[month] += (month + 1) * dpm - now
+            for later in range(month + 1, months):
+                crew_days[later] += dpm
+        else:  # month-end review of month a - 1
+            m = a - 1
+            out['crews'][m] = crews
+            hot = busy[m] >= crew['hire_utilization'] * crew_days[m] or lost[m] > 0
+            if hot and crews + pending < crew['max_crews']:
+                pending += 1
+                heappush(heap, (now + crew['hire_lead_days'], _HIRE, 0, 0))
+        dispatch(now)
+
+    # Work still queued at month 18: lost if its patience already ran out
+    for phase, queue in enumerate(queues):
+        for ready, job in queue:
+            if ready + patience[phase] < horizon:
+                lose(job, phase, ready + patience[phase])
+    out['crews'][months - 1] = crews
+    out['jobs_sold'] = counts.astype(float)
+    return {k: np.asarray(v, dtype=float) for k, v in out.items()}
+
+
+# ============================================================
+# REPLICATIONS
+# ============================================================
+def _run_block(args):
+    market, job_rates, crew, seed, market_idx, reps = args
+    runs = []
+    for rep in reps:
+        rng = np.random.default_rng([seed, market_idx, rep])
+        runs.append(simulate_market(market, job_rates, crew, rng))
+    return market_idx, {k: np.stack([r[k] for r in runs]) for k in MONTHLY_OUTPUTS}
+
+
+def _summarize(name, runs, unconstrained_revenue):
+    totals = {k: runs[k].sum(axis=1) for k in ('jobs_sold', 'jobs_done', 'jobs_lost',
+                                                'revenue', 'lost_revenue')}
+    utilization = runs['busy_days'].sum(axis=0) / runs['crew_days'].sum(axis=0)
+
+    def stats(values):
+        p10, p50, p90 = np.percentile(values, (10, 50, 90))
+        return {'mean': float(values.mean()), 'p10': float(p10), 'p50': float(p50),
+                'p90': float(p90)}
+
+    return {
+        'market': name,
+        'replications': len(runs['revenue']),
+        'totals': {k: stats(v) for k, v in totals.items()},
+        'unconstrained_revenue': unconstrained_revenue,
+        'monthly': {
+            'jobs_sold': runs['jobs_sold'].mean(axis=0).tolist(),
+            'jobs_done': runs['jobs_done'].mean(axis=0).tolist(),
+            'jobs_lost': runs['jobs_lost'].mean(axis=0).tolist(),
+            'revenue': runs['revenue'].mean(axis=0).tolist(),
+            'utilization': utilization.tolist(),
+            'crews': runs['crews'].mean(axis=0).tolist(),
+        },
+    }
+
+
+def run_simulation(assumptions=None, crews=None, replications=200, seed=0, workers=None,
+                   block_size=50):
+    """
+    Per-market results (see _summarize) for every market in the assumptions.
+    crews: {market_slug: {crews, max_crews, hire_lead_days, hire_utilization}}
+    workers defaults to os.cpu_count(); runs below PARALLEL_MIN_RUNS stay in-process.
+    Results depend only on the seed, not on workers or block_size.
+    """
+    general, ramps, markets = resolve_assumptions(assumptions)
+    frame = ProjectionFrame.compute(general, ramps, markets)
+    unconstrained = frame.totals()['revenue'].tolist()
+
+    jobs = []
+    for idx, m in enumerate(markets):
+        rates = monthly_job_rates(m, general, ramps)
+        setting = crew_settings(m, crews)
+        for lo in range(0, replications, block_size):
+            jobs.append((m, rates, setting, seed, idx,
+                         range(lo, min(lo + block_size, replications))))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(markets) * replications >= PARALLEL_MIN_RUNS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(_run_block, jobs))
+    else:
+        blocks = [_run_block(job) for job in jobs]
+
+    results = []
+    for idx, m in enumerate(markets):
+        parts = [b for i, b in blocks if i == idx]
+        runs = {k: np.concatenate([p[k] for p in parts]) for k in MONTHLY_OUTPUTS}
+        results.append(_summarize(m['name'], runs, unconstrained[idx]))
+    return results
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def parse_crews(text):
+    """'tucson=3,denver=5' or 'tucson=3:10' (crews:max_crews)"""
+    crews = {}
+    for part in filter(None, (text or '').split(',')):
+        name, _, value = part.partition('=')
+        start, _, cap = value.partition(':')
+        entry = {'crews': int(start)}
+        if cap:
+            entry['max_crews'] = int(cap)
+        crews[slug(name.strip())] = entry
+    return crews
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crew-capacity discrete-event simulation")
+    parser.add_argument('--replications', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes (default: all cores; 1 runs in-process)")
+    parser.add_argument('--crews', help="starting crews per market, e.g. tucson=3:10,denver=5")
+    parser.add_argument('--json', action='store_true', help="print the full result as JSON")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = run_simulation(crews=parse_crews(args.crews), replications=args.replications,
+                             seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for r in results:
+        t = r['totals']
+        print(f"  {r['market'].upper()} ({r['replications']} replications)")
+        print("  " + "-" * 50)
+        print(f"  Jobs sold:      {t['jobs_sold']['mean']:8.1f}")
+        print(f"  Jobs done:      {t['jobs_done']['mean']:8.1f}   "
+              f"(P10 {t['jobs_done']['p10']:.0f} / P90 {t['jobs_done']['p90']:.0f})")
+        print(f"  Jobs lost:      {t['jobs_lost']['mean']:8.1f}")
+        print(f"  Revenue:        ${t['revenue']['mean']:>12,.0f}   "
+              f"(unconstrained model ${r['unconstrained_revenue']:,})")
+        print(f"  Lost revenue:   ${t['lost_revenue']['mean']:>12,.0f}")
+        util = r['monthly']['utilization']
+        crews = r['monthly']['crews']
+        for q in range(0, len(util), MONTHS_PER_QUARTER):
+            block = slice(q, q + MONTHS_PER_QUARTER)
+            print(f"  Q{q // MONTHS_PER_QUARTER + 1} | utilization {np.mean(util[block]):4.0%}"
+                  f" | crews {crews[q + MONTHS_PER_QUARTER - 1]:4.1f}")
+        print()
+    print(f"  {sum(r['replications'] for r in results):,} market runs in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Golden-Output Regression Harness
+Regenerates every projection workbook into a temp directory and compares
+each computed cell against the stored fixtures in golden/, so an engine
+refactor cannot silently change a client-facing number.
+
+  money cells ("$" number format, "$" in the CSVs)  exact
+  other numbers (leads, jobs, ROI, %)               within --tolerance
+  text                                              exact
+  sampled tabs (Global Sensitivity: Sobol estimates) layout only: text
+                                                    exact, numbers only
+                                                    checked to be numbers
+
+The v2 workbook is built without its opt-in Global Sensitivity tab, so a
+sampler or worker-chunking change cannot fail the check.
+
+The checked-in tucson_projections.csv, denver_projections.csv and
+combined_summary.csv are exports of the 18-month workbook's tabs, so their
+data rows are checked against the regenerated 18_Month_Projections.xlsx as
+well. Workbooks are streamed cell by cell in openpyxl read-only mode.
+
+Fixtures are only written by --update: run it after an intended change and
+commit the golden/ diff with it.
+
+Usage:
+  python3 golden.py                          # regenerate all models and compare
+  python3 golden.py --model create_conservative_v2.py
+  python3 golden.py --workbook-dir .         # check existing workbooks instead
+  python3 golden.py --update                 # accept the current output
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, 'golden')
+
+# (generator script, workbook it writes)
+MODELS = (
+    ('create_xlsx.py', '18_Month_Projections.xlsx'),
+    ('create_projection_model.py', 'Conservative_18Mo_Projections.xlsx'),
+    ('create_conservative_v2.py', 'Conservative_v2_Projections.xlsx'),
+)
+# CSV export -> (workbook, sheet) it was taken from; the header row is not compared
+CSV_FIXTURES = {
+    'tucson_projections.csv': ('18_Month_Projections.xlsx', 'Tucson Projections'),
+    'denver_projections.csv': ('18_Month_Projections.xlsx', 'Denver Projections'),
+    'combined_summary.csv': ('18_Month_Projections.xlsx', 'Combined Summary'),
+}
+# Extra arguments per generator, pinned so fixtures hold only deterministic tabs
+MODEL_ARGS = {
+    'create_conservative_v2.py': ['--sobol-samples', '0'],
+}
+# Tabs of sampled estimates: compared on layout and labels, not values
+SAMPLED_SHEETS = ('Global Sensitivity',)
+COUNT_TOLERANCE = 1e-6
+
+
+# ============================================================
+# REGENERATE
+# ============================================================
+def regenerate(out_dir, models=MODELS):
+    """Run the generator scripts side by side, writing into out_dir"""
+    env = dict(os.environ, PROJECTIONS_OUTPUT_DIR=out_dir)
+    procs = [(script, subprocess.Popen([sys.executable, os.path.join(HERE, script)]
+                                       + MODEL_ARGS.get(script, []), cwd=HERE,
+                                       env=env, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE, text=True))
+             for script, _ in models]
+    for script, proc in procs:
+        _, err = proc.communicate()
+        if proc.returncode:
+            raise RuntimeError(f"{script} failed:\n{err.strip()}")
+    return {name: os.path.join(out_dir, name) for _, name in models}
+
+
+# ============================================================
+# READ
+# ============================================================
+def read_cells(path):
+    """{sheet: {'cells': {coord: value}, 'money': [coords]}} for every non-empty cell"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for ws in wb.worksheets:
+            cells, money = {}, []
+            for row in ws.iter_rows():
+                for cell in row:
+                    if cell.value is None:
+                        continue
+                    cells[cell.coordinate] = cell.value
+                    if '$' in (cell.number_format or ''):
+                        money.append(cell.coordinate)
+            sheets[ws.title] = {'cells': cells, 'money': money}
+        return sheets
+    finally:
+        wb.close()
+
+
+def _csv_value(text):
+    """(value, is_money) for one exported cell: '$7500', '11.7x', '45.0', 'Q1', '-'"""
+    text = text.strip()
+    if text in ('', '-'):
+        return None, False
+    money = text.startswith('$')
+    raw = text.lstrip('$').rstrip('x').replace(',', '')
+    try:
+        number = float(raw)
+    except ValueError:
+        return text, False
+    return (int(number) if number.is_integer() else number), money
+
+
+def read_csv_fixture(path):
+    """The same {'cells', 'money'} shape for a CSV export, data rows only"""
+    from openpyxl.utils import get_column_letter
+
+    cells, money = {}, []
+    with open(path, newline='') as f:
+        for r, row in enumerate(csv.reader(f), start=1):
+            if r == 1:
+                continue
+            for c, text in enumerate(row, start=1):
+                value, is_money = _csv_value(text)
+                if value is None:
+                    continue
+                coord = f"{get_column_letter(c)}{r}"
+                cells[coord] = value
+                if is_money:
+                    money.append(coord)
+    return {'cells': cells, 'money': money}
+
+
+def fixture_path(workbook):
+    return os.path.join(GOLDEN_DIR, os.path.splitext(workbook)[0] + '.json')
+
+
+def load_fixture(workbook):
+    with open(fixture_path(workbook)) as f:
+        return json.load(f)['sheets']
+
+
+def save_fixture(workbook, sheets):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(fixture_path(workbook), 'w') as f:
+        json.dump({'workbook': workbook, 'sheets': sheets}, f, indent=1, ensure_ascii=False)
+        f.write('\n')
+
+
+# ============================================================
+# COMPARE
+# ============================================================
+def _number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def same_value(expected, actual, money, tolerance=COUNT_TOLERANCE, layout_only=False):
+    if _number(expected) and _number(actual):
+        if layout_only:
+            return True
+        if money:
+            return expected == actual
+        return math.isclose(expected, actual, rel_tol=0.0, abs_tol=tolerance)
+    return expected == actual
+
+
+def compare_sheet(sheet, expected, actual, tolerance=COUNT_TOLERANCE, only_expected=False):
+    """[{sheet, cell, expected, actual, kind}] for every cell that differs"""
+    money = set(expected['money'])
+    exp, act = expected['cells'], actual['cells']
+    coords = list(exp) if only_expected else list(exp) + [c for c in act if c not in exp]
+    layout_only = sheet in SAMPLED_SHEETS
+    diffs = []
+    for coord in coords:
+        e, a = exp.get(coord), act.get(coord)
+        is_money = coord in money
+        if not same_value(e, a, is_money, tolerance, layout_only):
+            kind = 'money' if is_money else 'number' if _number(e) else 'text'
+            diffs.append({'sheet': sheet, 'cell': coord, 'expected': e, 'actual': a,
+                          'kind': kind})
+    return diffs
+
+
+def compare_workbook(expected, actual, tolerance=COUNT_TOLERANCE):
+    diffs = []
+    for sheet in list(expected) + [s for s in actual if s not in expected]:
+        if sheet not in actual:
+            diffs.append({'sheet': sheet, 'cell': None, 'expected': 'sheet', 'actual': None,
+                          'kind': 'sheet'})
+        elif sheet not in expected:
+            diffs.append({'sheet': sheet, 'cell': None, 'expected': None, 'actual': 'sheet',
+                          'kind': 'sheet'})
+        else:
+            diffs.extend(compare_sheet(sheet, expected[sheet], actual[sheet], tolerance))
+    return diffs
+
+
+def run_checks(workbooks, tolerance=COUNT_TOLERANCE):
+    """[{fixture, cells, diffs}] for each workbook fixture and the CSV exports"""
+    results, read = [], {}
+    for name, path in workbooks.items():
+        read[name] = read_cells(path)
+        expected = load_fixture(name)
+        results.append({
+            'fixture': os.path.relpath(fixture_path(name), HERE),
+            'cells': sum(len(s['cells']) for s in expected.values()),
+            'diffs': compare_workbook(expected, read[name], tolerance),
+        })
+    for csv_name, (name, sheet) in CSV_FIXTURES.items():
+        if name not in read:
+            continue
+        expected = read_csv_fixture(os.path.join(HERE, csv_name))
+        actual = read[name].get(sheet, {'cells': {}, 'money': []})
+        results.append({
+            'fixture': csv_name,
+            'cells': len(expected['cells']),
+            'diffs': compare_sheet(sheet, expected, actual, tolerance, only_expected=True),
+        })
+    return results
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def print_results(results, max_diffs=20):
+    for r in results:
+        if not r['diffs']:
+            print(f"  ✅ {r['fixture']}: {r['cells']:,} cells match")
+            continue
+        print(f"  ❌ {r['fixture']}: {len(r['diffs']):,} of {r['cells']:,} cells differ")
+        for d in r['diffs'][:max_diffs]:
+            where = f"{d['sheet']}!{d['cell']}" if d['cell'] else d['sheet']
+            if d['kind'] == 'sheet':
+                print(f"      {where}: {'missing' if d['actual'] is None else 'unexpected'} sheet")
+            else:
+                print(f"      {where}: expected {d['expected']!r}, got {d['actual']!r} ({d['kind']})")
+        if len(r['diffs']) > max_diffs:
+            print(f"      … {len(r['diffs']) - max_diffs:,} more")
+
+
+def main():
+    scripts = [script for script, _ in MODELS]
+    parser = argparse.ArgumentParser(description="Compare projection workbooks to golden fixtures")
+    parser.add_argument('--model', action='append', choices=scripts,
+                        help="only this generator (repeatable; default: all)")
+    parser.add_argument('--workbook-dir',
+                        help="compare the workbooks already in this folder instead of regenerating")
+    parser.add_argument('--update', action='store_true',
+                        help="write the current output as the new fixtures")
+    parser.add_argument('--tolerance', type=float, default=COUNT_TOLERANCE,
+                        help="absolute tolerance for non-money numbers")
+    parser.add_argument('--max-diffs', type=int, default=20, help="diff lines per fixture")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args()
+
+    models = [m for m in MODELS if not args.model or m[0] in args.model]
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.workbook_dir:
+            workbooks = {name: os.path.join(args.workbook_dir, name) for _, name in models}
+        else:
+            workbooks = regenerate(tmp, models)
+
+        if args.update:
+            for name, path in workbooks.items():
+                save_fixture(name, read_cells(path))
+                print(f"✅ Created: {os.path.relpath(fixture_path(name), HERE)}")
+            return
+        results = run_checks(workbooks, args.tolerance)
+    elapsed = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+    else:
+        print_results(results, args.max_diffs)
+        failed = sum(bool(r['diffs']) for r in results)
+        print(f"  {len(results) - failed} of {len(results)} fixtures match ({elapsed:.1f}s)")
+    sys.exit(1 if any(r['diffs'] for r in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
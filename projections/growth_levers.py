@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Growth Lever Combinations
+Scores every subset and timing of the growth levers behind the "GROWTH
+ACCELERATION" rows of Sensitivities & Notes and ranks the combinations that
+are worth considering by incremental 18-month revenue per dollar of lever
+spend (monthly and one-time cost). The ad spend a lever changes (CPL
+savings from new keywords, spend on extra leads) is reported beside it, not
+netted into the ratio, so a cheap-lead lever cannot turn every combination
+into "saves money".
+
+A lever is a model modifier with a cost and a set of start quarters:
+
+  cpl   CPL changes by `change` (fraction of the market's CPL) or `delta`
+        ($ per lead) from the start quarter on (new keyword categories)
+  gbp   an extra GBP profile: `capacity` monthly leads (same units as
+        max_gbp) on its own quarterly `ramp` counted from the start quarter
+        (default: the v2 GBP ramp), closing at the market's rates and LTV
+
+plus `monthly_cost` from the start and a `one_time_cost` at the start.
+`market` is a market name or '*' for every market.
+
+Each (lever, start) option is evaluated once on the vector engine as a
+delta against the base plan. Leads, ad spend and revenue are linear in
+these modifiers, so any combination's deltas are the sum of its options'
+deltas: every combination (each lever off or on at one of its starts) is
+scored by gathering and summing per-option totals in chunks of mixed-radix
+combination numbers. Combinations dominated on (lever spend, revenue, ad
+spend) are pruned as they stream through, which is exact because adding the
+same options to a dominated combination keeps it dominated.
+
+Lever costs are placeholders until priced for a client; copy
+DEFAULT_LEVERS to a JSON file and edit.
+
+Usage:
+  python3 growth_levers.py                          # default levers
+  python3 growth_levers.py --levers levers.json --top 20 --xlsx levers.xlsx
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from projection_engine import resolve_assumptions
+from vector_engine import market_inputs, evaluate_market, monthly_ramp, slug, MONTHS_PER_QUARTER
+from pareto import nondominated_3d
+
+CHUNK_SIZE = 500_000
+KINDS = ('cpl', 'gbp')
+
+DEFAULT_LEVERS = [
+    {'name': "Add plumbing keywords", 'kind': 'cpl', 'market': '*', 'change': -0.15,
+     'start': ['Q2', 'Q3', 'Q4'], 'monthly_cost': 250, 'one_time_cost': 1000},
+    {'name': "2nd Denver GBP", 'kind': 'gbp', 'market': 'Denver', 'capacity': 50,
+     'start': ['Q2', 'Q3', 'Q4'], 'monthly_cost': 750, 'one_time_cost': 1500},
+    {'name': "2nd Tucson GBP", 'kind': 'gbp', 'market': 'Tucson', 'capacity': 40,
+     'start': ['Q3', 'Q4', 'Q5'], 'monthly_cost': 750, 'one_time_cost': 1500},
+]
+
+# Sensitivities & Notes rows -> (lever, start) whose Q6 impact they show
+SHEET_ROWS = {
+    "Add plumbing keywords Q3": ("Add plumbing keywords", 'Q3'),
+    "2nd Denver GBP in Q2": ("2nd Denver GBP", 'Q2'),
+    "2nd Tucson GBP in Q4": ("2nd Tucson GBP", 'Q4'),
+}
+
+
+# ============================================================
+# OPTIONS
+# ============================================================
+def _totals(revenue, spend, ad_spend):
+    """(18-mo revenue, Q6 monthly revenue, 18-mo lever spend, 18-mo ad spend) of monthly deltas"""
+    return (float(revenue.sum()),
+            float(revenue[-MONTHS_PER_QUARTER:].sum() / MONTHS_PER_QUARTER),
+            float(spend.sum()), float(ad_spend.sum()))
+
+
+class LeverSet:
+    """Per-option deltas for a list of levers, plus combination scoring"""
+
+    def __init__(self, levers=None, assumptions=None):
+        self.levers = DEFAULT_LEVERS if levers is None else levers
+        general, ramps, markets = resolve_assumptions(assumptions)
+        self.quarters = list(ramps)
+        self.months = len(self.quarters) * MONTHS_PER_QUARTER
+        self._gbp_ramp = [r['gbp'] for r in ramps.values()]
+        self._markets = {slug(m['name']): market_inputs(m, general, ramps) for m in markets}
+        self._base = {k: evaluate_market(v) for k, v in self._markets.items()}
+
+        names = [lever.get('name') for lever in self.levers]
+        if len(set(names)) != len(names) or not all(names):
+            raise ValueError("every lever needs a unique name")
+        # Option 0 of every lever is "not used"
+        self.labels, self.revenue, self.q6, self.cost, self.ad_spend = [], [], [], [], []
+        for lever in self.levers:
+            labels, totals = ["—"], [(0.0, 0.0, 0.0, 0.0)]
+            for start in lever.get('start') or []:
+                labels.append(start)
+                totals.append(_totals(*self.option_deltas(lever, start)))
+            if len(labels) == 1:
+                raise ValueError(f"{lever['name']}: needs at least one start quarter")
+            self.labels.append(labels)
+            revenue, q6, cost, ad_spend = (np.array(t) for t in zip(*totals))
+            self.revenue.append(revenue)
+            self.q6.append(q6)
+            self.cost.append(cost)
+            self.ad_spend.append(ad_spend)
+        self.radices = tuple(len(labels) for labels in self.labels)
+        self.size = math.prod(self.radices)
+
+    def _scope(self, lever):
+        market = slug(lever.get('market', '*'))
+        if market in ('*', 'general'):
+            return list(self._markets)
+        if market not in self._markets:
+            raise ValueError(f"{lever['name']}: unknown market {lever.get('market')!r}")
+        return [market]
+
+    def option_deltas(self, lever, start):
+        """Monthly (revenue, lever spend, ad spend) changes of one lever started in `start`"""
+        if lever.get('kind') not in KINDS:
+            raise ValueError(f"{lever['name']}: kind must be one of {', '.join(KINDS)}")
+        if start not in self.quarters:
+            raise ValueError(f"{lever['name']}: unknown start quarter {start!r}")
+        first = self.quarters.index(start) * MONTHS_PER_QUARTER
+        active = np.arange(self.months) >= first
+
+        revenue, ad_spend = np.zeros(self.months), np.zeros(self.months)
+        spend = np.where(active, float(lever.get('monthly_cost', 0)), 0.0)
+        spend[first] += float(lever.get('one_time_cost', 0))
+        for market in self._scope(lever):
+            inputs, base = self._markets[market], self._base[market]
+            if lever['kind'] == 'cpl':
+                delta = (lever['delta'] if 'delta' in lever
+                         else lever.get('change', 0) * inputs['cpl'])
+                out = evaluate_market(dict(inputs, cpl=np.where(active, inputs['cpl'] + delta,
+                                                                inputs['cpl'])[None, :]))
+                revenue += np.ravel(out['revenue'] - base['revenue'])
+                ad_spend += np.ravel(out['total_cost'] - base['total_cost'])
+            else:
+                # The new profile alone: GBP leads only, no extra management fee
+                ramp = list(lever.get('ramp') or self._gbp_ramp)
+                quarters = len(self.quarters) - first // MONTHS_PER_QUARTER
+                ramp = (ramp + ramp[-1:] * quarters)[:quarters]
+                shifted = np.concatenate([np.zeros(first), monthly_ramp(ramp)])
+                out = evaluate_market(dict(inputs, max_web=0, max_ppc=0, mgmt_fee_monthly=0,
+                                           max_gbp=lever['capacity'], ramp_gbp=shifted))
+                revenue += np.ravel(out['revenue'])
+                ad_spend += np.ravel(out['total_cost'])
+        return revenue, spend, ad_spend
+
+    # ------------------------------------------------------------
+    # Combinations
+    # ------------------------------------------------------------
+    def evaluate(self, rows):
+        """(cost, revenue, q6, ad_spend) deltas for a block of combination numbers"""
+        digits = np.unravel_index(rows, self.radices)
+        return tuple(sum(option[d] for option, d in zip(options, digits))
+                     for options in (self.cost, self.revenue, self.q6, self.ad_spend))
+
+    def half_totals(self, levers):
+        """(cost, revenue, q6, ad_spend) of every combination of a slice of the levers, row order"""
+        totals = [np.zeros(1)] * 4
+        for j in range(len(self.radices))[levers]:
+            totals = [np.add.outer(t, option[j]).ravel() for t, option
+                      in zip(totals, (self.cost, self.revenue, self.q6, self.ad_spend))]
+        return totals
+
+    def describe(self, row):
+        """{lever name: start quarter} for the levers a combination uses"""
+        digits = np.unravel_index(int(row), self.radices)
+        return {lever['name']: labels[d] for lever, labels, d
+                in zip(self.levers, self.labels, digits) if d}
+
+
+def revenue_per_dollar(revenue, cost):
+    """Incremental revenue per dollar of lever spend; revenue at no lever cost ranks first"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(cost > 0, revenue / cost, np.where(revenue > 0, np.inf, 0.0))
+
+
+def rank_combinations(levers=None, assumptions=None, chunk_size=CHUNK_SIZE):
+    """
+    Every combination scored, dominated ones pruned; returns a dict of arrays
+    (row, cost, ad_spend, revenue, q6_monthly, per_dollar) ranked by
+    per_dollar (ties: more revenue first), plus the LeverSet and the number
+    scored. cost is lever spend; ad_spend is the plan's ad spend change.
+
+    Combination row = a × len(B) + b over the first and second half of the
+    levers, so a block of rows is one outer sum of the two halves' totals.
+    """
+    space = LeverSet(levers, assumptions)
+    split = len(space.radices) // 2
+    head, tail = space.half_totals(slice(None, split)), space.half_totals(slice(split, None))
+    width = len(tail[0])
+    block = max(1, chunk_size // width)
+    front = {k: np.empty(0) for k in ('cost', 'revenue', 'q6_monthly', 'ad_spend')}
+    front['row'] = np.empty(0, dtype=np.int64)
+
+    for lo in range(0, len(head[0]), block):
+        hi = min(lo + block, len(head[0]))
+        rows = np.arange(lo * width, hi * width, dtype=np.int64)
+        cost, revenue, q6, ad_spend = ((h[lo:hi, None] + t[None, :]).ravel()
+                                       for h, t in zip(head, tail))
+        local = nondominated_3d(cost, revenue, -ad_spend)
+        merged = {
+            'row': np.concatenate([front['row'], rows[local]]),
+            'cost': np.concatenate([front['cost'], cost[local]]),
+            'revenue': np.concatenate([front['revenue'], revenue[local]]),
+            'q6_monthly': np.concatenate([front['q6_monthly'], q6[local]]),
+            'ad_spend': np.concatenate([front['ad_spend'], ad_spend[local]]),
+        }
+        keep = nondominated_3d(merged['cost'], merged['revenue'], -merged['ad_spend'])
+        front = {k: v[keep] for k, v in merged.items()}
+
+    used = front['row'] != 0  # row 0 = no levers
+    front = {k: v[used] for k, v in front.items()}
+    front['per_dollar'] = revenue_per_dollar(front['revenue'], front['cost'])
+    order = np.lexsort((-front['revenue'], -front['per_dollar']))
+    front = {k: v[order] for k, v in front.items()}
+    front['space'] = space
+    front['scored'] = space.size - 1
+    return front
+
+
+def sheet_impacts(assumptions=None, levers=None):
+    """{Sensitivities row label: change in Q6 monthly revenue} for levers this plan can use"""
+    levers = {lever['name']: lever for lever in (levers or DEFAULT_LEVERS)}
+    space = LeverSet([], assumptions)
+    impacts = {}
+    for row, (name, start) in SHEET_ROWS.items():
+        if name not in levers:
+            continue
+        try:
+            deltas = space.option_deltas(levers[name], start)
+        except ValueError:
+            continue  # the lever's market or start quarter is not in this plan
+        impacts[row] = _totals(*deltas)[1]
+    return impacts
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def add_levers_sheet(wb, front, top=50, title="Growth Levers"):
+    """Best non-dominated combinations, highest revenue per dollar of lever spend first"""
+    from openpyxl.styles import Alignment
+    from workbook_styles import thin_border, money_fmt, style_header, auto_width
+
+    if title in wb.sheetnames:
+        del wb[title]
+    ws = wb.create_sheet(title)
+    space = front['space']
+    lever_names = [lever['name'] for lever in space.levers]
+    ws.append(["Rank"] + lever_names + ["Lever Cost (18 Mo)", "Ad Spend Change (18 Mo)",
+                                        "Added Revenue (18 Mo)", "Added Q6 Monthly",
+                                        "Revenue per Lever $"])
+    style_header(ws)
+
+    n = len(lever_names)
+    for rank in range(min(top, len(front['row']))):
+        used = space.describe(front['row'][rank])
+        per_dollar = float(front['per_dollar'][rank])
+        ws.append([rank + 1] + [used.get(name, "—") for name in lever_names] +
+                  [round(float(front['cost'][rank])), round(float(front['ad_spend'][rank])),
+                   round(float(front['revenue'][rank])), round(float(front['q6_monthly'][rank])),
+                   "no lever cost" if math.isinf(per_dollar) else round(per_dollar, 2)])
+
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            cell.alignment = Alignment(horizontal='center')
+            if n < idx <= n + 4:
+                cell.number_format = money_fmt
+            elif idx == n + 5:
+                cell.number_format = '0.00"x"'
+    auto_width(ws)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Rank growth-lever combinations")
+    parser.add_argument('--levers', help="lever list JSON (see DEFAULT_LEVERS)")
+    parser.add_argument('--top', type=int, default=10, help="combinations to print / write")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--xlsx', help="add/replace the 'Growth Levers' tab in this workbook")
+    args = parser.parse_args()
+
+    levers = None
+    if args.levers:
+        with open(args.levers) as f:
+            levers = json.load(f)
+
+    t0 = time.perf_counter()
+    try:
+        front = rank_combinations(levers, chunk_size=args.chunk_size)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"  {front['scored']:,} combinations scored, {len(front['row']):,} not dominated "
+          f"({time.perf_counter() - t0:.2f}s)")
+    for rank in range(min(args.top, len(front['row']))):
+        used = front['space'].describe(front['row'][rank])
+        per_dollar = float(front['per_dollar'][rank])
+        ratio = "no cost" if math.isinf(per_dollar) else f"{per_dollar:.2f}x"
+        print(f"  {rank + 1:3d}. {ratio:>8s}  levers ${front['cost'][rank]:>+8,.0f}  "
+              f"ad spend ${front['ad_spend'][rank]:>+9,.0f}  revenue ${front['revenue'][rank]:>+11,.0f}  Q6 ${front['q6_monthly'][rank]:>+9,.0f}/mo  "
+              + ", ".join(f"{k} {v}" for k, v in used.items()))
+
+    if args.xlsx:
+        from openpyxl import Workbook, load_workbook
+        if os.path.exists(args.xlsx):
+            wb = load_workbook(args.xlsx)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+        add_levers_sheet(wb, front, top=max(args.top, 50))
+        wb.save(args.xlsx)
+        print(f"✅ Created: {args.xlsx}")
+
+
+if __name__ == '__main__':
+    main()
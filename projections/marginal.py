@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Marginal Impact (forward-mode gradients)
+Exact partial derivatives of the headline outputs (Q6 monthly revenue,
+18-month revenue and investment, ROI, goal gap; combined and per market)
+with respect to every model input, from one evaluation.
+
+The vector engine's formulas are run on dual numbers: each quantity carries
+its value plus its gradient over all d inputs, so the values and all d
+partials come out of the same pass instead of d finite-difference reruns.
+Revenue and cost are linear in any single input, so value + gradient × step
+is exact for one input at a time; ROI is a ratio, so its entry is the slope
+at the base.
+
+Usage:
+  python3 marginal.py                  # what +1 pt closing, +$50 CPL, ... are worth
+  python3 marginal.py --json
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, market_ltv, goal_monthly
+from vector_engine import MONTHS_PER_QUARTER, RAMP_CHANNELS, LTV_FIELDS, monthly_ramp, slug
+
+OUTPUTS = ('q6_monthly', 'total_revenue', 'total_investment', 'roi', 'goal_gap')
+MARKET_OUTPUTS = ('q6_monthly', 'total_revenue', 'total_investment', 'roi')
+GENERAL_INPUTS = ('qualified_rate', 'closing_rate', 'mgmt_fee_monthly')
+MARKET_INPUTS = ('max_web', 'max_ppc', 'max_gbp', 'cpl')
+
+# The change each input is quoted for: (step, label)
+STEPS = {
+    'qualified_rate': (0.01, "+1 pt"), 'closing_rate': (0.01, "+1 pt"),
+    'abate_conv': (0.01, "+1 pt"), 'recon_conv': (0.01, "+1 pt"),
+    'mgmt_fee_monthly': (100, "+$100/mo"), 'cpl': (50, "+$50"),
+    'max_web': (1, "+1 lead/mo"), 'max_ppc': (1, "+1 lead/mo"), 'max_gbp': (1, "+1 lead/mo"),
+    'mit_avg': (100, "+$100"), 'abate_avg': (100, "+$100"), 'recon_avg': (100, "+$100"),
+    'recon_fee': (100, "+$100"), 'ltv': (100, "+$100"),
+    'ramp': (0.05, "+5 pts"),
+}
+
+
+# ============================================================
+# DUAL NUMBERS
+# ============================================================
+class Dual:
+    """
+    value (scalar or (months,)) with gradient value.shape + (d,).
+    Supports the arithmetic the engine uses: + - * /, sums and slices of
+    the months axis.
+    """
+    __slots__ = ('value', 'grad')
+
+    def __init__(self, value, grad):
+        self.value = np.asarray(value, dtype=float)
+        self.grad = np.asarray(grad, dtype=float)
+
+    @classmethod
+    def variable(cls, value, index, d):
+        grad = np.zeros(np.shape(value) + (d,))
+        grad[..., index] = 1.0
+        return cls(value, grad)
+
+    @staticmethod
+    def _parts(other):
+        if isinstance(other, Dual):
+            return other.value, other.grad
+        return np.asarray(other, dtype=float), 0.0
+
+    def __add__(self, other):
+        v, g = self._parts(other)
+        return Dual(self.value + v, self.grad + g)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        v, g = self._parts(other)
+        return Dual(self.value - v, self.grad - g)
+
+    def __rsub__(self, other):
+        v, g = self._parts(other)
+        return Dual(v - self.value, g - self.grad)
+
+    def __mul__(self, other):
+        v, g = self._parts(other)
+        return Dual(self.value * v,
+                    self.grad * v[..., None] + self.value[..., None] * g)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        v, g = self._parts(other)
+        return Dual(self.value / v,
+                    (self.grad * v[..., None] - self.value[..., None] * g) / (v * v)[..., None])
+
+    def __getitem__(self, key):
+        return Dual(self.value[key], self.grad[key])
+
+    def sum(self):
+        """Sum over months"""
+        return Dual(self.value.sum(axis=-1), self.grad.sum(axis=-2))
+
+
+def ratio(num, den):
+    """num / den, 0 (with zero gradient) when den is not positive"""
+    if den.value > 0:
+        return num / den
+    return Dual(0.0, np.zeros_like(num.grad))
+
+
+# ============================================================
+# INPUTS
+# ============================================================
+class MarginalModel:
+    """Every differentiable input of one scenario, seeded as a dual variable"""
+
+    def __init__(self, assumptions=None):
+        self.general, self.ramps, self.markets = resolve_assumptions(assumptions)
+        self.quarters = list(self.ramps)
+        self.names, self.labels, self.base, self.kinds = [], [], [], []
+
+        for field in GENERAL_INPUTS:
+            self._add(f"general.{field}", f"General: {field.replace('_', ' ').title()}",
+                      self.general[field], field)
+        for m in self.markets:
+            # An LTV that is not its components' sum was given explicitly: differentiate it
+            ltv_fields = (('ltv',) if m['ltv'] != market_ltv(m)
+                          else tuple(k for k in LTV_FIELDS if k in m))
+            for field in MARKET_INPUTS + ltv_fields:
+                self._add(f"{slug(m['name'])}.{field}", f"{m['name']}: {field}", m[field], field)
+        for ch in RAMP_CHANNELS:
+            for q in self.quarters:
+                self._add(f"ramp.{ch}.{q}", f"Ramp {ch.upper()} {q}", self.ramps[q][ch], 'ramp')
+        self.dim = len(self.names)
+        self._index = {name: j for j, name in enumerate(self.names)}
+
+    def _add(self, name, label, base, kind):
+        self.names.append(name)
+        self.labels.append(label)
+        self.base.append(base)
+        self.kinds.append(kind)
+
+    def _var(self, name):
+        return Dual.variable(self.base[self._index[name]], self._index[name], self.dim)
+
+    def _ramp(self, ch):
+        values = [self.ramps[q][ch] for q in self.quarters]
+        grad = np.zeros((len(values) * MONTHS_PER_QUARTER, self.dim))
+        for i, q in enumerate(self.quarters):
+            grad[i * MONTHS_PER_QUARTER:(i + 1) * MONTHS_PER_QUARTER,
+                 self._index[f"ramp.{ch}.{q}"]] = 1.0
+        return Dual(monthly_ramp(values), grad)
+
+    def _market_ramp(self, m, ch, shared):
+        """A market's own ramp curve is a constant; other channels follow the shared ramp"""
+        if ch not in (m.get('ramp_curves') or {}):
+            return shared
+        values = np.asarray(m['ramp_months'][ch], dtype=float)
+        return Dual(values, np.zeros(values.shape + (self.dim,)))
+
+    def _market_input(self, m, field):
+        name = f"{slug(m['name'])}.{field}"
+        return self._var(name) if name in self._index else m.get(field, 0)
+
+    # ============================================================
+    # FORWARD PASS (vector_engine.evaluate_market / summarize on duals)
+    # ============================================================
+    def evaluate(self):
+        """{output: Dual} for the combined outputs and '<market>_<output>'"""
+        qualified_rate = self._var('general.qualified_rate')
+        closing_rate = self._var('general.closing_rate')
+        mgmt_fee = self._var('general.mgmt_fee_monthly')
+        ramp = {ch: self._ramp(ch) for ch in RAMP_CHANNELS}
+
+        out, revenue_sum, cost_sum = {}, 0, 0
+        for m in self.markets:
+            field = lambda k: self._market_input(m, k)
+            m_ramp = {ch: self._market_ramp(m, ch, ramp[ch]) for ch in RAMP_CHANNELS}
+            web_leads = field('max_web') * m_ramp['web'] * qualified_rate
+            ppc_leads = field('max_ppc') * m_ramp['ads'] * qualified_rate
+            gbp_leads = field('max_gbp') * m_ramp['gbp'] * qualified_rate
+            total_leads = web_leads + ppc_leads + gbp_leads
+
+            ad_spend = ppc_leads * field('cpl')
+            total_cost = ad_spend + mgmt_fee
+
+            if f"{slug(m['name'])}.ltv" in self._index:
+                ltv = field('ltv')
+            else:
+                ltv = (field('mit_avg') + field('abate_conv') * field('abate_avg')
+                       + field('recon_conv') * field('recon_avg') + field('recon_fee'))
+            revenue = total_leads * closing_rate * ltv
+
+            for k, v in self._headline(revenue, total_cost).items():
+                if k in MARKET_OUTPUTS:
+                    out[f"{slug(m['name'])}_{k}"] = v
+            revenue_sum = revenue_sum + revenue
+            cost_sum = cost_sum + total_cost
+
+        out.update(self._headline(revenue_sum, cost_sum))
+        return out
+
+    @staticmethod
+    def _headline(revenue, total_cost):
+        q6_monthly = revenue[-MONTHS_PER_QUARTER:].sum() / MONTHS_PER_QUARTER
+        total_revenue = revenue.sum()
+        total_investment = total_cost.sum()
+        return {
+            'q6_monthly': q6_monthly,
+            'total_revenue': total_revenue,
+            'total_investment': total_investment,
+            'roi': ratio(total_revenue, total_investment),
+            'goal_gap': q6_monthly - goal_monthly,
+        }
+
+
+def marginal_impacts(assumptions=None):
+    """
+    {'inputs': [{name, label, base, step, change}], 'outputs': {output: value},
+     'gradients': {output: (d,) partials}, 'impacts': {output: (d,) partial × step}}
+    """
+    model = MarginalModel(assumptions)
+    duals = model.evaluate()
+    steps = np.array([STEPS[k][0] for k in model.kinds], dtype=float)
+    inputs = [{'name': n, 'label': l, 'base': b, 'step': STEPS[k][0], 'change': STEPS[k][1]}
+              for n, l, b, k in zip(model.names, model.labels, model.base, model.kinds)]
+    return {
+        'inputs': inputs,
+        'outputs': {k: float(d.value) for k, d in duals.items()},
+        'gradients': {k: d.grad for k, d in duals.items()},
+        'impacts': {k: d.grad * steps for k, d in duals.items()},
+    }
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def marginal_rows(result):
+    """Header, one row per input (grouped under section rows) and the notes"""
+    rows = [["Input", "Base Value", "Change", "Q6 Monthly Revenue", "18-Mo Revenue",
+             "18-Mo Investment", "Overall ROI"]]
+    impacts = result['impacts']
+    section = None
+    for j, e in enumerate(result['inputs']):
+        group = e['name'].split('.')[0]
+        if group != section:
+            section = group
+            heading = {'general': "GENERAL", 'ramp': "RAMPS"}.get(group)
+            rows.append([heading or e['label'].split(':')[0].upper()] + [""] * 6)
+        rows.append([e['label'], e['base'], e['change'],
+                     round(float(impacts['q6_monthly'][j])),
+                     round(float(impacts['total_revenue'][j])),
+                     round(float(impacts['total_investment'][j])),
+                     round(float(impacts['roi'][j]), 3)])
+
+    outputs = result['outputs']
+    rows.append([])
+    rows.append(["NOTES"] + [""] * 6)
+    for note in (
+            f"Base: Q6 monthly ${outputs['q6_monthly']:,.0f}, 18-mo revenue "
+            f"${outputs['total_revenue']:,.0f}, ROI {outputs['roi']:.2f}x",
+            "Exact derivatives from one forward-mode (dual number) evaluation",
+            "Revenue and investment impacts are exact for one input changed at a time",
+            "ROI impact is the slope at the base values (ROI is a ratio)",
+            f"The gap to the ${goal_monthly // 1000}k goal moves 1:1 with Q6 monthly revenue"):
+        rows.append(["", note] + [""] * 5)
+    return rows
+
+
+def add_marginal_sheet(wb, result, title="Marginal Impact"):
+    """Impact of a one-step change in each input, in the v2 style"""
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (section_fill, thin_border, money_fmt, style_header,
+                                 auto_width)
+
+    ws = wb.create_sheet(title)
+    rows = marginal_rows(result)
+    ws.append(rows[0])
+    style_header(ws)
+    for row_data in rows[1:]:
+        ws.append(row_data)
+
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        label = row[0].value
+        if label in (None, ""):
+            continue
+        is_section = row[2].value in (None, "")
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            if is_section:
+                cell.fill = section_fill
+                cell.font = Font(bold=True)
+            elif 3 <= idx <= 5:
+                cell.number_format = money_fmt
+            elif idx == 6:
+                cell.number_format = '+0.000;-0.000;0'
+            if idx >= 2 and not is_section:
+                cell.alignment = Alignment(horizontal='center')
+    auto_width(ws)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Exact marginal impact of every input")
+    parser.add_argument('--json', action='store_true',
+                        help="print values, gradients and per-step impacts as JSON")
+    args = parser.parse_args()
+
+    result = marginal_impacts()
+    if args.json:
+        print(json.dumps(dict(result, gradients={k: v.tolist() for k, v in result['gradients'].items()},
+                              impacts={k: v.tolist() for k, v in result['impacts'].items()}),
+                         indent=2))
+        return
+
+    impacts = result['impacts']
+    order = np.argsort(-np.abs(impacts['q6_monthly']), kind='stable')
+    print(f"  Base Q6 monthly ${result['outputs']['q6_monthly']:,.0f}, "
+          f"ROI {result['outputs']['roi']:.2f}x")
+    print(f"  {'Input':28s} {'Change':>11s} {'Q6 Monthly':>11s} {'18-Mo Rev':>11s} {'ROI':>7s}")
+    for j in order:
+        e = result['inputs'][j]
+        print(f"  {e['label']:28s} {e['change']:>11s} {impacts['q6_monthly'][j]:>+11,.0f} "
+              f"{impacts['total_revenue'][j]:>+11,.0f} {impacts['roi'][j]:>+7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Lead-Level Microsimulation
+The v2 engine works in expected values (7.5 qualified website leads, 42.8
+jobs). This draws the counts instead, per market, channel and month:
+
+  calls      ~ Poisson(max leads × ramp)            per channel
+  qualified  ~ Binomial(calls, qualified_rate)
+  jobs       ~ Binomial(qualified, closing_rate)
+  abatement  ~ Binomial(jobs, abate_conv), reconstruction likewise
+  revenue    = sum of per-job sizes for each job type
+
+Job sizes are gamma distributed with the client's average as the mean and
+JOB_SIZE_CV as the spread, so the total for k jobs is a single
+Gamma(k × shape) draw. A market whose LTV was set explicitly (not the sum
+of its components) draws one value per job with mean LTV instead, with the
+spread its components would give. Everything is batched array draws of shape
+(replications, markets, months); there is no per-lead Python object.
+
+The mean of every count matches the deterministic model exactly; the
+output is the spread around it (P10/P50/P90 monthly revenue per market and
+the chance the combined Q6 monthly average reaches the goal).
+
+Usage:
+  python3 microsimulation.py                         # 20,000 replications
+  python3 microsimulation.py --replications 200000 --seed 7 --json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, goal_monthly, market_ltv
+from vector_engine import RAMP_CHANNELS, MONTHS_PER_QUARTER, market_ramp_arrays
+
+CHANNEL_FIELDS = {'web': 'max_web', 'ads': 'max_ppc', 'gbp': 'max_gbp'}
+JOB_SIZE_CV = {'mit': 0.60, 'abate': 0.70, 'recon': 0.80}  # illustrative; per-job spread
+PERCENTILES = (10, 50, 90)
+BATCH = 20_000
+
+
+# ============================================================
+# DRAWS
+# ============================================================
+def _market_array(market_list, field):
+    return np.array([m.get(field, 0) for m in market_list], dtype=float)
+
+
+def _job_value_totals(rng, jobs, average, cv):
+    """Sum of `jobs` gamma job sizes with mean `average` (per market), in one draw"""
+    shape = 1.0 / cv ** 2
+    scale = np.broadcast_to(average / shape, jobs.shape)
+    return rng.gamma(jobs * shape, scale) if jobs.size else np.zeros(jobs.shape)
+
+
+def _job_value_cv(market):
+    """Spread of one job's value (mit + abate/recon when converted + fee) as a CV"""
+    mean = market_ltv(market)
+    if mean <= 0:
+        return JOB_SIZE_CV['mit']
+    var = (JOB_SIZE_CV['mit'] * market.get('mit_avg', 0)) ** 2
+    for phase in ('abate', 'recon'):
+        p, avg = market.get(f'{phase}_conv', 0), market.get(f'{phase}_avg', 0)
+        var += p * (1 + JOB_SIZE_CV[phase] ** 2) * avg ** 2 - (p * avg) ** 2
+    return var ** 0.5 / mean
+
+
+def simulate_batch(rng, reps, market_list, general, ramp_schedule):
+    """{metric: (reps, markets, months)} for one batch of replications"""
+    per_market = [market_ramp_arrays(m, ramp_schedule) for m in market_list]
+    ramp = {ch: np.array([r[ch] for r in per_market]) for ch in RAMP_CHANNELS}
+    months = ramp[RAMP_CHANNELS[0]].shape[1]
+    shape = (reps, len(market_list), months)
+
+    leads = {}
+    for ch in RAMP_CHANNELS:
+        expected = _market_array(market_list, CHANNEL_FIELDS[ch])[:, None] * ramp[ch]
+        calls = rng.poisson(np.broadcast_to(expected, shape))
+        leads[ch] = rng.binomial(calls, general['qualified_rate'])
+    qualified = leads['web'] + leads['ads'] + leads['gbp']
+    jobs = rng.binomial(qualified, general['closing_rate'])
+
+    col = lambda field: _market_array(market_list, field)[None, :, None]
+    abate_jobs = rng.binomial(jobs, np.broadcast_to(col('abate_conv'), shape))
+    recon_jobs = rng.binomial(jobs, np.broadcast_to(col('recon_conv'), shape))
+
+    revenue = (_job_value_totals(rng, jobs, col('mit_avg'), JOB_SIZE_CV['mit'])
+               + _job_value_totals(rng, abate_jobs, col('abate_avg'), JOB_SIZE_CV['abate'])
+               + _job_value_totals(rng, recon_jobs, col('recon_avg'), JOB_SIZE_CV['recon'])
+               + jobs * col('recon_fee'))
+    # An explicit LTV (not its components' sum) sets the mean job value directly
+    ltv_set = [j for j, m in enumerate(market_list) if m['ltv'] != market_ltv(m)]
+    if ltv_set:
+        ltv = np.array([market_list[j]['ltv'] for j in ltv_set])[None, :, None]
+        cv = np.array([_job_value_cv(market_list[j]) for j in ltv_set])[None, :, None]
+        revenue[:, ltv_set] = _job_value_totals(rng, jobs[:, ltv_set], ltv, cv)
+    ad_spend = leads['ads'] * col('cpl')
+
+    return {'qualified': qualified, 'jobs': jobs, 'revenue': revenue, 'ad_spend': ad_spend}
+
+
+# ============================================================
+# RUN
+# ============================================================
+def run_microsimulation(assumptions=None, replications=20_000, seed=0, batch=BATCH):
+    """
+    Per-market monthly revenue distributions plus the combined goal
+    probability. Monthly revenue samples are kept (reps × markets × months
+    floats) so percentiles are exact.
+    """
+    general, ramp_schedule, market_list = resolve_assumptions(assumptions)
+    rng = np.random.default_rng(seed)
+
+    parts = {'revenue': [], 'jobs': [], 'qualified': []}
+    for lo in range(0, replications, batch):
+        out = simulate_batch(rng, min(batch, replications - lo), market_list, general,
+                             ramp_schedule)
+        for k in parts:
+            parts[k].append(out[k])
+    draws = {k: np.concatenate(v) for k, v in parts.items()}
+
+    revenue = draws['revenue']
+    months = revenue.shape[2]
+    last_quarter = slice(months - MONTHS_PER_QUARTER, months)
+    q6_monthly = revenue[:, :, last_quarter].mean(axis=2)      # (reps, markets)
+    combined_q6 = q6_monthly.sum(axis=1)
+
+    markets_out = []
+    for j, m in enumerate(market_list):
+        monthly = revenue[:, j, :]
+        pct = np.percentile(monthly, PERCENTILES, axis=0)
+        markets_out.append({
+            'market': m['name'],
+            'monthly_revenue': {
+                'mean': monthly.mean(axis=0).round().tolist(),
+                **{f"p{p}": row.round().tolist() for p, row in zip(PERCENTILES, pct)},
+            },
+            'monthly_jobs_mean': draws['jobs'][:, j, :].mean(axis=0).round(2).tolist(),
+            'months_without_jobs': float((draws['jobs'][:, j, :] == 0).mean()),
+            'q6_monthly': dict(zip((f"p{p}" for p in PERCENTILES),
+                                   np.percentile(q6_monthly[:, j], PERCENTILES).round().tolist())),
+            'total_revenue': dict(zip((f"p{p}" for p in PERCENTILES),
+                                      np.percentile(monthly.sum(axis=1), PERCENTILES)
+                                      .round().tolist())),
+        })
+
+    return {
+        'replications': replications,
+        'markets': markets_out,
+        'combined_q6_monthly': dict(zip((f"p{p}" for p in PERCENTILES),
+                                        np.percentile(combined_q6, PERCENTILES).round().tolist())),
+        'prob_goal_met': float((combined_q6 >= goal_monthly).mean()),
+    }
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Lead-level stochastic microsimulation")
+    parser.add_argument('--replications', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print the full result as JSON")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = run_microsimulation(replications=args.replications, seed=args.seed)
+    elapsed = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    for m in result['markets']:
+        rev = m['monthly_revenue']
+        print(f"  {m['market'].upper()} monthly revenue (P10 / P50 / P90)")
+        print("  " + "-" * 50)
+        for i in range(len(rev['mean'])):
+            print(f"  M{i + 1:<3d} ${rev['p10'][i]:>9,.0f}  ${rev['p50'][i]:>9,.0f}  "
+                  f"${rev['p90'][i]:>9,.0f}   (mean ${rev['mean'][i]:,.0f})")
+        print(f"  Months with no jobs: {m['months_without_jobs']:.1%}")
+        print()
+    q6 = result['combined_q6_monthly']
+    print(f"  Combined Q6 monthly: P10 ${q6['p10']:,.0f} | P50 ${q6['p50']:,.0f} | "
+          f"P90 ${q6['p90']:,.0f}")
+    print(f"  P(Q6 monthly ≥ ${goal_monthly:,}): {result['prob_goal_met']:.1%}")
+    print(f"  {result['replications']:,} replications in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
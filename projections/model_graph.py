@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Projection Dependency Graph
+The v2 model as a DAG of named quantities instead of a fixed chain. Every
+quantity declares the quantities it reads and is cached as a (markets,
+periods) array (per-market totals as (markets, 1)).
+
+  graph = ProjectionGraph.from_assumptions()
+  graph['revenue']                          # computed once, then cached
+  graph.set('cpl', 900, market='Denver')    # marks Denver's row dirty downstream of cpl
+  graph['roi']                              # recomputes ad_spend, total_cost, roi for
+                                            # Denver only; leads and revenue stay cached
+
+Quantities are row-local (a market's row depends only on that market's
+inputs), so a change to one market re-evaluates one row of each downstream
+quantity, whatever the number of markets. Combined figures are sums over
+the cached rows (see frame()/summary()).
+
+New quantities register with the decorator and are available by name to
+any writer, without touching the rest of the model:
+
+  @quantity('cost_per_job', 'total_cost', 'jobs')
+  def cost_per_job(total_cost, jobs):
+      return np.divide(total_cost, jobs, out=np.zeros_like(total_cost), where=jobs > 0)
+
+The formulas and their operation order follow calculate_quarter(), so
+frame() matches ProjectionFrame.compute() cell for cell.
+
+Usage:
+  python3 model_graph.py                   # what-if session on the v2 defaults
+  python3 model_graph.py --markets 5000    # timing: full build vs one-market change
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, market_ltv, market_ramps
+from projection_frame import ProjectionFrame, ADDITIVE_METRICS
+from vector_engine import MONTHS_PER_QUARTER, LTV_FIELDS, RAMP_CHANNELS
+
+MARKET_INPUTS = ('max_web', 'max_ppc', 'max_gbp', 'cpl') + LTV_FIELDS + ('ltv_set',)
+GENERAL_INPUTS = ('qualified_rate', 'closing_rate', 'mgmt_fee_monthly', 'period_months')
+RAMP_INPUTS = tuple(f"ramp_{ch}" for ch in RAMP_CHANNELS)
+INPUTS = MARKET_INPUTS + GENERAL_INPUTS + RAMP_INPUTS
+
+QUANTITIES = {}  # name -> (dependencies, function), in registration order
+
+
+def quantity(name, *deps):
+    """Register a derived quantity computed from `deps` (arrays, row-sliced)"""
+    def register(fn):
+        QUANTITIES[name] = (tuple(deps), fn)
+        return fn
+    return register
+
+
+def _ratio(num, den):
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den > 0)
+
+
+# ============================================================
+# THE MODEL
+# ============================================================
+@quantity('ltv', 'mit_avg', 'abate_avg', 'abate_conv', 'recon_avg', 'recon_conv', 'recon_fee',
+          'ltv_set')
+def ltv(mit_avg, abate_avg, abate_conv, recon_avg, recon_conv, recon_fee, ltv_set):
+    """From the job components unless an explicit LTV was set (NaN = not set)"""
+    derived = mit_avg + abate_conv * abate_avg + recon_conv * recon_avg + recon_fee
+    return np.where(np.isnan(ltv_set), derived, ltv_set)
+
+
+@quantity('web_leads', 'max_web', 'ramp_web', 'qualified_rate', 'period_months')
+def web_leads(max_web, ramp_web, qualified_rate, period_months):
+    return max_web * ramp_web * qualified_rate * period_months
+
+
+@quantity('ppc_leads', 'max_ppc', 'ramp_ads', 'qualified_rate', 'period_months')
+def ppc_leads(max_ppc, ramp_ads, qualified_rate, period_months):
+    return max_ppc * ramp_ads * qualified_rate * period_months
+
+
+@quantity('gbp_leads', 'max_gbp', 'ramp_gbp', 'qualified_rate', 'period_months')
+def gbp_leads(max_gbp, ramp_gbp, qualified_rate, period_months):
+    return max_gbp * ramp_gbp * qualified_rate * period_months
+
+
+@quantity('total_leads', 'web_leads', 'ppc_leads', 'gbp_leads')
+def total_leads(web_leads, ppc_leads, gbp_leads):
+    return web_leads + ppc_leads + gbp_leads
+
+
+@quantity('ad_spend', 'ppc_leads', 'cpl')
+def ad_spend(ppc_leads, cpl):
+    return ppc_leads * cpl
+
+
+@quantity('mgmt_fee', 'mgmt_fee_monthly', 'period_months')
+def mgmt_fee(mgmt_fee_monthly, period_months):
+    return mgmt_fee_monthly * period_months
+
+
+@quantity('total_cost', 'ad_spend', 'mgmt_fee')
+def total_cost(ad_spend, mgmt_fee):
+    return ad_spend + mgmt_fee
+
+
+@quantity('jobs', 'total_leads', 'closing_rate')
+def jobs(total_leads, closing_rate):
+    return total_leads * closing_rate
+
+
+@quantity('revenue', 'jobs', 'ltv')
+def revenue(jobs, ltv):
+    return jobs * ltv
+
+
+@quantity('monthly_rev', 'revenue', 'period_months')
+def monthly_rev(revenue, period_months):
+    return revenue / period_months
+
+
+@quantity('roi', 'revenue', 'total_cost')
+def roi(revenue, total_cost):
+    return _ratio(revenue, total_cost)
+
+
+@quantity('total_revenue', 'revenue')
+def total_revenue(revenue):
+    return revenue.sum(axis=1, keepdims=True)
+
+
+@quantity('total_investment', 'total_cost')
+def total_investment(total_cost):
+    return np.broadcast_to(total_cost, total_cost.shape).sum(axis=1, keepdims=True)
+
+
+@quantity('final_monthly', 'monthly_rev')
+def final_monthly(monthly_rev):
+    return monthly_rev[:, -1:]
+
+
+# ============================================================
+# GRAPH
+# ============================================================
+def _topological(quantities):
+    """Quantity names ordered so every dependency comes first"""
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == 'done' or name in INPUTS:
+            return
+        if state.get(name) == 'active':
+            raise ValueError(f"dependency cycle: {' -> '.join(path + [name])}")
+        if name not in quantities:
+            raise ValueError(f"{path[-1] if path else name} depends on unknown quantity {name!r}")
+        state[name] = 'active'
+        for dep in quantities[name][0]:
+            visit(dep, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in quantities:
+        visit(name, [])
+    return order
+
+
+def graph_inputs(assumptions=None):
+    """(inputs, market names, periods): every INPUTS array for an assumption dict"""
+    return resolved_graph_inputs(*resolve_assumptions(assumptions))
+
+
+def resolved_graph_inputs(general, ramps, markets):
+    """graph_inputs() for already resolved (general, ramps, markets)"""
+    n = len(markets)
+    column = lambda values: np.asarray(values, dtype=float).reshape(n, 1)
+    inputs = {k: column([m.get(k, 0) for m in markets]) for k in MARKET_INPUTS[:-1]}
+    # An LTV equal to its components is derived; anything else is an explicit override
+    inputs['ltv_set'] = column([np.nan if m['ltv'] == market_ltv(m) else m['ltv']
+                                for m in markets])
+    for k in GENERAL_INPUTS[:-1]:
+        inputs[k] = column([general[k]] * n)
+    inputs['period_months'] = column([MONTHS_PER_QUARTER] * n)
+    for ch in RAMP_CHANNELS:
+        inputs[f"ramp_{ch}"] = np.array([[r[ch] for r in market_ramps(m, ramps).values()]
+                                         for m in markets], dtype=float).reshape(n, len(ramps))
+    return inputs, [m['name'] for m in markets], list(ramps)
+
+
+class ProjectionGraph:
+    """Cached quantities with per-market dirty rows"""
+
+    def __init__(self, inputs, markets, periods, quantities=None):
+        self.quantities = dict(quantities or QUANTITIES)
+        self.order = _topological(self.quantities)
+        self.markets = list(markets)
+        self.periods = list(periods)
+        self._market_pos = {name: i for i, name in enumerate(self.markets)}
+        self.values = {k: np.array(v, dtype=float) for k, v in inputs.items()}
+        missing = [k for k in INPUTS if k not in self.values]
+        if missing:
+            raise ValueError(f"missing inputs: {', '.join(missing)}")
+
+        position = {name: i for i, name in enumerate(self.order)}
+        dependents = {name: set() for name in list(INPUTS) + self.order}
+        for name in self.order:
+            for dep in self.quantities[name][0]:
+                dependents[dep].add(name)
+        # Everything downstream of each name, and upstream of each quantity, in topo order
+        self._downstream = {name: self._closure(name, dependents, position) for name in dependents}
+        upstream = {name: set(self.quantities[name][0]) & set(self.order) for name in self.order}
+        self._upstream = {name: self._closure(name, upstream, position) + [name]
+                          for name in self.order}
+
+        n = len(self.markets)
+        self._dirty = {name: np.ones(n, dtype=bool) for name in self.order}
+        self.evaluations = Counter()  # quantity -> market rows evaluated
+
+    @staticmethod
+    def _closure(name, edges, position):
+        seen, stack = set(), list(edges[name])
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(edges.get(node, ()))
+        return sorted(seen, key=position.__getitem__)
+
+    @classmethod
+    def from_assumptions(cls, assumptions=None, quantities=None):
+        inputs, markets, periods = graph_inputs(assumptions)
+        return cls(inputs, markets, periods, quantities)
+
+    # ------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------
+    def market_index(self, name):
+        try:
+            return self._market_pos[name]
+        except KeyError:
+            raise KeyError(f"no market {name!r}; have {', '.join(self.markets)}") from None
+
+    def __getitem__(self, name):
+        if name in self.quantities:
+            self._refresh(name)
+        elif name not in self.values:
+            raise KeyError(f"unknown quantity {name!r}")
+        return self.values[name]
+
+    def _refresh(self, name):
+        for node in self._upstream[name]:
+            dirty = self._dirty[node]
+            if not dirty.any():
+                continue
+            deps, fn = self.quantities[node]
+            if node not in self.values or dirty.all():
+                self.values[node] = np.array(fn(*(self.values[d] for d in deps)), dtype=float)
+                self.evaluations[node] += len(dirty)
+            else:
+                rows = np.flatnonzero(dirty)
+                out = fn(*(self.values[d][rows] for d in deps))
+                self.values[node][rows] = np.broadcast_to(out, self.values[node][rows].shape)
+                self.evaluations[node] += len(rows)
+            dirty[:] = False
+
+    # ------------------------------------------------------------
+    # What-if
+    # ------------------------------------------------------------
+    def set(self, name, value, market=None):
+        """Change an input for one market (name or position(s)) or all; returns dirtied names"""
+        if name == 'ltv':
+            name = 'ltv_set'
+        if name not in INPUTS:
+            raise KeyError(f"{name!r} is not an input; inputs are {', '.join(INPUTS)}")
+        rows = (slice(None) if market is None
+                else self.market_index(market) if isinstance(market, str) else market)
+        self.values[name][rows] = value
+        for node in self._downstream[name]:
+            self._dirty[node][rows] = True
+        return list(self._downstream[name])
+
+    def update(self, inputs):
+        """
+        set() every input row that differs from `inputs` (graph_inputs() for the
+        same markets and periods); returns a bool mask of the changed markets
+        """
+        changed = np.zeros(len(self.markets), dtype=bool)
+        for name in INPUTS:
+            old, new = self.values[name], np.asarray(inputs[name], dtype=float)
+            if old.shape != new.shape:
+                raise ValueError(f"{name}: shape {new.shape} does not match {old.shape}")
+            same = (old == new) | (np.isnan(old) & np.isnan(new))
+            rows = np.flatnonzero(~same.all(axis=1))
+            if len(rows):
+                self.set(name, new[rows], rows)
+                changed[rows] = True
+        return changed
+
+    def add(self, name, deps, fn):
+        """Register a quantity on this graph only; returns a new graph sharing the inputs"""
+        quantities = dict(self.quantities)
+        quantities[name] = (tuple(deps), fn)
+        inputs = {k: self.values[k] for k in INPUTS}
+        return ProjectionGraph(inputs, self.markets, self.periods, quantities)
+
+    # ------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------
+    def frame(self):
+        """ProjectionFrame of the cached quantities (rounded like calculate_quarter())"""
+        shape = (len(self.markets), len(self.periods))
+        sums = {k: np.broadcast_to(self[k], shape) for k in ADDITIVE_METRICS}
+        return ProjectionFrame.from_sums(sums, self.markets, self.periods,
+                                         months_per_period=self.values['period_months'])
+
+    def summary(self):
+        return self.frame().summary()
+
+    def stats(self):
+        """Market rows evaluated per quantity since the last call"""
+        out = dict(self.evaluations)
+        self.evaluations.clear()
+        return out
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def _synthetic_assumptions(n, seed=0):
+    """n markets jittered around Tucson and Denver (for timing)"""
+    rng = np.random.default_rng(seed)
+    _, _, base = resolve_assumptions()
+    markets = []
+    for i in range(n):
+        m = dict(base[i % len(base)], name=f"Market {i + 1}")
+        for k in ('max_web', 'max_ppc', 'max_gbp', 'cpl'):
+            m[k] = float(m[k] * rng.uniform(0.7, 1.3))
+        markets.append(m)
+    return {'markets': markets}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental what-if on the projection DAG")
+    parser.add_argument('--markets', type=int, default=0,
+                        help="time a synthetic set of this many markets instead")
+    args = parser.parse_args()
+
+    if args.markets:
+        t0 = time.perf_counter()
+        graph = ProjectionGraph.from_assumptions(_synthetic_assumptions(args.markets))
+        graph['roi'], graph['final_monthly']
+        t1 = time.perf_counter()
+        graph.stats()
+        graph.set('cpl', 900.0, market=args.markets // 2)
+        graph['roi'], graph['final_monthly']
+        t2 = time.perf_counter()
+        print(f"  {args.markets:,} markets: full build {1000 * (t1 - t0):.1f}ms, "
+              f"one-market CPL change {1000 * (t2 - t1):.2f}ms")
+        print("  recomputed rows: " + ", ".join(f"{k} {v}" for k, v in graph.stats().items()))
+        return
+
+    graph = ProjectionGraph.from_assumptions()
+    s = graph.summary()
+    graph.stats()
+    print(f"  v2: Q6 monthly ${s['q6_monthly']:,}, ROI {s['roi']}x")
+    for name, value, market in (('cpl', 900, 'Denver'), ('closing_rate', 0.45, None),
+                                ('mit_avg', 5000, 'Tucson')):
+        graph.set(name, value, market)
+        s = graph.summary()
+        where = market or 'all markets'
+        print(f"  {name} = {value} ({where}): Q6 monthly ${s['q6_monthly']:,}, ROI {s['roi']}x")
+        print("    recomputed: " + ", ".join(f"{k} ×{v}" for k, v in graph.stats().items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Pareto Frontier Explorer
+Evaluates large batches of channel-mix plans (PPC budget and ramp, GBP
+investment, website timing, management fee level) and keeps only the plans
+that are not dominated on:
+
+  total investment (min)  vs  18-month revenue (max)  [vs  Q6 monthly (max)]
+
+Two objectives use an O(n log n) skyline (sort by cost, running max of
+revenue). Three objectives use a sort-and-sweep non-dominated filter with a
+2D staircase (Kung et al.). Plans stream through in chunks from the same lazy
+grid enumeration as scenario_grid.py, and the frontier is merged per chunk,
+so memory is bounded by the frontier, not by the number of plans.
+
+Plan space spec = scenario_grid axes, plus an optional "monthly_cost" per
+value for levers the engine does not price itself (GBP profile work,
+content for an earlier website). DEFAULT_PLAN_SPACE values are illustrative
+starting points; copy and edit them for a client.
+
+Usage:
+  python3 pareto.py                              # default plan space, 3 objectives
+  python3 pareto.py --spec plans.json --objectives 2 --xlsx frontier.xlsx
+"""
+
+import argparse
+import bisect
+import json
+import os
+import time
+
+import numpy as np
+
+from scenario_grid import ScenarioGrid
+from projection_engine import goal_monthly
+
+CHUNK_SIZE = 200_000
+MONTHS = 18
+
+DEFAULT_PLAN_SPACE = {
+    'axes': [
+        {'target': '*.ramp_ads', 'values': {
+            'ads fast': [0.60, 0.90, 1.00, 1.00, 1.00, 1.00],
+            'ads v2':   [0.30, 0.60, 0.80, 0.90, 1.00, 1.00],
+            'ads slow': [0.20, 0.40, 0.60, 0.75, 0.90, 1.00]}},
+        {'target': 'tucson.max_ppc', 'values': [10, 15, 20, 25, 30]},
+        {'target': 'denver.max_ppc', 'values': [20, 25, 30, 40, 50]},
+        {'target': 'tucson.max_gbp', 'values': [30, 40, 50], 'monthly_cost': [0, 1500, 3000]},
+        {'target': 'denver.max_gbp', 'values': [50, 65, 80], 'monthly_cost': [0, 1500, 3000]},
+        {'target': '*.ramp_web', 'values': {
+            'web Q2 start': [0.00, 0.05, 0.15, 0.35, 0.60, 0.80],
+            'web Q3 start': [0.00, 0.00, 0.05, 0.15, 0.35, 0.60],
+            'web Q4 start': [0.00, 0.00, 0.00, 0.05, 0.20, 0.45]},
+         'monthly_cost': [2000, 0, 0]},
+        {'target': 'general.mgmt_fee_monthly', 'values': [2750, 3500]},
+    ],
+}
+
+
+# ============================================================
+# NON-DOMINATED FILTERS
+# ============================================================
+def skyline_2d(cost, value):
+    """
+    Indices of plans not dominated on (min cost, max value), cheapest first.
+    Sort by cost (ties: best value first); keep a plan only if it beats every
+    cheaper plan's value.
+    """
+    cost, value = np.asarray(cost), np.asarray(value)
+    order = np.lexsort((-value, cost))
+    v = value[order]
+    best_before = np.concatenate([[-np.inf], np.maximum.accumulate(v)[:-1]])
+    return order[v > best_before]
+
+
+def nondominated_3d(cost, value_a, value_b):
+    """
+    Indices not dominated on (min cost, max a, max b), cheapest first.
+    Sweep in cost order keeping a staircase of (a, b) seen so far: a is kept
+    ascending with b strictly descending, so "is there a cheaper plan with
+    a' >= a and b' >= b" is one bisect.
+    """
+    cost, value_a, value_b = np.asarray(cost), np.asarray(value_a), np.asarray(value_b)
+    order = np.lexsort((-value_b, -value_a, cost))
+    stair_a, stair_b, keep = [], [], []
+    for i, a, b in zip(order.tolist(), value_a[order].tolist(), value_b[order].tolist()):
+        pos = bisect.bisect_left(stair_a, a)
+        if pos < len(stair_a) and stair_b[pos] >= b:
+            continue  # a cheaper plan is at least as good on both
+        keep.append(i)
+        # Drop staircase points this plan now dominates (a' <= a, b' <= b)
+        lo = pos
+        while lo > 0 and stair_b[lo - 1] <= b:
+            lo -= 1
+        end = pos + 1 if pos < len(stair_a) and stair_a[pos] == a else pos
+        stair_a[lo:end] = [a]
+        stair_b[lo:end] = [b]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def frontier_indices(objectives, cost, revenue, q6):
+    if objectives == 2:
+        return skyline_2d(cost, revenue)
+    return nondominated_3d(cost, revenue, q6)
+
+
+# ============================================================
+# PLAN EVALUATION
+# ============================================================
+class PlanSpace:
+    """A scenario grid of plan levers plus per-lever monthly costs"""
+
+    def __init__(self, spec):
+        self.grid = ScenarioGrid(spec)
+        self.extra_costs = []
+        for axis_spec, axis in zip(spec['axes'], self.grid.axes):
+            costs = axis_spec.get('monthly_cost')
+            if costs is not None and len(costs) != len(axis):
+                raise ValueError(f"{axis.target}: monthly_cost needs one entry per value")
+            self.extra_costs.append(np.asarray(costs if costs is not None else
+                                               np.zeros(len(axis)), dtype=float))
+
+    def evaluate(self, rows):
+        """(investment, total_revenue, q6_monthly) for a block of plan numbers"""
+        out = self.grid.evaluate(rows)
+        extra = sum(c[i] for c, i in zip(self.extra_costs, self.grid.decode(rows)))
+        investment = out['total_investment'] + extra * MONTHS
+        return investment, np.asarray(out['total_revenue']), np.asarray(out['q6_monthly'])
+
+
+def run_frontier(spec=None, objectives=3, chunk_size=CHUNK_SIZE, log=None):
+    """
+    Stream every plan through the frontier filter. Returns a dict of arrays
+    (row, investment, total_revenue, q6_monthly) for the frontier, cheapest
+    first, plus the PlanSpace used.
+    """
+    space = PlanSpace(spec or DEFAULT_PLAN_SPACE)
+    size = space.grid.size
+    front = {k: np.empty(0) for k in ('investment', 'total_revenue', 'q6_monthly')}
+    front['row'] = np.empty(0, dtype=np.int64)
+
+    for lo in range(0, size, chunk_size):
+        rows = np.arange(lo, min(lo + chunk_size, size), dtype=np.int64)
+        inv, rev, q6 = space.evaluate(rows)
+        # Frontier of (chunk frontier ∪ running frontier) == frontier so far
+        local = frontier_indices(objectives, inv, rev, q6)
+        merged = {
+            'row': np.concatenate([front['row'], rows[local]]),
+            'investment': np.concatenate([front['investment'], inv[local]]),
+            'total_revenue': np.concatenate([front['total_revenue'], rev[local]]),
+            'q6_monthly': np.concatenate([front['q6_monthly'], q6[local]]),
+        }
+        keep = frontier_indices(objectives, merged['investment'], merged['total_revenue'],
+                                merged['q6_monthly'])
+        front = {k: v[keep] for k, v in merged.items()}
+        if log:
+            log(f"  {rows[-1] + 1:,}/{size:,} plans, frontier {len(front['row']):,}")
+
+    order = np.argsort(front['investment'], kind='stable')
+    front = {k: v[order] for k, v in front.items()}
+    front['space'] = space
+    return front
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def add_frontier_sheet(wb, front, title="Pareto Frontier"):
+    """One row per non-dominated plan, cheapest first"""
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (goal_met_fill, thin_border, money_fmt, roi_fmt,
+                                 style_header, auto_width)
+
+    if title in wb.sheetnames:
+        del wb[title]
+    ws = wb.create_sheet(title)
+    grid = front['space'].grid
+    lever_names = [a.target for a in grid.axes]
+    ws.append(["Plan #"] + lever_names +
+              ["Total Investment", "18-Mo Revenue", "Q6 Monthly Revenue", "ROI", "$300k Goal"])
+    style_header(ws)
+
+    n_levers = len(lever_names)
+    for i in range(len(front['row'])):
+        row = int(front['row'][i])
+        labels = grid.describe(row)
+        inv = float(front['investment'][i])
+        rev = float(front['total_revenue'][i])
+        q6 = float(front['q6_monthly'][i])
+        ws.append([row] + [labels[t] for t in lever_names] +
+                  [round(inv), round(rev), round(q6), round(rev / inv, 1) if inv else 0,
+                   "GOAL MET" if q6 >= goal_monthly else "BELOW TARGET"])
+
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            cell.alignment = Alignment(horizontal='center')
+            if n_levers < idx <= n_levers + 3:
+                cell.number_format = money_fmt
+            elif idx == n_levers + 4:
+                cell.number_format = roi_fmt
+        if row[-1].value == "GOAL MET":
+            row[-1].fill = goal_met_fill
+            row[-1].font = Font(bold=True)
+    auto_width(ws)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Pareto frontier of channel-mix plans")
+    parser.add_argument('--spec', help="plan space JSON (scenario_grid axes + monthly_cost)")
+    parser.add_argument('--objectives', type=int, choices=(2, 3), default=3,
+                        help="2: investment vs 18-mo revenue; 3: adds Q6 monthly")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--xlsx', help="add/replace the 'Pareto Frontier' tab in this workbook")
+    args = parser.parse_args()
+
+    spec = None
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+
+    t0 = time.perf_counter()
+    front = run_frontier(spec, args.objectives, args.chunk_size, log=print)
+    size = front['space'].grid.size
+    print(f"  {len(front['row']):,} non-dominated of {size:,} plans "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+    if args.xlsx:
+        from openpyxl import Workbook, load_workbook
+        if os.path.exists(args.xlsx):
+            wb = load_workbook(args.xlsx)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+        add_frontier_sheet(wb, front)
+        wb.save(args.xlsx)
+        print(f"✅ Created: {args.xlsx}")
+
+
+if __name__ == '__main__':
+    main()
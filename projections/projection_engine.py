@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Projection Engine (Conservative v2 assumptions)
+
+The calculation core shared by create_conservative_v2.py and the projection
+service. Importing this module has no side effects and does not need openpyxl,
+so long-running processes can keep it loaded and call project() directly.
+"""
+
+import copy
+
+# ============================================================
+# CONSERVATIVE RAMP SCHEDULES
+# ============================================================
+# These are MUCH slower than v1
+ramps = {
+    'Q1': {'ads': 0.30, 'gbp': 0.10, 'web': 0.00},  # Months 1-3: Just starting ads, GBP barely live
+    'Q2': {'ads': 0.60, 'gbp': 0.25, 'web': 0.00},  # Months 4-6: Ads optimizing, GBP building reviews
+    'Q3': {'ads': 0.80, 'gbp': 0.45, 'web': 0.05},  # Months 7-9: Ads strong, GBP gaining, website starting
+    'Q4': {'ads': 0.90, 'gbp': 0.65, 'web': 0.15},  # Months 10-12: Near-peak ads, GBP growing, website crawling
+    'Q5': {'ads': 1.00, 'gbp': 0.85, 'web': 0.35},  # Months 13-15: Full ads, GBP strong, website picking up
+    'Q6': {'ads': 1.00, 'gbp': 1.00, 'web': 0.60},  # Months 16-18: Full ads+GBP, website at 60% (still growing)
+}
+
+# ============================================================
+# MARKET ASSUMPTIONS
+# ============================================================
+qualified_rate = 0.50  # 50% of calls are qualified
+closing_rate = 0.50    # 50% of qualified leads close
+mgmt_fee_monthly = 5500 / 2  # $2,750/month per location
+
+general = {
+    'qualified_rate': qualified_rate,
+    'closing_rate': closing_rate,
+    'mgmt_fee_monthly': mgmt_fee_monthly,
+}
+
+goal_monthly = 300000  # Combined monthly revenue target by Q6
+
+tucson = {
+    'name': 'Tucson',
+    'max_web': 20, 'max_ppc': 15, 'max_gbp': 30,
+    'cpl': 700,
+    'mit_avg': 4589, 'abate_avg': 7484, 'abate_conv': 0.30,
+    'recon_avg': 7452, 'recon_conv': 0.55,
+    'ltv': 4589 + (0.30 * 7484) + (0.55 * 7452)  # = $10,933.80
+}
+
+denver = {
+    'name': 'Denver',
+    'max_web': 35, 'max_ppc': 30, 'max_gbp': 50,
+    'cpl': 800,
+    'mit_avg': 6100, 'recon_fee': 0,
+    'ltv': 6100
+}
+
+markets = [tucson, denver]
+
+month_labels = ["1-3", "4-6", "7-9", "10-12", "13-15", "16-18"]
+
+MARKET_FIELDS = ('max_web', 'max_ppc', 'max_gbp', 'cpl')
+
+
+def market_ltv(market):
+    """LTV per job: Mit + (Abate% × Abate) + (Recon% × Recon) + referral fee"""
+    return (market.get('mit_avg', 0)
+            + market.get('abate_conv', 0) * market.get('abate_avg', 0)
+            + market.get('recon_conv', 0) * market.get('recon_avg', 0)
+            + market.get('recon_fee', 0))
+
+
+# ============================================================
+# CALCULATION ENGINE
+# ============================================================
+def calculate_quarter(market, ramp, quarter_label, general=general):
+    """Calculate one quarter of projections for a location"""
+    qualified_rate = general['qualified_rate']
+    closing_rate = general['closing_rate']
+
+    # Qualified leads per quarter (max × ramp × qualified% × 3 months)
+    web_leads = market['max_web'] * ramp['web'] * qualified_rate * 3
+    ppc_leads = market['max_ppc'] * ramp['ads'] * qualified_rate * 3
+    gbp_leads = market['max_gbp'] * ramp['gbp'] * qualified_rate * 3
+    total_leads = web_leads + ppc_leads + gbp_leads
+
+    # Costs
+    # Ad spend = qualified PPC leads × CPL (this IS the ad spend to acquire those leads)
+    ad_spend = ppc_leads * market['cpl']
+    mgmt_fee = general['mgmt_fee_monthly'] * 3  # quarterly
+    total_cost = ad_spend + mgmt_fee
+
+    # Revenue
+    jobs = total_leads * closing_rate
+    revenue = jobs * market['ltv']
+    monthly_revenue = revenue / 3
+    roi = revenue / total_cost if total_cost > 0 else 0
+
+    return {
+        'quarter': quarter_label,
+        'web_leads': round(web_leads, 1),
+        'ppc_leads': round(ppc_leads, 1),
+        'gbp_leads': round(gbp_leads, 1),
+        'total_leads': round(total_leads, 1),
+        'ad_spend': round(ad_spend),
+        'mgmt_fee': round(mgmt_fee),
+        'total_cost': round(total_cost),
+        'jobs': round(jobs, 1),
+        'revenue': round(revenue),
+        'monthly_rev': round(monthly_revenue),
+        'roi': round(roi, 1)
+    }
+
+
+def market_ramps(market, ramps=ramps):
+    """
+    The quarterly ramp schedule for one market: the shared schedule, or the
+    quarter averages of its compiled ramp_curves (see resolve_assumptions())
+    """
+    monthly = market.get('ramp_months')
+    if not monthly:
+        return ramps
+    return {q_label: {ch: sum(values[i * 3:(i + 1) * 3]) / 3 for ch, values in monthly.items()}
+            for i, q_label in enumerate(ramps)}
+
+
+def calc_all_quarters(market, ramps=ramps, general=general):
+    """Calculate all 6 quarters for a market"""
+    results = []
+    for q_label, ramp in market_ramps(market, ramps).items():
+        results.append(calculate_quarter(market, ramp, q_label, general))
+    return results
+
+
+def combine_quarters(market_data):
+    """Combine per-market quarter lists into the Combined Summary rows"""
+    combined = []
+    for i, rows in enumerate(zip(*market_data)):
+        total_leads = sum(r['total_leads'] for r in rows)
+        total_ad = sum(r['ad_spend'] for r in rows)
+        total_mgmt = sum(r['mgmt_fee'] for r in rows)
+        total_inv = sum(r['total_cost'] for r in rows)
+        total_jobs = sum(r['jobs'] for r in rows)
+        total_rev = sum(r['revenue'] for r in rows)
+        monthly_rev = total_rev / 3
+        combined_roi = total_rev / total_inv if total_inv > 0 else 0
+
+        combined.append({
+            'quarter': rows[0]['quarter'],
+            'months': month_labels[i] if i < len(month_labels) else '',
+            'total_leads': round(total_leads, 1),
+            'ad_spend': round(total_ad),
+            'mgmt_fee': round(total_mgmt),
+            'total_cost': round(total_inv),
+            'jobs': round(total_jobs, 1),
+            'revenue': round(total_rev),
+            'monthly_rev': round(monthly_rev),
+            'roi': round(combined_roi, 1),
+            'goal_pct': monthly_rev / goal_monthly,
+        })
+    return combined
+
+
+def summarize(combined):
+    """Headline numbers printed at the bottom of the console report"""
+    total_rev = sum(r['revenue'] for r in combined)
+    total_cost = sum(r['total_cost'] for r in combined)
+    q6_monthly = combined[-1]['monthly_rev'] if combined else 0
+    return {
+        'q6_monthly': q6_monthly,
+        'total_revenue': total_rev,
+        'total_investment': total_cost,
+        'roi': round(total_rev / total_cost, 1) if total_cost > 0 else 0,
+        'goal_monthly': goal_monthly,
+        'goal_met': q6_monthly >= goal_monthly,
+    }
+
+
+# ============================================================
+# ASSUMPTION JSON
+# ============================================================
+def default_assumptions():
+    """The v2 assumptions as a JSON-serializable dict (see project())"""
+    return {
+        'general': dict(general),
+        'ramps': copy.deepcopy(ramps),
+        'markets': copy.deepcopy(markets),
+    }
+
+
+def resolve_assumptions(assumptions=None):
+    """
+    Overlay an assumption dict on the v2 defaults.
+
+    Accepted keys (all optional):
+      general: {qualified_rate, closing_rate, mgmt_fee_monthly}
+      ramps:   {Q1: {ads, gbp, web}, ...}  replaces the whole schedule
+      markets: [{name, max_web, max_ppc, max_gbp, cpl, mit_avg, ...}]
+               a market whose name matches a default (Tucson/Denver) only
+               needs the fields that change; 'ltv' is recalculated from the
+               job components unless given explicitly
+               'ramp_curves': {channel: curve spec} gives a market its own
+               ramp for those channels (ramp_curves.py); they are compiled
+               to monthly values in 'ramp_months' over the schedule's horizon
+    """
+    assumptions = assumptions or {}
+    if not isinstance(assumptions, dict):
+        raise ValueError("assumptions must be a JSON object")
+    for key, kind, label in (('general', dict, 'an object'), ('ramps', dict, 'an object'),
+                             ('markets', list, 'a list')):
+        if assumptions.get(key) is not None and not isinstance(assumptions[key], kind):
+            raise ValueError(f"{key} must be {label}")
+
+    resolved_general = dict(general)
+    resolved_general.update(assumptions.get('general') or {})
+
+    resolved_ramps = copy.deepcopy(assumptions.get('ramps') or ramps)
+    for q_label, ramp in resolved_ramps.items():
+        if not isinstance(ramp, dict):
+            raise ValueError(f"ramp {q_label} must be an object with ads, gbp and web")
+        missing = [k for k in ('ads', 'gbp', 'web') if k not in ramp]
+        if missing:
+            raise ValueError(f"ramp {q_label} is missing {', '.join(missing)}")
+
+    defaults_by_name = {m['name'].lower(): m for m in markets}
+    resolved_markets = []
+    for overrides in assumptions.get('markets') or markets:
+        if not isinstance(overrides, dict):
+            raise ValueError(f"every market must be an object with a name, got {overrides!r}")
+        name = str(overrides.get('name', '')).strip()
+        if not name:
+            raise ValueError("every market needs a name")
+        base = defaults_by_name.get(name.lower(), {})
+        market = dict(base)
+        market.update(overrides)
+        missing = [k for k in MARKET_FIELDS if k not in market]
+        if missing:
+            raise ValueError(f"market {name} is missing {', '.join(missing)}")
+        if 'ltv' not in overrides and any(
+                k in overrides for k in ('mit_avg', 'abate_avg', 'abate_conv',
+                                         'recon_avg', 'recon_conv', 'recon_fee')):
+            market['ltv'] = market_ltv(market)
+        market.setdefault('ltv', market_ltv(market))
+        if market.get('ramp_curves'):
+            from ramp_curves import market_ramp_months  # ramp_curves imports this module
+            market['ramp_months'] = market_ramp_months(market['ramp_curves'], resolved_ramps)
+        resolved_markets.append(market)
+
+    return resolved_general, resolved_ramps, resolved_markets
+
+
+def project(assumptions=None):
+    """Run the engine for one scenario and return a JSON-serializable result"""
+    resolved_general, resolved_ramps, resolved_markets = resolve_assumptions(assumptions)
+
+    market_data = [calc_all_quarters(m, resolved_ramps, resolved_general)
+                   for m in resolved_markets]
+    combined = combine_quarters(market_data)
+
+    return {
+        'markets': {m['name']: data for m, data in zip(resolved_markets, market_data)},
+        'combined': combined,
+        'summary': summarize(combined),
+    }
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Projection Frame
+Columnar results for one assumption set: one contiguous (markets, periods)
+array per metric instead of a list of per-quarter dicts per market.
+
+  frame = ProjectionFrame.from_assumptions()
+  frame['revenue']                 # (markets, periods) array, no copy
+  frame.sel(markets=['Denver'])    # views, no copy for names/slices
+  frame.totals()                   # per-market 18-month totals, vectorized
+  frame.combined()                 # all markets rolled into one row per period
+
+Values are rounded exactly as calculate_quarter() rounds them (leads and
+jobs to 0.1, money to whole dollars, ROI to 0.1), and combined() rounds the
+same way as combine_quarters(), so writers can switch between the two
+without changing a cell. records() gives the old list-of-dicts shape.
+
+Usage:
+  python3 projection_frame.py    # print the v2 frame per market and combined
+"""
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, goal_monthly, month_labels, market_ramps
+from vector_engine import MONTHS_PER_QUARTER
+
+# Same keys and order as calculate_quarter() (minus 'quarter')
+METRICS = ('web_leads', 'ppc_leads', 'gbp_leads', 'total_leads',
+           'ad_spend', 'mgmt_fee', 'total_cost',
+           'jobs', 'revenue', 'monthly_rev', 'roi')
+COUNT_METRICS = ('web_leads', 'ppc_leads', 'gbp_leads', 'total_leads', 'jobs')
+MONEY_METRICS = ('ad_spend', 'mgmt_fee', 'total_cost', 'revenue', 'monthly_rev')
+ADDITIVE_METRICS = tuple(k for k in METRICS if k not in ('monthly_rev', 'roi'))
+
+
+def _ratio(num, den):
+    """num / den where den > 0, else 0 (the engine's ROI convention)"""
+    num, den = np.asarray(num, dtype=float), np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _round1(v):
+    """
+    Python's round(x, 1) elementwise. np.round scales by 10 first, which can
+    land exactly on .5 and round the other way; those near-ties are rare and
+    go through round() itself.
+    """
+    v = np.asarray(v, dtype=float)
+    out = np.round(v, 1)
+    scaled = v * 10
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if tie.any():
+        out[tie] = [round(x, 1) for x in v[tie].tolist()]
+    return out
+
+
+def _round_columns(raw):
+    out = {}
+    for k, v in raw.items():
+        if k in MONEY_METRICS:
+            out[k] = np.rint(v).astype(np.int64)  # round-half-even, like round(x)
+        else:
+            out[k] = _round1(v)
+    return out
+
+
+class ProjectionFrame:
+    """metric -> (markets, periods) arrays, with market and period labels"""
+
+    def __init__(self, columns, markets, periods, months=None, extra=None):
+        self.columns = columns
+        self.markets = list(markets)
+        self.periods = list(periods)
+        self.months = list(months if months is not None else month_labels[:len(self.periods)])
+        self.extra = extra or {}  # other per-market/period arrays (goal_pct on combined())
+        self._market_pos = {name: i for i, name in enumerate(self.markets)}
+
+    # ------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------
+    @classmethod
+    def compute(cls, general, ramps, markets):
+        """Vectorized calculate_quarter() over every market × quarter"""
+        field = lambda k: np.array([m[k] for m in markets], dtype=float)[:, None]
+        ramp = lambda ch: np.array([[r[ch] for r in market_ramps(m, ramps).values()]
+                                    for m in markets], dtype=float)
+        qualified_rate = general['qualified_rate']
+
+        # Same operation order as calculate_quarter() so rounding matches bit for bit
+        web = field('max_web') * ramp('web') * qualified_rate * MONTHS_PER_QUARTER
+        ppc = field('max_ppc') * ramp('ads') * qualified_rate * MONTHS_PER_QUARTER
+        gbp = field('max_gbp') * ramp('gbp') * qualified_rate * MONTHS_PER_QUARTER
+        leads = web + ppc + gbp
+        ad_spend = ppc * field('cpl')
+        mgmt_fee = np.full_like(leads, general['mgmt_fee_monthly'] * MONTHS_PER_QUARTER)
+        total_cost = ad_spend + mgmt_fee
+        jobs = leads * general['closing_rate']
+        revenue = jobs * field('ltv')
+
+        columns = _round_columns({
+            'web_leads': web, 'ppc_leads': ppc, 'gbp_leads': gbp, 'total_leads': leads,
+            'ad_spend': ad_spend, 'mgmt_fee': mgmt_fee, 'total_cost': total_cost,
+            'jobs': jobs, 'revenue': revenue, 'monthly_rev': revenue / MONTHS_PER_QUARTER,
+            'roi': _ratio(revenue, total_cost),
+        })
+        return cls(columns, [m['name'] for m in markets], list(ramps))
+
+    @classmethod
+    def from_assumptions(cls, assumptions=None):
+        return cls.compute(*resolve_assumptions(assumptions))
+
+    @classmethod
+    def from_sums(cls, sums, markets, periods, months=None, months_per_period=MONTHS_PER_QUARTER):
+        """
+        Frame from unrounded ADDITIVE_METRICS sums: monthly revenue and ROI are
+        derived, everything is rounded once, and goal_pct goes in extra.
+        months_per_period may be an array for uneven periods.
+        """
+        monthly = sums['revenue'] / months_per_period
+        columns = _round_columns(dict({k: sums[k] for k in ADDITIVE_METRICS}, monthly_rev=monthly,
+                                      roi=_ratio(sums['revenue'], sums['total_cost'])))
+        return cls(columns, markets, periods, months, {'goal_pct': monthly / goal_monthly})
+
+    # ------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------
+    def __getitem__(self, metric):
+        if metric in self.columns:
+            return self.columns[metric]
+        return self.extra[metric]
+
+    def __len__(self):
+        return len(self.markets)
+
+    @property
+    def shape(self):
+        return (len(self.markets), len(self.periods))
+
+    def market_index(self, name):
+        try:
+            return self._market_pos[name]
+        except KeyError:
+            raise KeyError(f"no market {name!r}; have {', '.join(self.markets)}") from None
+
+    def _index(self, selector, lookup):
+        if selector is None:
+            return slice(None)
+        if isinstance(selector, slice):
+            return selector
+        idx = [lookup(s) if isinstance(s, str) else s for s in selector]
+        # A contiguous run slices as a view instead of a fancy-index copy
+        if idx and idx == list(range(idx[0], idx[0] + len(idx))):
+            return slice(idx[0], idx[0] + len(idx))
+        return idx
+
+    def sel(self, markets=None, periods=None):
+        """Sub-frame by market names/positions and period labels/positions"""
+        mi = self._index(markets, self.market_index)
+        pi = self._index(periods, self.periods.index)
+        pick = lambda a: a[mi][:, pi]
+        names = np.array(self.markets, dtype=object)[mi].tolist()
+        return ProjectionFrame({k: pick(v) for k, v in self.columns.items()}, names,
+                               np.array(self.periods, dtype=object)[pi].tolist(),
+                               np.array(self.months, dtype=object)[pi].tolist(),
+                               {k: pick(v) for k, v in self.extra.items()})
+
+    def rows(self, market, metrics=METRICS):
+        """One list per period of plain Python values, in `metrics` order"""
+        i = self.market_index(market) if isinstance(market, str) else market
+        cols = [self[k][i].tolist() for k in metrics]
+        return [list(r) for r in zip(*cols)]
+
+    def records(self, market):
+        """calculate_quarter()-style dicts for one market"""
+        return [dict(quarter=q, **dict(zip(METRICS, r)))
+                for q, r in zip(self.periods, self.rows(market))]
+
+    # ------------------------------------------------------------
+    # Rollups
+    # ------------------------------------------------------------
+    def totals(self):
+        """Per-market totals over all periods: additive metrics summed, ROI recomputed"""
+        out = {k: self.columns[k].sum(axis=1) for k in ADDITIVE_METRICS}
+        out['roi'] = _round1(_ratio(out['revenue'], out['total_cost']))
+        return out
+
+    def combined(self, name="Combined"):
+        """Markets summed per period, rounded like combine_quarters()"""
+        sums = {k: self.columns[k].sum(axis=0, keepdims=True) for k in ADDITIVE_METRICS}
+        return ProjectionFrame.from_sums(sums, [name], self.periods, self.months)
+
+    def summary(self):
+        """Same dict as projection_engine.summarize(combine_quarters(...))"""
+        combined = self.combined()
+        total_rev = int(combined['revenue'].sum())
+        total_cost = int(combined['total_cost'].sum())
+        q6_monthly = int(combined['monthly_rev'][0, -1]) if self.periods else 0
+        return {
+            'q6_monthly': q6_monthly,
+            'total_revenue': total_rev,
+            'total_investment': total_cost,
+            'roi': round(total_rev / total_cost, 1) if total_cost > 0 else 0,
+            'goal_monthly': goal_monthly,
+            'goal_met': q6_monthly >= goal_monthly,
+        }
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    frame = ProjectionFrame.from_assumptions()
+    for view in [frame.sel(markets=[m]) for m in frame.markets] + [frame.combined()]:
+        name = view.markets[0]
+        print(f"  {name.upper()}")
+        print(f"  {'':5s}{'Leads':>8s}{'Jobs':>8s}{'Revenue':>12s}{'Monthly':>10s}{'ROI':>6s}")
+        for q, r in zip(view.periods, view.rows(0, ('total_leads', 'jobs', 'revenue',
+                                                      'monthly_rev', 'roi'))):
+            print(f"  {q:5s}{r[0]:8.1f}{r[1]:8.1f}{r[2]:12,}{r[3]:10,}{r[4]:6.1f}")
+        print()
+    s = frame.summary()
+    print(f"  Q6 monthly ${s['q6_monthly']:,} | 18-mo revenue ${s['total_revenue']:,} | "
+          f"ROI {s['roi']}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Projection Service
+Long-running asyncio HTTP service that keeps the projection engine loaded so
+the Next.js app (or anything on localhost) can request projections as JSON.
+
+Endpoints:
+  GET  /health          liveness + worker count
+  POST /project         one assumption object  -> one projection
+  POST /batch           {"scenarios": [...]}   -> {"results": [...]}
+
+Single scenarios run inline on the event loop (the engine is a few dozen
+float ops per quarter). Batches larger than --inline-max are split into chunks
+and sent to a warm process pool so the loop keeps serving other requests.
+
+Responses use the same envelope as lib/utils/api-response.ts:
+  {"success": true, "data": ..., "meta": {"timestamp": ...}}
+  {"success": false, "data": null, "error": {"code": ..., "message": ...}}
+
+Usage:
+  python3 projection_service.py --port 8765 --workers 4
+  curl -s localhost:8765/project -d '{"general": {"closing_rate": 0.6}}'
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from projection_engine import project
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+INLINE_MAX = 32          # batches up to this size run on the event loop
+CHUNK_SIZE = 256         # scenarios per process-pool task
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """Client error surfaced as an apiError-style envelope"""
+
+    def __init__(self, code, message, status=400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+# ============================================================
+# ENGINE CALLS (also executed inside pool workers)
+# ============================================================
+def run_scenario(assumptions):
+    """Project one scenario, turning bad input into a RequestError"""
+    try:
+        return project(assumptions)
+    except (ValueError, KeyError, TypeError) as e:
+        raise RequestError('VAL_INVALID_INPUT', f"Invalid assumptions: {e}")
+
+
+def run_chunk(scenarios):
+    """Project a list of scenarios; errors are returned per scenario"""
+    results = []
+    for assumptions in scenarios:
+        try:
+            results.append(project(assumptions))
+        except (ValueError, KeyError, TypeError) as e:
+            results.append({'error': {'code': 'VAL_INVALID_INPUT', 'message': str(e)}})
+    return results
+
+
+def _warm_worker():
+    project(None)
+    return os.getpid()
+
+
+# ============================================================
+# HTTP
+# ============================================================
+def api_response(data, status=200):
+    return status, {
+        'success': True,
+        'data': data,
+        'meta': {'timestamp': datetime.now(timezone.utc).isoformat()},
+    }
+
+
+def api_error(code, message, status=400):
+    return status, {
+        'success': False,
+        'data': None,
+        'error': {'code': code, 'message': message},
+    }
+
+
+async def read_request(reader):
+    """Parse one HTTP/1.1 request. Returns None when the client closed."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise RequestError('VAL_INVALID_INPUT', 'Malformed request line')
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise RequestError('VAL_INVALID_INPUT', 'Invalid Content-Length')
+    if length > MAX_BODY_BYTES:
+        raise RequestError('VAL_INVALID_INPUT', 'Request body too large', 413)
+    body = await reader.readexactly(length) if length else b''
+
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    return method.upper(), target.split('?', 1)[0], body, keep_alive
+
+
+def encode_response(status, payload, keep_alive):
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+def parse_json(body):
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as e:
+        raise RequestError('VAL_INVALID_INPUT', f"Body is not valid JSON: {e.msg}")
+
+
+class ProjectionService:
+    """Routes requests to the engine; owns the process pool"""
+
+    def __init__(self, workers=None, inline_max=INLINE_MAX, chunk_size=CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.inline_max = inline_max
+        self.chunk_size = chunk_size
+        self.pool = None
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Spawn and import the engine in every worker up front so the first
+        # batch does not pay process start-up cost.
+        await asyncio.gather(*[loop.run_in_executor(self.pool, _warm_worker)
+                               for _ in range(self.workers)])
+        project(None)
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except RequestError as e:
+                    writer.write(encode_response(*api_error(e.code, e.message, e.status), False))
+                    break
+                except (asyncio.IncompleteReadError, ValueError):
+                    break
+                if request is None:
+                    break
+
+                method, path, body, keep_alive = request
+                status, payload = await self.dispatch(method, path, body)
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        try:
+            if path == '/health':
+                return api_response({'status': 'ok', 'workers': self.workers})
+            if path == '/project':
+                if method != 'POST':
+                    return api_error('VAL_INVALID_INPUT', 'Use POST', 405)
+                return api_response(run_scenario(parse_json(body)))
+            if path == '/batch':
+                if method != 'POST':
+                    return api_error('VAL_INVALID_INPUT', 'Use POST', 405)
+                return api_response({'results': await self.run_batch(parse_json(body))})
+            return api_error('RES_NOT_FOUND', f"No route for {path}", 404)
+        except RequestError as e:
+            return api_error(e.code, e.message, e.status)
+        except Exception as e:  # never take the service down for one request
+            return api_error('SYS_INTERNAL', f"Internal server error: {e}", 500)
+
+    async def run_batch(self, payload):
+        scenarios = payload.get('scenarios') if isinstance(payload, dict) else payload
+        if not isinstance(scenarios, list):
+            raise RequestError('VAL_INVALID_INPUT', 'Batch body needs a "scenarios" list')
+
+        if len(scenarios) <= self.inline_max:
+            return run_chunk(scenarios)
+
+        loop = asyncio.get_running_loop()
+        chunks = [scenarios[i:i + self.chunk_size]
+                  for i in range(0, len(scenarios), self.chunk_size)]
+        parts = await asyncio.gather(*[loop.run_in_executor(self.pool, run_chunk, c)
+                                       for c in chunks])
+        return [result for part in parts for result in part]
+
+
+# ============================================================
+# MAIN
+# ============================================================
+async def serve(host, port, workers, inline_max, chunk_size):
+    service = ProjectionService(workers, inline_max, chunk_size)
+    await service.start(host, port)
+    print(f"✅ Projection service on http://{host}:{service.port} ({service.workers} workers)")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve projections over HTTP")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="process pool size for batches (default: CPU count)")
+    parser.add_argument('--inline-max', type=int, default=INLINE_MAX,
+                        help="largest batch run on the event loop")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="scenarios per process-pool task")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.inline_max, args.chunk_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
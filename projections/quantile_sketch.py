@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Quantile Sketches
+Percentiles over result sets too large to keep: a KLL-style compactor
+sketch per metric that takes values in numpy blocks, holds a bounded number
+of them however many go in (about 3 × k), and merges with another sketch of
+the same metric, so workers, replicates or separate machines each keep
+their own and combine at the end.
+
+A level-h compactor holds values of weight 2^h. When a level is over its
+capacity it is sorted and every other value (random offset) moves up a
+level with double the weight. One compaction moves the rank of any value by
+at most its weight w, up or down with equal chance, so the sketch tracks the
+sum of w² over every compaction it and its merged parts went through. By
+Hoeffding's inequality that gives a rank error bound for this sketch rather
+than a worst case for the k:
+
+  rank_error(0.99)   normalized rank error bound at 99% confidence; e.g.
+                     0.004 means a reported P90 is a value whose true
+                     rank is within [P89.6, P90.4]
+
+NaN values (e.g. payback_month for a scenario that never pays back) are not
+ranked: they are counted in nan_count, and the percentiles and count cover
+the other values only. A payback P50 is the median over the scenarios that
+pay back, and nan_count says how many did not.
+
+Sketch sets are JSON-serializable (to_dict / from_dict) and save to binary
+.npz (save / load), which is how scenario_grid.py checkpoints them and how
+separate runs are combined.
+
+Usage:
+  python3 quantile_sketch.py sweeps/run1 sweeps/run2         # merge grid sketches
+  python3 quantile_sketch.py a.json b.npz --json             # merge saved sketch sets
+"""
+
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+DEFAULT_K = 200
+CAPACITY_DECAY = 2 / 3      # each level below the top holds 2/3 as many values
+MIN_CAPACITY = 8
+DEFAULT_CONFIDENCE = 0.99
+SUMMARY_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+# ============================================================
+# SKETCH
+# ============================================================
+class KLLSketch:
+    """Mergeable streaming quantile sketch of one metric"""
+
+    def __init__(self, k=DEFAULT_K, rng=None):
+        if k < MIN_CAPACITY:
+            raise ValueError(f"k must be at least {MIN_CAPACITY}")
+        self.k = int(k)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.nan_count = 0
+        self.variance = 0.0   # sum of squared compaction weights
+        self.min, self.max = math.inf, -math.inf
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def retained(self):
+        return sum(len(level) for level in self.levels)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(MIN_CAPACITY, math.ceil(self.k * CAPACITY_DECAY ** depth))
+
+    def update(self, values):
+        """Add a block of values (NaN is counted in nan_count, not ranked)"""
+        values = np.ravel(np.asarray(values, dtype=float))
+        nan = np.isnan(values)
+        self.nan_count += int(nan.sum())
+        values = values[~nan]
+        if len(values):
+            self.n += len(values)
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch of the same metric into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.nan_count += other.nan_count
+        self.variance += other.variance
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        # Compacting level h only grows h + 1, so one upward pass finds every
+        # over-full level, except when a new top level shrinks the capacities
+        # below it: then start over from the bottom.
+        capacities = [self._capacity(h) for h in range(len(self.levels))]
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) <= capacities[h]:
+                h += 1
+                continue
+            grew = h + 1 == len(self.levels)
+            if grew:
+                self.levels.append(np.empty(0))
+                capacities = [self._capacity(i) for i in range(len(self.levels))]
+            items = np.sort(self.levels[h])
+            # An odd value out stays at this level with its own weight
+            keep, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1],
+                                                 items[self.rng.integers(2)::2]])
+            self.variance += 4.0 ** h
+            h = 0 if grew else h + 1
+
+    # ------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------
+    def _sorted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Values at fractions qs (0..1); NaN while the sketch is empty"""
+        qs = np.clip(np.asarray(qs, dtype=float), 0.0, 1.0)
+        if not self.n:
+            return np.full(qs.shape, np.nan)
+        items, cum = self._sorted()
+        idx = np.searchsorted(cum, qs * cum[-1], side='left')
+        out = items[np.minimum(idx, len(items) - 1)]
+        out = np.where(qs <= 0, self.min, out)
+        return np.where(qs >= 1, self.max, out)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value):
+        """Estimated fraction of values <= value"""
+        if not self.n:
+            return math.nan
+        items, cum = self._sorted()
+        i = np.searchsorted(items, value, side='right')
+        return float(cum[i - 1] / cum[-1]) if i else 0.0
+
+    def rank_error(self, confidence=DEFAULT_CONFIDENCE):
+        """Normalized rank error bound at this confidence (0 while nothing was compacted)"""
+        if not self.n:
+            return 0.0
+        return math.sqrt(2 * self.variance * math.log(2 / (1 - confidence))) / self.n
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES, confidence=DEFAULT_CONFIDENCE):
+        values = self.quantiles(np.asarray(percentiles, dtype=float) / 100)
+        out = {'count': self.n, 'nan_count': self.nan_count}
+        out.update((f"p{p}", float(v)) for p, v in zip(percentiles, values))
+        out['rank_error'] = self.rank_error(confidence)
+        return out
+
+    # ------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------
+    def header(self):
+        """to_dict() without the levels"""
+        return {'k': self.k, 'n': self.n, 'nan_count': self.nan_count, 'variance': self.variance,
+                'min': self.min if self.n else None, 'max': self.max if self.n else None}
+
+    def to_dict(self):
+        return dict(self.header(), levels=[level.tolist() for level in self.levels])
+
+    @classmethod
+    def from_dict(cls, data, rng=None):
+        sketch = cls(data['k'], rng)
+        sketch.n, sketch.variance = data['n'], data['variance']
+        sketch.nan_count = data.get('nan_count', 0)
+        if sketch.n:
+            sketch.min, sketch.max = data['min'], data['max']
+        sketch.levels = [np.asarray(level, dtype=float) for level in data['levels']] or [np.empty(0)]
+        return sketch
+
+
+class SketchSet:
+    """One KLLSketch per column, fed {column: values} blocks"""
+
+    def __init__(self, k=DEFAULT_K, seed=None, columns=None):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.sketches = {}
+        for c in columns or ():
+            self.sketches[c] = KLLSketch(k, self.rng)
+
+    def __getitem__(self, column):
+        return self.sketches[column]
+
+    def __contains__(self, column):
+        return column in self.sketches
+
+    def update(self, block, columns=None):
+        """Add the values of `columns` (default: all of block's columns)"""
+        for c in columns if columns is not None else block:
+            if c not in self.sketches:
+                self.sketches[c] = KLLSketch(self.k, self.rng)
+            self.sketches[c].update(block[c])
+        return self
+
+    def merge(self, other):
+        for c, sketch in other.sketches.items():
+            if c not in self.sketches:
+                self.sketches[c] = KLLSketch(self.k, self.rng)
+            self.sketches[c].merge(sketch)
+        return self
+
+    @classmethod
+    def merged(cls, sets):
+        """New set holding every set's values (the inputs are left as they are)"""
+        sets = list(sets)
+        out = cls(sets[0].k if sets else DEFAULT_K)
+        for s in sets:
+            out.merge(s)
+        return out
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES, confidence=DEFAULT_CONFIDENCE):
+        """{column: {'count', 'p5', ..., 'p95', 'rank_error'}}"""
+        return {c: s.summary(percentiles, confidence) for c, s in self.sketches.items()}
+
+    def to_dict(self):
+        return {'k': self.k, 'sketches': {c: s.to_dict() for c, s in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data, seed=None):
+        out = cls(data['k'], seed)
+        out.sketches = {c: KLLSketch.from_dict(s, out.rng) for c, s in data['sketches'].items()}
+        return out
+
+    def save(self, file, **extra):
+        """Write the set as .npz: a JSON header (plus `extra`) and one array per level"""
+        header = {'k': self.k, 'extra': extra,
+                  'sketches': {c: dict(s.header(), levels=len(s.levels))
+                               for c, s in self.sketches.items()}}
+        arrays = {f"{i}_{h}": level for i, s in enumerate(self.sketches.values())
+                  for h, level in enumerate(s.levels)}
+        np.savez(file, header=np.array(json.dumps(header)), **arrays)
+
+    @classmethod
+    def load(cls, file, seed=None):
+        """(SketchSet, extra) from a save() file"""
+        with np.load(file) as data:
+            header = json.loads(str(data['header']))
+            sketches = {c: dict(s, levels=[data[f"{i}_{h}"] for h in range(s['levels'])])
+                        for i, (c, s) in enumerate(header['sketches'].items())}
+        return cls.from_dict({'k': header['k'], 'sketches': sketches}, seed), header['extra']
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def read_sketches(path):
+    """SketchSet from a scenario grid directory, a save() .npz or a to_dict() JSON file"""
+    if os.path.isdir(path):
+        from scenario_grid import open_grid
+        sketches = open_grid(path)['sketches']
+        if sketches is None:
+            raise ValueError(f"{path} has no sketches (grid run before sketches were kept)")
+        return sketches
+    if path.endswith('.npz'):
+        return SketchSet.load(path)[0]
+    with open(path) as f:
+        return SketchSet.from_dict(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge quantile sketches and print P5-P95")
+    parser.add_argument('sources', nargs='+', help="sketch JSON files or scenario grid directories")
+    parser.add_argument('--columns', default=None, help="comma-separated columns (default: all)")
+    parser.add_argument('--json', action='store_true', help="print the merged summary as JSON")
+    parser.add_argument('--out', default=None, help="save the merged sketch set (.npz or JSON)")
+    args = parser.parse_args()
+
+    try:
+        merged = SketchSet.merged(read_sketches(p) for p in args.sources)
+    except (ValueError, FileNotFoundError) as exc:
+        parser.error(str(exc))
+    summary = merged.summary()
+    if args.columns:
+        summary = {c: summary[c] for c in args.columns.split(',') if c in summary}
+
+    if args.out and args.out.endswith('.npz'):
+        merged.save(args.out)
+    elif args.out:
+        with open(args.out, 'w') as f:
+            json.dump(merged.to_dict(), f)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"  {'':32s}" + "".join(f"{'P' + str(p):>13s}" for p in SUMMARY_PERCENTILES)
+          + "   ±rank        NaN")
+    for c, s in summary.items():
+        print(f"  {c:32s}" + "".join(f"{s[f'p{p}']:13,.1f}" for p in SUMMARY_PERCENTILES)
+              + f"   {s['rank_error']:.2%}  {s['nan_count']:9,d}")
+    if args.out:
+        print(f"✅ Created: {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Parametric Ramp Curves
+Ramps as curves instead of hand-typed quarter tables. Each channel in each
+market gets a curve and its parameters; compile_curve() turns them into a
+dense (variants, months) lookup array for any horizon in one broadcast, and
+the engines index those arrays directly.
+
+A market in an assumption dict takes its curves under 'ramp_curves':
+
+  {"name": "Denver", "ramp_curves": {"web": {"curve": "piecewise", "start": 7, "full": 24}}}
+
+resolve_assumptions() compiles them into the market's 'ramp_months' (channels
+without a curve keep the shared schedule); the vector engine uses those
+monthly values as the market's base ramps and the quarter engines
+(calc_all_quarters, ProjectionFrame, model_graph) their quarter averages.
+
+Curves (t = month number, 1-based):
+  step       per-quarter values held for 3 months (the original tables)
+  piecewise  0 until `start`, linear to `cap` at `full`  (delayed start)
+  logistic   cap / (1 + exp(-steepness × (t - midpoint)))
+  gompertz   cap × exp(-b × exp(-c × t))
+
+Any parameter may be a list; the curve is compiled for every combination,
+which is how "website starts Q4" or "GBP builds faster" become parameter
+changes evaluated in bulk:
+
+  {"target": "*.ramp_web", "curve": "piecewise",
+   "params": {"start": [7, 10, 13], "full": [24, 30]}}
+
+in a scenario_grid / pareto spec compiles to a 6-variant ramp axis.
+
+Usage:
+  python3 ramp_curves.py                 # compiled defaults, quarterly view
+  python3 ramp_curves.py --horizon 36    # beyond month 18
+"""
+
+import argparse
+import itertools
+
+import numpy as np
+
+from projection_engine import ramps
+from vector_engine import MONTHS_PER_QUARTER, RAMP_CHANNELS, ramp_arrays
+
+
+def _v2_step(channel):
+    return {'curve': 'step', 'values': [r[channel] for r in ramps.values()]}
+
+
+# Per market and channel. Ads keep the v2 table; GBP and website are the
+# parametric shapes closest to it, so they extend past month 18.
+RAMP_CURVES = {
+    'Tucson': {
+        'ads': _v2_step('ads'),
+        'gbp': {'curve': 'logistic', 'midpoint': 8, 'steepness': 0.30},
+        'web': {'curve': 'piecewise', 'start': 7, 'full': 24},
+    },
+    'Denver': {
+        'ads': _v2_step('ads'),
+        'gbp': {'curve': 'logistic', 'midpoint': 8, 'steepness': 0.30},
+        'web': {'curve': 'piecewise', 'start': 7, 'full': 24},
+    },
+}
+
+
+# ============================================================
+# CURVE FAMILIES (vectorized over months and parameters)
+# ============================================================
+def step(t, values):
+    values = np.asarray(values, dtype=float)
+    quarter = np.minimum((t - 1) // MONTHS_PER_QUARTER, values.shape[-1] - 1).astype(int)
+    return values[..., quarter]
+
+
+def piecewise(t, start, full, cap=1.0):
+    span = np.maximum(full - start, 1e-9)
+    return cap * np.clip((t - start) / span, 0.0, 1.0)
+
+
+def logistic(t, midpoint, steepness, cap=1.0):
+    return cap / (1.0 + np.exp(-steepness * (t - midpoint)))
+
+
+def gompertz(t, b, c, cap=1.0):
+    return cap * np.exp(-b * np.exp(-c * t))
+
+
+CURVES = {'step': step, 'piecewise': piecewise, 'logistic': logistic, 'gompertz': gompertz}
+
+
+# ============================================================
+# COMPILATION
+# ============================================================
+def _curve_params(spec):
+    params = dict(spec.get('params') or {})
+    params.update({k: v for k, v in spec.items() if k not in ('curve', 'params', 'target',
+                                                                'labels', 'monthly_cost')})
+    return params
+
+
+def compile_curve(spec, horizon):
+    """
+    (table, labels): table is (variants, horizon) with one row per combination
+    of list-valued parameters (a single row when every parameter is scalar).
+    """
+    kind = spec.get('curve', 'step')
+    if kind not in CURVES:
+        raise ValueError(f"unknown ramp curve {kind!r}; choose from {', '.join(CURVES)}")
+    params = _curve_params(spec)
+    t = np.arange(1, horizon + 1, dtype=float)
+
+    if kind == 'step':
+        values = params.get('values')
+        if values is None:
+            raise ValueError("step curve needs 'values' (one per quarter)")
+        tables = np.atleast_2d(np.asarray(values, dtype=float))
+        table = step(t, tables)
+        labels = [f"step {'/'.join(f'{v:g}' for v in row)}" for row in tables]
+        return np.clip(table, 0.0, None), labels
+
+    names = sorted(params)
+    grids = [np.atleast_1d(np.asarray(params[n], dtype=float)) for n in names]
+    combos = list(itertools.product(*[g.tolist() for g in grids]))
+    columns = {n: np.array([c[i] for c in combos])[:, None] for i, n in enumerate(names)}
+    table = CURVES[kind](t[None, :], **columns)
+    labels = [f"{kind} " + ", ".join(f"{n}={c[i]:g}" for i, n in enumerate(names))
+              for c in combos]
+    return np.clip(np.broadcast_to(table, (len(combos), horizon)), 0.0, None), labels
+
+
+def curve_label(spec):
+    """'piecewise full=24, start=7' for a single-variant curve spec"""
+    return compile_curve(spec, 1)[1][0]
+
+
+def compile_channels(channels, horizon=18):
+    """{channel: (horizon,) array} for one market's single-variant curve specs"""
+    out = {}
+    for channel, spec in channels.items():
+        if channel not in RAMP_CHANNELS:
+            raise ValueError(f"unknown ramp channel {channel!r}; choose from {', '.join(RAMP_CHANNELS)}")
+        if not isinstance(spec, dict):
+            raise ValueError(f"{channel} ramp curve must be an object with a 'curve'")
+        table, _ = compile_curve(spec, horizon)
+        if len(table) != 1:
+            raise ValueError(f"{channel}: list parameters belong in a sweep axis")
+        out[channel] = table[0]
+    return out
+
+
+def market_ramp_months(curves, ramp_schedule=ramps):
+    """
+    {channel: monthly values} (plain lists) for a market's 'ramp_curves' over
+    the schedule's horizon; channels without a curve keep the shared schedule
+    """
+    if not isinstance(curves, dict):
+        raise ValueError("ramp_curves must be an object of {channel: curve spec}")
+    months = ramp_arrays(ramp_schedule)
+    months.update(compile_channels(curves, len(ramp_schedule) * MONTHS_PER_QUARTER))
+    return {ch: months[ch].tolist() for ch in RAMP_CHANNELS}
+
+
+def to_quarterly(monthly):
+    """Average monthly ramp values per quarter (what the quarter engine uses)"""
+    monthly = np.asarray(monthly, dtype=float)
+    return monthly.reshape(monthly.shape[:-1] + (-1, MONTHS_PER_QUARTER)).mean(axis=-1)
+
+
+def quarterly_ramps(channels, horizon=18):
+    """A classic Q1..Qn ramps dict (for calc_all_quarters) from one market's curves"""
+    compiled = {ch: to_quarterly(values) for ch, values in compile_channels(channels, horizon).items()}
+    quarters = horizon // MONTHS_PER_QUARTER
+    return {f"Q{q + 1}": {ch: round(float(v[q]), 4) for ch, v in compiled.items()}
+            for q in range(quarters)}
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Compile parametric ramp curves")
+    parser.add_argument('--horizon', type=int, default=18, help="months (multiple of 3)")
+    args = parser.parse_args()
+    if args.horizon % MONTHS_PER_QUARTER:
+        parser.error("--horizon must be a multiple of 3")
+
+    for market, channels in RAMP_CURVES.items():
+        print(f"  {market.upper()}")
+        schedule = quarterly_ramps(channels, args.horizon)
+        print("  " + " " * 5 + "".join(f"{ch.upper():>8s}" for ch in channels))
+        for q, values in schedule.items():
+            print(f"  {q:5s}" + "".join(f"{values[ch]:8.0%}" for ch in channels))
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Refresh Returned Workbooks
+Account managers edit the yellow input cells on the Assumptions tab and send
+the workbook back. This reads those tabs (read-only, Assumptions sheet only),
+recomputes with the engine, and writes a refreshed v2 workbook and/or a JSON
+diff of the edited inputs and headline numbers against the v2 defaults.
+
+A folder is processed across worker processes; one bad workbook is reported
+and skipped, not fatal.
+
+Usage:
+  python3 refresh_workbooks.py returned/                       # print the diffs
+  python3 refresh_workbooks.py returned/ --json diff.json --out-dir refreshed/
+  python3 refresh_workbooks.py client.xlsx --out-dir refreshed/ --sobol-samples 4096
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from projection_engine import resolve_assumptions, project
+from assumptions_sheet import read_assumptions
+from vector_engine import slug
+
+SUMMARY_FIELDS = ('q6_monthly', 'total_revenue', 'total_investment', 'roi', 'goal_met')
+
+
+# ============================================================
+# DIFF
+# ============================================================
+def flatten_assumptions(assumptions=None):
+    """{'general.closing_rate': 0.5, 'tucson.cpl': 700, 'ramp.Q1.ads': 0.3, ...}"""
+    general, ramps, markets = resolve_assumptions(assumptions)
+    flat = {f"general.{k}": v for k, v in general.items()}
+    for m in markets:
+        for k, v in m.items():
+            if k != 'name':
+                flat[f"{slug(m['name'])}.{k}"] = v
+    for q_label, ramp in ramps.items():
+        for ch, v in ramp.items():
+            flat[f"ramp.{q_label}.{ch}"] = v
+    return flat
+
+
+def _changed(old, new):
+    if old is None or new is None:
+        return old is not new
+    return abs(new - old) > 1e-9 * max(1.0, abs(old))
+
+
+def diff_assumptions(assumptions, baseline=None):
+    """[{parameter, from, to}] for every input that differs from the baseline"""
+    old, new = flatten_assumptions(baseline), flatten_assumptions(assumptions)
+    return [{'parameter': k, 'from': old.get(k), 'to': new.get(k)}
+            for k in list(old) + [k for k in new if k not in old]
+            if _changed(old.get(k), new.get(k))]
+
+
+def diff_summary(summary, baseline_summary):
+    out = {}
+    for k in SUMMARY_FIELDS:
+        entry = {'from': baseline_summary[k], 'to': summary[k]}
+        if not isinstance(summary[k], bool):
+            entry['change'] = round(summary[k] - baseline_summary[k], 1)
+        out[k] = entry
+    return out
+
+
+# ============================================================
+# REFRESH
+# ============================================================
+def refreshed_path(path, out_dir):
+    target = os.path.join(out_dir, os.path.basename(path))
+    if os.path.abspath(target) == os.path.abspath(path):
+        stem, ext = os.path.splitext(target)
+        target = f"{stem}_refreshed{ext}"
+    return target
+
+
+def refresh_one(path, out_dir=None, sobol_samples=0):
+    """Diff entry for one workbook; writes the refreshed copy when out_dir is set"""
+    entry = {'workbook': path}
+    try:
+        assumptions, warnings = read_assumptions(path)
+        summary = project(assumptions)['summary']
+    except Exception as exc:
+        entry['error'] = str(exc)
+        return entry
+
+    entry['warnings'] = warnings
+    entry['changes'] = diff_assumptions(assumptions)
+    entry['summary'] = diff_summary(summary, project()['summary'])
+    entry['assumptions'] = assumptions
+
+    if out_dir:
+        from create_conservative_v2 import build_workbook
+        wb, _ = build_workbook(assumptions, sobol_samples=sobol_samples)
+        entry['refreshed'] = refreshed_path(path, out_dir)
+        wb.save(entry['refreshed'])
+    return entry
+
+
+def _refresh_args(args):
+    return refresh_one(*args)
+
+
+def refresh_all(paths, out_dir=None, sobol_samples=0, workers=None):
+    """Diff entries in input order, spread across processes for big folders"""
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = [(p, out_dir, sobol_samples) for p in paths]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [refresh_one(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_refresh_args, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def find_workbooks(targets):
+    """Expand folders to their .xlsx files (Excel '~$' lock files skipped)"""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            found = sorted(glob.glob(os.path.join(target, '*.xlsx')))
+            paths.extend(p for p in found if not os.path.basename(p).startswith('~$'))
+        else:
+            paths.append(target)
+    return paths
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def print_entry(entry):
+    print(f"  {os.path.basename(entry['workbook'])}")
+    if 'error' in entry:
+        print(f"    ❌ {entry['error']}")
+        return
+    for w in entry['warnings']:
+        print(f"    ⚠️  {w}")
+    if not entry['changes']:
+        print("    no input changes")
+    for c in entry['changes']:
+        print(f"    {c['parameter']:28s} {c['from']!s:>10} → {c['to']!s:<10}")
+    s = entry['summary']
+    print(f"    Q6 monthly ${s['q6_monthly']['to']:,} ({s['q6_monthly']['change']:+,.0f}), "
+          f"18-mo revenue ${s['total_revenue']['to']:,} ({s['total_revenue']['change']:+,.0f}), "
+          f"ROI {s['roi']['to']}x, goal {'MET' if s['goal_met']['to'] else 'not met'}")
+    if 'refreshed' in entry:
+        print(f"    ✅ Created: {entry['refreshed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute returned projection workbooks")
+    parser.add_argument('targets', nargs='+', help="workbooks and/or folders of workbooks")
+    parser.add_argument('--out-dir', help="write a refreshed workbook per input here")
+    parser.add_argument('--json', help="write the diffs to this JSON file")
+    parser.add_argument('--sobol-samples', type=int, default=0,
+                        help="include the Global Sensitivity tab (0 = leave it out)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--quiet', action='store_true', help="only print the totals")
+    args = parser.parse_args()
+
+    paths = find_workbooks(args.targets)
+    if not paths:
+        parser.error("no .xlsx workbooks found")
+
+    t0 = time.perf_counter()
+    entries = refresh_all(paths, args.out_dir, args.sobol_samples, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    if not args.quiet:
+        for entry in entries:
+            print_entry(entry)
+    failed = sum('error' in e for e in entries)
+    print(f"  {len(entries) - failed:,} refreshed, {failed:,} failed in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(entries, f, indent=2)
+        print(f"✅ Created: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Report Templates
+Batch client workbooks by filling a pre-styled template instead of
+rebuilding every header, fill, border and number format per file.
+
+A template is an ordinary v2 workbook (build_workbook()) built once per
+layout. The layout is the shape of every tab (sheet order, rows per tab,
+cells per row and which rows are sections, totals or adjustable inputs),
+which is what the styling depends on, so clients with the same kinds of
+markets in the same order share one template whatever the markets are named.
+For each client the template's cell values are overwritten from report_rows()
+and the few value-dependent styles (create_conservative_v2.VALUE_STYLES: goal
+fills, percent/money formats) re-applied; headers, section fills, borders,
+column widths and the static notes text are the template's as-is.
+
+Templates live in memory for the batch and, with --templates, as xlsx files
+that later batches load instead of building.
+
+Clients file (the rollup.py portfolio format; regions are ignored):
+  {"clients": [{"name": "Acme Restoration", "assumptions": {...}}]}
+
+Usage:
+  python3 report_template.py clients.json --out reports/
+  python3 report_template.py clients.json --out reports/ --templates templates/ --tabs combined,markets
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from create_conservative_v2 import build_workbook, report_rows, VALUE_STYLES
+from vector_engine import slug
+
+REPORT_NAME = "Conservative_v2_Projections"
+
+
+# ============================================================
+# TEMPLATES
+# ============================================================
+def _row_kind(row):
+    """What a row's styling keys off: section heading, TOTAL row, adjustable input"""
+    first = row[0] if row else None
+    if first == 'TOTAL':
+        return 'total'
+    if isinstance(first, str) and first.isupper() and len(first) > 3:
+        return 'section'
+    return 'input' if 'YES' in row else ''
+
+
+def layout_key(sheets):
+    """Short hash of the tab shapes (titles excluded: market names vary by client)"""
+    shape = [[(len(row), _row_kind(row)) for row in rows] for _, rows in sheets]
+    return hashlib.sha1(json.dumps(shape).encode()).hexdigest()[:12]
+
+
+class TemplateCache:
+    """Styled template workbooks by layout key, built on first use"""
+
+    def __init__(self, directory=None, tabs=None, sobol_samples=0):
+        self.directory = directory
+        self.tabs = tabs
+        self.sobol_samples = sobol_samples
+        self._books = {}
+        self.built = self.loaded = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{REPORT_NAME}_{key}.xlsx")
+
+    def workbook(self, sheets, assumptions=None):
+        """Template for this layout; `assumptions` builds it when there is none yet"""
+        key = layout_key(sheets)
+        if key in self._books:
+            return self._books[key]
+        if self.directory and os.path.exists(self.path(key)):
+            from openpyxl import load_workbook
+            wb = load_workbook(self.path(key))
+            self.loaded += 1
+        else:
+            wb, _ = build_workbook(assumptions, sobol_samples=self.sobol_samples, tabs=self.tabs)
+            self.built += 1
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                wb.save(self.path(key))
+        self._books[key] = wb
+        return wb
+
+
+def fill(wb, sheets):
+    """Overwrite the template's values with this client's; styles stay as they are"""
+    titles = [title for title, _ in sheets]
+    if wb.sheetnames != titles:
+        # Two passes so swapping two market names never collides with an existing title
+        for i, ws in enumerate(wb.worksheets):
+            ws.title = f"~{i}"
+        for ws, title in zip(wb.worksheets, titles):
+            ws.title = title
+
+    for ws, (title, rows) in zip(wb.worksheets, sheets):
+        for r, row in enumerate(rows, start=1):
+            for c, value in enumerate(row, start=1):
+                ws.cell(row=r, column=c).value = value
+        if title in VALUE_STYLES:
+            VALUE_STYLES[title](ws)
+    return wb
+
+
+# ============================================================
+# BATCH
+# ============================================================
+def report_path(out_dir, name):
+    return os.path.join(out_dir, f"{slug(name)}_{REPORT_NAME}.xlsx")
+
+
+def generate_reports(clients, out_dir, templates=None, tabs=None, sobol_samples=0):
+    """Write one workbook per client; returns (paths, cache) in client order"""
+    os.makedirs(out_dir, exist_ok=True)
+    cache = templates if isinstance(templates, TemplateCache) else TemplateCache(
+        templates, tabs, sobol_samples)
+    paths = []
+    for client in clients:
+        assumptions = client.get('assumptions')
+        sheets, _ = report_rows(assumptions, cache.sobol_samples, cache.tabs)
+        wb = fill(cache.workbook(sheets, assumptions), sheets)
+        path = report_path(out_dir, client['name'])
+        wb.save(path)
+        paths.append(path)
+    return paths, cache
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Client workbooks from pre-styled templates")
+    parser.add_argument('clients', help='JSON file: {"clients": [{"name", "assumptions"}]}')
+    parser.add_argument('--out', required=True, help="folder for the client workbooks")
+    parser.add_argument('--templates', default=None,
+                        help="folder to keep templates in between batches (default: memory only)")
+    parser.add_argument('--tabs', default=None, help="tabs to render (see create_conservative_v2.py)")
+    parser.add_argument('--sobol-samples', type=int, default=0,
+                        help="include the Global Sensitivity tab (N rows; default: leave it out)")
+    args = parser.parse_args()
+
+    with open(args.clients) as f:
+        clients = json.load(f)['clients']
+    names = [slug(c['name']) for c in clients]
+    if len(set(names)) != len(names):
+        parser.error("client names must be unique")
+
+    t0 = time.perf_counter()
+    try:
+        paths, cache = generate_reports(clients, args.out, args.templates, args.tabs,
+                                        args.sobol_samples)
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - t0
+    print(f"✅ Created: {len(paths)} workbooks in {args.out} ({elapsed:.1f}s, "
+          f"{cache.built} templates built, {cache.loaded} loaded)")
+
+
+if __name__ == '__main__':
+    main()
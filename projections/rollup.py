@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Rollups
+Aggregates projections along client → region → market → channel at month,
+quarter or year grain, for one client or the whole agency portfolio.
+
+Every client's markets are evaluated in one vector_engine batch and split
+into one fact row per market and channel (web / ads / gbp, plus a 'fee' row
+carrying the management fee). Rollups are then:
+
+  group index   codes of the chosen levels → group id, computed once per
+                level combination and cached (rows are stored sorted by
+                client, region, market, channel, so any leading prefix of
+                those levels is already contiguous and needs no reorder)
+  segmented sum one np.add.reduceat over the rows, one over the months
+
+The result is a ProjectionFrame with one row per group, so the usual
+totals()/rows() apply and add_rollup_sheet() writes it as a Combined
+Summary–style tab at any level. Each group is rounded once after summing,
+so a region's figures can differ by a dollar or 0.1 lead from adding its
+markets' rounded rows by hand.
+
+Portfolio file (JSON):
+  {"clients": [{"name": "Acme Restoration",
+                "assumptions": {...},                      # optional, project() format
+                "regions": {"Tucson": "Southwest", "Denver": "Mountain"}}]}
+
+Usage:
+  python3 rollup.py                                   # v2 defaults, by market, quarterly
+  python3 rollup.py --portfolio clients.json --by client,region --grain year
+  python3 rollup.py --portfolio clients.json --by region,channel --xlsx rollup.xlsx
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from projection_engine import resolve_assumptions
+from projection_frame import ProjectionFrame, ADDITIVE_METRICS
+from vector_engine import market_inputs, evaluate_market, MONTHLY_METRICS, MONTHS_PER_QUARTER
+
+LEVELS = ('client', 'region', 'market', 'channel')
+CHANNELS = ('web', 'ads', 'gbp', 'fee')  # 'fee' carries the management fee
+CHANNEL_LEADS = {'web': 'web_leads', 'ads': 'ppc_leads', 'gbp': 'gbp_leads'}
+GRAINS = {'month': 1, 'quarter': MONTHS_PER_QUARTER, 'year': 12}
+GRAIN_PREFIX = {'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+DEFAULT_CLIENT = "Client"
+DEFAULT_REGION = "All Regions"
+
+
+# ============================================================
+# FACTS
+# ============================================================
+def _channel_facts(result, closing_rate, ltv):
+    """{metric: (markets, channels, months)} from one evaluate_market() batch"""
+    n, months = result['revenue'].shape
+    facts = {k: np.zeros((n, len(CHANNELS), months)) for k in MONTHLY_METRICS}
+    for c, ch in enumerate(CHANNELS[:-1]):
+        leads = result[CHANNEL_LEADS[ch]]
+        jobs = leads * closing_rate
+        facts[CHANNEL_LEADS[ch]][:, c] = leads
+        facts['total_leads'][:, c] = leads
+        facts['jobs'][:, c] = jobs
+        facts['revenue'][:, c] = jobs * ltv
+    ads = CHANNELS.index('ads')
+    fee = CHANNELS.index('fee')
+    facts['ad_spend'][:, ads] = result['ad_spend']
+    facts['mgmt_fee'][:, fee] = result['mgmt_fee']
+    facts['total_cost'][:, ads] = result['ad_spend']
+    facts['total_cost'][:, fee] = result['mgmt_fee']
+    return facts
+
+
+def _codes(names):
+    """(codes, unique names in first-seen order)"""
+    index = {}
+    codes = np.array([index.setdefault(n, len(index)) for n in names], dtype=np.int64)
+    return codes, list(index)
+
+
+class Hierarchy:
+    """Fact rows (market × channel) with level codes and cached group indices"""
+
+    def __init__(self, codes, names, values):
+        self.names = names    # level -> list of names
+        order = np.lexsort([codes[level] for level in reversed(LEVELS)])
+        self.codes = {level: c[order] for level, c in codes.items()}
+        self.values = np.ascontiguousarray(values[:, order])  # (metrics, rows, months)
+        self._groups = {}
+
+    @classmethod
+    def from_portfolio(cls, clients=None):
+        """clients: [{'name', 'assumptions', 'regions'}]; None = the v2 defaults"""
+        clients = clients or [{'name': DEFAULT_CLIENT}]
+        inputs, labels = [], []
+        for client in clients:
+            general, ramps, markets = resolve_assumptions(client.get('assumptions'))
+            regions = client.get('regions', {})
+            for m in markets:
+                inputs.append(market_inputs(m, general, ramps))
+                labels.append((client['name'], regions.get(m['name'], DEFAULT_REGION), m['name']))
+        if not inputs:
+            raise ValueError("portfolio has no markets")
+        horizons = {len(i['ramp_ads']) for i in inputs}
+        if len(horizons) > 1:
+            raise ValueError(f"clients use different horizons ({sorted(horizons)} months)")
+
+        # One batch: every input becomes a (markets,) column, ramps (markets, months)
+        batch = {k: np.array([i.get(k, 0) for i in inputs], dtype=float)
+                 for k in set().union(*inputs)}
+        result = evaluate_market(batch)
+        facts = _channel_facts(result, batch['closing_rate'][:, None], batch['ltv'][:, None])
+
+        n = len(labels)
+        codes, names = {}, {}
+        for j, level in enumerate(LEVELS[:-1]):
+            codes[level], names[level] = _codes([lab[j] for lab in labels])
+            codes[level] = np.repeat(codes[level], len(CHANNELS))
+        codes['channel'] = np.tile(np.arange(len(CHANNELS)), n)
+        names['channel'] = list(CHANNELS)
+        months = result['revenue'].shape[1]
+        values = np.stack([facts[k].reshape(n * len(CHANNELS), months) for k in ADDITIVE_METRICS])
+        return cls(codes, names, values)
+
+    @property
+    def months(self):
+        return self.values.shape[2]
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    # ------------------------------------------------------------
+    # Group index
+    # ------------------------------------------------------------
+    def groups(self, by):
+        """(order or None, segment starts, keys) for a tuple of levels, cached"""
+        by = tuple(by)
+        if by in self._groups:
+            return self._groups[by]
+        unknown = [level for level in by if level not in LEVELS]
+        if unknown:
+            raise ValueError(f"unknown level {unknown[0]!r}; choose from {', '.join(LEVELS)}")
+        if not by:
+            entry = (None, np.array([0]), [()])
+        else:
+            dims = [len(self.names[level]) for level in by]
+            flat = np.ravel_multi_index([self.codes[level] for level in by], dims)
+            uniq, group = np.unique(flat, return_inverse=True)
+            order = np.argsort(group, kind='stable')
+            if np.array_equal(order, np.arange(len(order))):
+                order = None  # already contiguous
+            starts = np.concatenate([[0], np.cumsum(np.bincount(group))[:-1]])
+            keys = list(zip(*(np.array(self.names[level], dtype=object)[idx]
+                              for level, idx in zip(by, np.unravel_index(uniq, dims)))))
+            entry = (order, starts, keys)
+        self._groups[by] = entry
+        return entry
+
+    # ------------------------------------------------------------
+    # Rollup
+    # ------------------------------------------------------------
+    def rollup(self, by=('market',), grain='quarter'):
+        """ProjectionFrame with one row per group of `by` levels at `grain`"""
+        if grain not in GRAINS:
+            raise ValueError(f"unknown grain {grain!r}; choose from {', '.join(GRAINS)}")
+        order, starts, keys = self.groups(by)
+        values = self.values if order is None else self.values[:, order]
+        grouped = np.add.reduceat(values, starts, axis=1)
+
+        size = GRAINS[grain]
+        period_starts = np.arange(0, self.months, size)
+        period_ends = np.minimum(period_starts + size, self.months)
+        summed = np.add.reduceat(grouped, period_starts, axis=2)
+
+        periods = [f"{GRAIN_PREFIX[grain]}{i + 1}" for i in range(len(period_starts))]
+        months = [str(s + 1) if e - s == 1 else f"{s + 1}-{e}"
+                  for s, e in zip(period_starts, period_ends)]
+        labels = [" / ".join(k) for k in keys] if by else ["Portfolio"]
+        return ProjectionFrame.from_sums(dict(zip(ADDITIVE_METRICS, summed)), labels, periods,
+                                         months, (period_ends - period_starts)[None, :])
+
+
+def parse_levels(text):
+    if text in (None, '', 'portfolio'):
+        return ()
+    return tuple(level.strip() for level in text.split(',') if level.strip())
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def add_rollup_sheet(wb, frame, by=(), title=None):
+    """Combined Summary–style tab: one block of periods plus a total per group"""
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (section_fill, total_fill, thin_border, money_fmt, decimal_fmt,
+                                 roi_fmt, style_header, auto_width)
+
+    title = title or ("Rollup by " + " & ".join(level.title() for level in by)
+                      if by else "Portfolio Rollup")[:31]
+    if title in wb.sheetnames:
+        del wb[title]
+    ws = wb.create_sheet(title)
+    metrics = ('web_leads', 'ppc_leads', 'gbp_leads', 'total_leads', 'ad_spend', 'mgmt_fee',
+               'total_cost', 'jobs', 'revenue', 'monthly_rev', 'roi')
+    ws.append(["Period", "Months", "Website Leads", "PPC Leads", "GBP Leads",
+               "Total Qualified Leads", "Ad Spend", "Mgmt Fees", "Total Investment",
+               "Jobs", "Revenue", "Monthly Revenue (Avg)", "ROI"])
+    style_header(ws)
+
+    totals = frame.totals()
+    for i, name in enumerate(frame.markets):
+        ws.append([name.upper()] + [""] * 12)
+        for period, months, row in zip(frame.periods, frame.months, frame.rows(i, metrics)):
+            ws.append([period, months] + row)
+        ws.append(["TOTAL", f"1-{frame.months[-1].split('-')[-1]}"]
+                  + [totals[k][i].item() for k in metrics[:-2]]
+                  + [None, totals['roi'][i].item()])
+
+    money_cols, count_cols = (6, 7, 8, 10, 11), (2, 3, 4, 5, 9)
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        label = row[0].value
+        for idx, cell in enumerate(row):
+            cell.border = thin_border
+            cell.alignment = Alignment(horizontal='center')
+            if idx in money_cols:
+                cell.number_format = money_fmt
+            elif idx in count_cols:
+                cell.number_format = decimal_fmt
+            elif idx == 12:
+                cell.number_format = roi_fmt
+        if label == 'TOTAL':
+            for cell in row:
+                cell.fill = total_fill
+                cell.font = Font(bold=True)
+        elif row[1].value == "":
+            for cell in row:
+                cell.fill = section_fill
+                cell.font = Font(bold=True)
+    auto_width(ws)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Roll projections up a client/region/market/channel tree")
+    parser.add_argument('--portfolio', help="JSON file with a 'clients' list (default: v2 as one client)")
+    parser.add_argument('--by', default='market',
+                        help="comma-separated levels: " + ", ".join(LEVELS) + " ('portfolio' = one row)")
+    parser.add_argument('--grain', choices=list(GRAINS), default='quarter')
+    parser.add_argument('--json', action='store_true', help="print the rollup as JSON")
+    parser.add_argument('--xlsx', help="add/replace the rollup tab in this workbook")
+    args = parser.parse_args()
+
+    clients = None
+    if args.portfolio:
+        with open(args.portfolio) as f:
+            clients = json.load(f)['clients']
+
+    t0 = time.perf_counter()
+    by = parse_levels(args.by)
+    try:
+        tree = Hierarchy.from_portfolio(clients)
+        frame = tree.rollup(by, args.grain)
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps({name: frame.records(i) for i, name in enumerate(frame.markets)},
+                         indent=2))
+    else:
+        for i, name in enumerate(frame.markets):
+            print(f"  {name.upper()}")
+            print(f"  {'':6s}{'Leads':>8s}{'Jobs':>8s}{'Cost':>11s}{'Revenue':>13s}{'ROI':>7s}")
+            for p, r in zip(frame.periods, frame.rows(i, ('total_leads', 'jobs', 'total_cost',
+                                                          'revenue', 'roi'))):
+                print(f"  {p:6s}{r[0]:8.1f}{r[1]:8.1f}{r[2]:11,}{r[3]:13,}{r[4]:7.1f}")
+            print()
+        print(f"  {len(frame.markets):,} groups from {len(tree):,} fact rows in {elapsed * 1000:.1f}ms")
+
+    if args.xlsx:
+        from openpyxl import Workbook, load_workbook
+        if os.path.exists(args.xlsx):
+            wb = load_workbook(args.xlsx)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+        add_rollup_sheet(wb, frame, by)
+        wb.save(args.xlsx)
+        print(f"✅ Created: {args.xlsx}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Scenario Grid Runner
+Full-factorial sweeps over the projection inputs without holding the grid in
+memory. The cartesian product is never materialized: each chunk of scenario
+numbers is decoded with np.unravel_index, evaluated with vector_engine, and
+written straight into memory-mapped .npy columns on disk.
+
+Output directory layout:
+  meta.json          grid spec, axis sizes, column names (small header)
+  progress.json      rows completed so far, rewritten atomically per chunk
+  sketches.npz       a quantile sketch per column (quantile_sketch.py) and
+                     the rows it covers, saved every few seconds and at the end
+  <column>.npy       one float64 column per metric, row = scenario number
+
+Interrupted runs pick up from progress.json; rows completed after the last
+sketch save are read back from the columns into the sketches, not re-run.
+Later analyses call open_grid() to get read-only memmaps (zero-copy), the
+decoder for scenario inputs and the P5-P95 of every column without a pass
+over the data; quantile_sketch.py merges the sketches of several runs.
+Sketch percentiles skip NaN (payback_month for scenarios that never pay
+back); each column's nan_count says how many were left out.
+
+Grid spec (JSON):
+  {
+    "base": {...},                       # optional, same shape as project()
+    "axes": [
+      {"target": "general.closing_rate", "values": [0.40, 0.45, 0.50, 0.55]},
+      {"target": "*.qualified_rate",     "range": [0.40, 0.60, 21]},
+      {"target": "denver.cpl",           "values": [700, 800, 900]},
+      {"target": "tucson.max_gbp",       "values": [20, 30, 40]},
+      {"target": "*.ramp_web", "values": {"v2":      [0, 0, 0.05, 0.15, 0.35, 0.60],
+                                           "delayed": [0, 0, 0, 0.05, 0.20, 0.45]}}
+    ],
+    "cash_flow": true                    # optional, adds cash_flow.py columns
+  }
+
+Targets are "<scope>.<input>" where scope is a market name, or "*"/"general"
+for every market. Ramp axes take per-quarter (or per-month) schedules, or a
+parametric curve whose list-valued parameters become the variants:
+      {"target": "*.ramp_web", "curve": "piecewise", "params": {"start": [7, 10]}}
+(see ramp_curves.py).
+
+Usage:
+  python3 scenario_grid.py grid.json sweeps/closing_vs_cpl
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from projection_engine import resolve_assumptions
+from vector_engine import (MONTHS_PER_QUARTER, monthly_ramp, parse_target, scenario_inputs,
+                           evaluate_market, summary_columns, summary_column_names)
+from ramp_curves import compile_curve
+from cash_flow import cash_columns, cash_column_names
+from quantile_sketch import SketchSet
+
+DEFAULT_CHUNK_SIZE = 100_000
+SKETCH_FILE = 'sketches.npz'
+SKETCH_INTERVAL = 5.0   # seconds between sketch saves during a run
+
+# ============================================================
+# GRID DEFINITION
+# ============================================================
+class Axis:
+    """One swept input: a target and its value table (labels for ramp variants)"""
+
+    def __init__(self, spec, quarters):
+        self.target = spec['target']
+        self.scope, self.field = parse_target(self.target)
+
+        if 'curve' in spec:
+            if not self.is_ramp:
+                raise ValueError(f"{self.target}: curves only apply to ramp_* inputs")
+            values, labels = compile_curve(spec, quarters * MONTHS_PER_QUARTER)
+            labels = spec.get('labels', labels)
+        elif 'range' in spec:
+            start, stop, count = spec['range']
+            values, labels = np.linspace(start, stop, int(count)), None
+        else:
+            values = spec['values']
+            labels = list(values.keys()) if isinstance(values, dict) else None
+            values = list(values.values()) if isinstance(values, dict) else values
+
+        table = np.asarray(values, dtype=float)
+        if self.is_ramp:
+            if table.ndim != 2:
+                raise ValueError(f"{self.target} values must be ramp schedules (lists)")
+            # Per-quarter schedules are expanded; per-month schedules pass through
+            if table.shape[1] == quarters:
+                table = monthly_ramp(table)
+        elif table.ndim != 1:
+            raise ValueError(f"{self.target} values must be numbers")
+        if len(table) == 0:
+            raise ValueError(f"{self.target} has no values")
+
+        self.table = table
+        if labels is None:
+            labels = ([f"variant_{i}" for i in range(len(table))] if self.is_ramp
+                      else [f"{v:g}" for v in table])
+        self.labels = labels
+
+    @property
+    def is_ramp(self):
+        return self.field.startswith('ramp_')
+
+    def __len__(self):
+        return len(self.table)
+
+    def to_json(self):
+        return {'target': self.target, 'size': len(self), 'labels': self.labels,
+                'values': self.table.tolist()}
+
+
+class ScenarioGrid:
+    """Lazy cartesian product of axes over a base assumption set"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.general, self.ramps, self.markets = resolve_assumptions(spec.get('base'))
+        self.axes = [Axis(a, len(self.ramps)) for a in spec.get('axes', [])]
+        if not self.axes:
+            raise ValueError("grid spec needs at least one axis")
+        # Fail on unknown markets before any work is scheduled
+        scenario_inputs(self.markets, self.general, self.ramps,
+                        [(a.target, a.table[0]) for a in self.axes])
+
+        self.shape = tuple(len(a) for a in self.axes)
+        self.size = int(np.prod(self.shape, dtype=np.int64))
+        self.columns = summary_column_names(self.markets, len(self.ramps))
+        self.cash_flow = bool(spec.get('cash_flow'))
+        if self.cash_flow:
+            self.columns += cash_column_names(self.markets)
+
+    def fingerprint(self):
+        blob = json.dumps(self.spec, sort_keys=True).encode()
+        return hashlib.sha256(blob).hexdigest()[:16]
+
+    def decode(self, rows):
+        """Per-axis value indices for scenario numbers (tuple of arrays)"""
+        return np.unravel_index(np.asarray(rows, dtype=np.int64), self.shape)
+
+    def describe(self, row):
+        """{target: label} for one scenario number"""
+        idx = self.decode([row])
+        return {a.target: a.labels[int(i[0])] for a, i in zip(self.axes, idx)}
+
+    def inputs_for(self, rows):
+        """{market name: vector_engine inputs} for a block of scenario numbers"""
+        idx = self.decode(rows)
+        overrides = [(a.target, a.table[i]) for a, i in zip(self.axes, idx)]
+        return scenario_inputs(self.markets, self.general, self.ramps, overrides)
+
+    def evaluate(self, rows):
+        """{column: (len(rows),) array} for a block of scenario numbers"""
+        inputs = self.inputs_for(rows)
+        if not self.cash_flow:
+            return summary_columns(inputs, len(rows))
+        results = {name: evaluate_market(i) for name, i in inputs.items()}
+        out = summary_columns(inputs, len(rows), results)
+        out.update(cash_columns(inputs, len(rows), results=results))
+        return out
+
+
+# ============================================================
+# ON-DISK STORAGE
+# ============================================================
+def _write_json_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_sketches(out_dir, sketches, rows):
+    path = os.path.join(out_dir, SKETCH_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        sketches.save(f, completed_rows=rows)
+    os.replace(tmp, path)
+
+
+def _load_sketches(out_dir, columns, completed, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    SketchSet over rows [0, completed): the saved one, caught up from the
+    columns on disk for rows finished after it was saved. None when nothing
+    was saved (or the save is ahead of the columns).
+    """
+    path = os.path.join(out_dir, SKETCH_FILE)
+    if not os.path.exists(path):
+        return None
+    sketches, extra = SketchSet.load(path)
+    rows = extra.get('completed_rows', 0)
+    if rows > completed:
+        return None
+    for lo in range(rows, completed, chunk_size):
+        hi = min(lo + chunk_size, completed)
+        sketches.update({c: columns[c][lo:hi] for c in columns})
+    return sketches
+
+
+def run_grid(spec, out_dir, chunk_size=DEFAULT_CHUNK_SIZE, resume=True, log=print):
+    """Evaluate the whole grid into out_dir; returns rows completed"""
+    grid = ScenarioGrid(spec)
+    os.makedirs(out_dir, exist_ok=True)
+    meta_path = os.path.join(out_dir, 'meta.json')
+    progress_path = os.path.join(out_dir, 'progress.json')
+
+    meta = {
+        'fingerprint': grid.fingerprint(),
+        'spec': spec,
+        'shape': list(grid.shape),
+        'size': grid.size,
+        'axes': [a.to_json() for a in grid.axes],
+        'markets': [m['name'] for m in grid.markets],
+        'columns': grid.columns,
+        'dtype': 'float64',
+    }
+
+    existing = _read_json(meta_path)
+    start = 0
+    if resume and existing and existing.get('fingerprint') == meta['fingerprint']:
+        start = _read_json(progress_path, {}).get('completed_rows', 0)
+        mode = 'r+'
+    else:
+        _write_json_atomic(meta_path, meta)
+        _write_json_atomic(progress_path, {'completed_rows': 0})
+        if os.path.exists(os.path.join(out_dir, SKETCH_FILE)):
+            os.remove(os.path.join(out_dir, SKETCH_FILE))
+        mode = 'w+'
+
+    columns = {}
+    for c in grid.columns:
+        path = os.path.join(out_dir, f"{c}.npy")
+        if mode == 'r+' and os.path.exists(path):
+            columns[c] = open_memmap(path, mode='r+')
+        else:
+            columns[c] = open_memmap(path, mode='w+', dtype=np.float64, shape=(grid.size,))
+
+    sketches = _load_sketches(out_dir, columns, start, chunk_size) if start else None
+    if sketches is None:
+        # No saved sketches (fresh run, or one from before they were kept):
+        # build them from whatever rows are already on disk.
+        sketches = SketchSet(columns=grid.columns)
+        for lo in range(0, start, chunk_size):
+            sketches.update({c: columns[c][lo:min(lo + chunk_size, start)] for c in grid.columns})
+    if start >= grid.size:
+        _save_sketches(out_dir, sketches, start)
+        log(f"Grid already complete: {grid.size:,} scenarios in {out_dir}")
+        return grid.size
+    if start:
+        log(f"Resuming at scenario {start:,} of {grid.size:,}")
+
+    t0 = saved = time.perf_counter()
+    for lo in range(start, grid.size, chunk_size):
+        hi = min(lo + chunk_size, grid.size)
+        block = grid.evaluate(np.arange(lo, hi, dtype=np.int64))
+        for c, values in block.items():
+            columns[c][lo:hi] = values
+        sketches.update(block)
+        # Data first, then the checkpoint, so a crash never records rows
+        # that are not on disk yet. Sketches trail the checkpoint and are
+        # caught up from the columns on resume, so no row is counted twice.
+        for arr in columns.values():
+            arr.flush()
+        _write_json_atomic(progress_path, {'completed_rows': hi})
+        now = time.perf_counter()
+        if hi == grid.size or now - saved >= SKETCH_INTERVAL:
+            _save_sketches(out_dir, sketches, hi)
+            saved = now
+        rate = (hi - start) / max(now - t0, 1e-9)
+        log(f"  {hi:,}/{grid.size:,} scenarios ({rate:,.0f}/s)")
+
+    return grid.size
+
+
+def open_grid(out_dir):
+    """
+    Read-only view of a stored grid: {'meta', 'grid', 'completed_rows',
+    'columns', 'sketches'}. Columns are np.memmap arrays; nothing is loaded
+    until it is touched. sketches is a SketchSet over the completed rows
+    (None for runs from before sketches were kept).
+    """
+    meta = _read_json(os.path.join(out_dir, 'meta.json'))
+    if meta is None:
+        raise FileNotFoundError(f"No scenario grid in {out_dir}")
+    completed = _read_json(os.path.join(out_dir, 'progress.json'), {}).get('completed_rows', 0)
+    columns = {c: np.load(os.path.join(out_dir, f"{c}.npy"), mmap_mode='r')
+               for c in meta['columns']}
+    return {
+        'meta': meta,
+        'grid': ScenarioGrid(meta['spec']),
+        'completed_rows': completed,
+        'columns': columns,
+        'sketches': _load_sketches(out_dir, columns, completed),
+    }
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Run a full-factorial scenario grid")
+    parser.add_argument('spec', help="grid spec JSON file")
+    parser.add_argument('out_dir', help="directory for meta.json and .npy columns")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--restart', action='store_true', help="ignore saved progress")
+    args = parser.parse_args()
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    grid = ScenarioGrid(spec)
+    print(f"Grid: {' × '.join(str(n) for n in grid.shape)} = {grid.size:,} scenarios")
+    run_grid(spec, args.out_dir, args.chunk_size, resume=not args.restart)
+    print(f"✅ Results: {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Scenario Query Layer
+Indexed range / top-k queries over a stored scenario grid (scenario_grid.py).
+
+build_indexes() writes, per metric column, into <grid>/index/:
+  <col>.order.npy     row ids sorted by value (argsort)
+  <col>.sorted.npy    the values in that order (for searchsorted)
+  <col>.bitmaps.npy   range-encoded bitmaps: bitmap i = rows whose rank is
+                      >= i * bin_width (equal-depth bins, packed bits)
+
+NaN values (payback_month / cash_breakeven_month when payback is never
+reached) sort after every number; rank intervals and top-k stop at each
+column's finite count, so they match no predicate and never rank as best.
+
+A range predicate becomes a rank interval via searchsorted. Whole bins inside
+the interval come from two precomputed bitmaps (B_lo & ~B_hi); only the two
+partial edge bins are scattered from the sort order. Predicates AND together
+as packed bitmaps, so no query rereads a metric column end to end. Very
+selective predicates skip bitmaps entirely and check candidates directly.
+
+Filters on swept inputs ("*.ramp_web <= 0.60") are answered from the axis
+tables: ramp axes compare the final-month ramp value. An axis value repeats
+with a fixed stride in scenario order, so its bitmap is one packed period
+tiled across the grid (or, for the slow outer axes, byte runs filled
+between start and stop), never a per-scenario mask.
+
+Usage:
+  python3 scenario_query.py sweeps/run1 --build
+  python3 scenario_query.py sweeps/run1 --where "q6_monthly>=300000" \\
+      --where "roi>=12" --where "*.ramp_web<=0.60" --count
+  python3 scenario_query.py sweeps/run1 --top total_revenue 100
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from scenario_grid import open_grid
+
+DEFAULT_BINS = 32
+SELECTIVE_FRACTION = 1 / 64   # below this, check candidates instead of bitmaps
+TOP_K_BLOCK = 65536
+SCATTER_AT_MAX = 100_000
+AXIS_TILE_BITS = 1 << 23      # axis periods up to this many bits are tiled
+SLICE_RUNS_MAX = 4096         # fewer whole-byte runs are filled slice by slice
+
+
+# ============================================================
+# INDEX BUILD
+# ============================================================
+def _index_dir(grid_dir):
+    return os.path.join(grid_dir, 'index')
+
+
+def build_indexes(grid_dir, columns=None, bins=DEFAULT_BINS, log=print):
+    """Precompute sort orders and range-encoded bitmaps for metric columns"""
+    stored = open_grid(grid_dir)
+    n = stored['completed_rows']
+    if n < stored['meta']['size']:
+        log(f"⚠️  Grid is only {n:,}/{stored['meta']['size']:,} complete; indexing finished rows")
+    columns = columns or stored['meta']['columns']
+    bins = max(1, min(bins, n))
+    width = max(1, -(-n // bins))   # an empty grid still gets a (zero-row) index
+    order_dtype = np.int32 if n < 2 ** 31 else np.int64
+
+    out = _index_dir(grid_dir)
+    os.makedirs(out, exist_ok=True)
+    for c in columns:
+        t0 = time.perf_counter()
+        values = stored['columns'][c][:n]
+        order = np.argsort(values, kind='stable').astype(order_dtype, copy=False)
+        np.save(os.path.join(out, f"{c}.order.npy"), order)
+        np.save(os.path.join(out, f"{c}.sorted.npy"), values[order])
+
+        # Walk bins from the top so bitmap i = rows with rank >= i * width
+        bitmaps = np.lib.format.open_memmap(
+            os.path.join(out, f"{c}.bitmaps.npy"), mode='w+',
+            dtype=np.uint8, shape=(bins + 1, -(-n // 8)))
+        mask = np.zeros(n, dtype=bool)
+        for i in range(bins, -1, -1):
+            mask[order[i * width:(i + 1) * width]] = True
+            bitmaps[i] = np.packbits(mask, bitorder='little')
+        bitmaps.flush()
+        del bitmaps
+        log(f"  indexed {c} in {time.perf_counter() - t0:.1f}s")
+
+    meta_path = os.path.join(out, 'meta.json')
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    if meta.get('rows') != n or meta.get('bins') != bins:
+        meta = {'rows': n, 'bins': bins, 'width': width, 'columns': []}
+    meta['columns'] = sorted(set(meta['columns']) | set(columns))
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+def parse_predicate(text):
+    """'q6_monthly>=300000' -> ('q6_monthly', '>=', 300000.0)"""
+    m = re.match(r'^\s*([\w.*]+)\s*(>=|<=|==|>|<)\s*([-+0-9.eE_]+%?)\s*$', text)
+    if not m:
+        raise ValueError(f"Cannot parse predicate {text!r} (expected e.g. roi>=12)")
+    name, op, raw = m.groups()
+    value = float(raw.rstrip('%').replace('_', ''))
+    if raw.endswith('%'):
+        value /= 100
+    return name, op, value
+
+
+class ScenarioIndex:
+    """Query interface over a grid directory with built indexes"""
+
+    def __init__(self, grid_dir):
+        self.grid_dir = grid_dir
+        self.stored = open_grid(grid_dir)
+        self.grid = self.stored['grid']
+        self.columns = self.stored['columns']
+        with open(os.path.join(_index_dir(grid_dir), 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.n = self.meta['rows']
+        self.width = self.meta['width']
+        self.nbytes = -(-self.n // 8)
+        self._cache = {}
+
+    # ---- index files (memory-mapped, opened lazily) ----
+    def _load(self, column, kind):
+        key = (column, kind)
+        if key not in self._cache:
+            if column not in self.meta['columns']:
+                raise KeyError(f"No index for {column!r}; run --build first")
+            path = os.path.join(_index_dir(self.grid_dir), f"{column}.{kind}.npy")
+            self._cache[key] = np.load(path, mmap_mode='r')
+        return self._cache[key]
+
+    def _axis(self, name):
+        for a in self.grid.axes:
+            if a.target == name:
+                return a
+        return None
+
+    def _finite(self, column):
+        """Rows with a non-NaN value: NaN sorts last, so the length of the finite prefix"""
+        key = (column, 'finite')
+        if key not in self._cache:
+            self._cache[key] = int(np.searchsorted(self._load(column, 'sorted'), np.inf, side='right'))
+        return self._cache[key]
+
+    # ---- predicate -> row set ----
+    def _rank_range(self, column, op, value):
+        s = self._load(column, 'sorted')
+        lo, hi = 0, self._finite(column)
+        if op in ('>=', '=='):
+            lo = int(np.searchsorted(s, value, side='left'))
+        if op == '>':
+            lo = int(np.searchsorted(s, value, side='right'))
+        if op in ('<=', '=='):
+            hi = int(np.searchsorted(s, value, side='right'))
+        if op == '<':
+            hi = int(np.searchsorted(s, value, side='left'))
+        finite = self._finite(column)
+        lo, hi = min(lo, finite), min(hi, finite)
+        return lo, max(lo, hi)
+
+    def _scatter(self, bitmap, rows):
+        """Set the bits for (distinct) row ids in a packed bitmap"""
+        rows = np.asarray(rows, dtype=np.int64)
+        bits = (1 << (rows & 7)).astype(np.uint8)
+        if len(rows) < SCATTER_AT_MAX:
+            np.bitwise_or.at(bitmap, rows >> 3, bits)
+        else:
+            # Rows are distinct, so summing their bits per byte equals OR-ing them
+            bitmap |= np.bincount(rows >> 3, weights=bits, minlength=self.nbytes).astype(np.uint8)
+
+    def _metric_bitmap(self, column, lo, hi):
+        order = self._load(column, 'order')
+        bitmaps = self._load(column, 'bitmaps')
+        a = -(-lo // self.width)    # first whole bin
+        b = hi // self.width        # first bin past the whole ones
+        if a >= b:
+            bitmap = np.zeros(self.nbytes, dtype=np.uint8)
+            self._scatter(bitmap, order[lo:hi])
+            return bitmap
+        bitmap = bitmaps[a] & ~bitmaps[b]
+        self._scatter(bitmap, order[lo:a * self.width])
+        self._scatter(bitmap, order[b * self.width:hi])
+        return bitmap
+
+    def _axis_allowed(self, axis, op, value):
+        keys = axis.table[:, -1] if axis.is_ramp else axis.table
+        return _compare(keys, op, value)
+
+    def _axis_bitmap(self, axis, allowed):
+        """Packed bitmap of the rows whose value on axis is allowed, from the axis stride"""
+        ai = self.grid.axes.index(axis)
+        stride = int(np.prod(self.grid.shape[ai + 1:], dtype=np.int64))
+        period = stride * len(axis)
+        span = int(np.lcm(period, 8))
+        if span <= AXIS_TILE_BITS:
+            # One byte-aligned stretch of periods, repeated over the grid
+            pattern = np.packbits(np.resize(np.repeat(allowed, stride), span), bitorder='little')
+            pattern = np.tile(pattern, max(1, min(AXIS_TILE_BITS // span, self.nbytes // len(pattern))))
+            bitmap = np.resize(pattern, self.nbytes)
+        else:
+            # Long periods: each allowed value is one run of `stride` rows per period
+            starts = (np.arange(0, self.n, period, dtype=np.int64)[:, None]
+                      + np.flatnonzero(allowed) * stride).ravel()
+            starts = starts[starts < self.n]
+            bitmap = self._runs_bitmap(starts, np.minimum(starts + stride, self.n))
+        if self.n % 8:
+            bitmap[-1] &= (1 << (self.n % 8)) - 1
+        return bitmap
+
+    def _runs_bitmap(self, starts, stops):
+        """Packed bitmap with the bits of [start, stop) runs set"""
+        first = -(-starts // 8)       # first whole byte of each run
+        last = stops // 8             # first byte past its whole bytes
+        whole = first < last
+        if whole.sum() <= SLICE_RUNS_MAX:
+            bitmap = np.zeros(self.nbytes, dtype=np.uint8)
+            for a, b in zip(first[whole].tolist(), last[whole].tolist()):
+                bitmap[a:b] = 0xFF
+        else:
+            edges = np.zeros(self.nbytes + 1, dtype=np.int8)   # runs are disjoint: 0/1
+            np.add.at(edges, first[whole], 1)
+            np.add.at(edges, last[whole], -1)
+            bitmap = np.cumsum(edges[:-1], dtype=np.int8).view(np.uint8) * np.uint8(0xFF)
+        # Up to 7 leading and 7 trailing bits per run
+        head_end = np.minimum(first * 8, stops)
+        tail_start = np.maximum(last * 8, head_end)
+        offsets = np.arange(8)
+        head = (starts[:, None] + offsets)[starts[:, None] + offsets < head_end[:, None]]
+        tail = (tail_start[:, None] + offsets)[tail_start[:, None] + offsets < stops[:, None]]
+        self._scatter(bitmap, np.concatenate([head, tail]))
+        return bitmap
+
+    def _row_matches(self, rows, name, op, value):
+        axis = self._axis(name)
+        if axis is not None:
+            ai = self.grid.axes.index(axis)
+            allowed = self._axis_allowed(axis, op, value)
+            return allowed[self.grid.decode(rows)[ai]]
+        return _compare(self.columns[name][rows], op, value)
+
+    def select(self, where):
+        """
+        Rows matching every predicate, as a sorted int64 array.
+        where: iterable of (column_or_axis_target, op, value) or strings.
+        """
+        preds = [parse_predicate(p) if isinstance(p, str) else tuple(p) for p in where]
+        if not preds:
+            return np.arange(self.n, dtype=np.int64)
+
+        # Size every metric predicate from its rank interval (two searchsorted calls)
+        sized = []
+        for name, op, value in preds:
+            if self._axis(name) is None:
+                lo, hi = self._rank_range(name, op, value)
+                sized.append((hi - lo, name, op, value, lo, hi))
+        sized.sort()
+
+        if sized and sized[0][0] <= self.n * SELECTIVE_FRACTION:
+            # Selective: take the smallest candidate set and test the rest directly
+            _, name, op, value, lo, hi = sized[0]
+            rows = np.sort(self._load(name, 'order')[lo:hi].astype(np.int64))
+            for p in preds:
+                if p == (name, op, value) or len(rows) == 0:
+                    continue
+                rows = rows[self._row_matches(rows, *p)]
+            return rows
+
+        bitmap = None
+        for _, name, op, value, lo, hi in sized:
+            part = self._metric_bitmap(name, lo, hi)
+            bitmap = part if bitmap is None else bitmap & part
+        for name, op, value in preds:
+            axis = self._axis(name)
+            if axis is not None:
+                part = self._axis_bitmap(axis, self._axis_allowed(axis, op, value))
+                bitmap = part if bitmap is None else bitmap & part
+        return np.flatnonzero(np.unpackbits(bitmap, bitorder='little', count=self.n))
+
+    def count(self, where):
+        return len(self.select(where))
+
+    def top(self, column, k=100, where=(), descending=True):
+        """Top-k rows by column (optionally filtered), best first; NaN rows never rank"""
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        finite = self._finite(column)
+        order = self._load(column, 'order')[:finite]
+        preds = [parse_predicate(p) if isinstance(p, str) else tuple(p) for p in where]
+        if not preds:
+            picked = order[max(0, finite - k):][::-1] if descending else order[:k]
+            return np.asarray(picked, dtype=np.int64)
+
+        matched = self.select(preds)
+        if len(matched) <= k:
+            values = self.columns[column][matched]
+            matched, values = matched[~np.isnan(values)], values[~np.isnan(values)]
+            sign = -1 if descending else 1
+            return matched[np.argsort(sign * values, kind='stable')]
+
+        # Walk the sort order from the best end, keeping rows that pass
+        bitmap = np.zeros(self.nbytes, dtype=np.uint8)
+        self._scatter(bitmap, matched)
+        found, total = [np.empty(0, dtype=np.int64)], 0
+        for start in range(0, finite, TOP_K_BLOCK):
+            if descending:
+                block = order[max(0, finite - start - TOP_K_BLOCK):finite - start][::-1]
+            else:
+                block = order[start:start + TOP_K_BLOCK]
+            block = np.asarray(block, dtype=np.int64)
+            keep = block[(bitmap[block >> 3] >> (block & 7)) & 1 == 1]
+            found.append(keep)
+            total += len(keep)
+            if total >= k:
+                break
+        return np.concatenate(found)[:k]
+
+    def rows(self, row_ids, columns=None):
+        """Materialize result rows as dicts (inputs decoded from the grid)"""
+        columns = columns or self.stored['meta']['columns']
+        out = []
+        for r in np.asarray(row_ids, dtype=np.int64):
+            rec = {'scenario': int(r)}
+            rec.update(self.grid.describe(int(r)))
+            rec.update({c: float(self.columns[c][r]) for c in columns})
+            out.append(rec)
+        return out
+
+
+def _compare(values, op, value):
+    if op == '>=':
+        return values >= value
+    if op == '<=':
+        return values <= value
+    if op == '>':
+        return values > value
+    if op == '<':
+        return values < value
+    return values == value
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Query a stored scenario grid")
+    parser.add_argument('grid_dir')
+    parser.add_argument('--build', action='store_true', help="(re)build indexes first")
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS)
+    parser.add_argument('--where', action='append', default=[],
+                        help="predicate like 'roi>=12' or '*.ramp_web<=60%%'")
+    parser.add_argument('--top', nargs=2, metavar=('COLUMN', 'K'))
+    parser.add_argument('--ascending', action='store_true')
+    parser.add_argument('--count', action='store_true')
+    parser.add_argument('--limit', type=int, default=20, help="rows to print")
+    args = parser.parse_args()
+
+    if args.build:
+        build_indexes(args.grid_dir, bins=args.bins)
+
+    index = ScenarioIndex(args.grid_dir)
+    t0 = time.perf_counter()
+    if args.top:
+        column, k = args.top[0], int(args.top[1])
+        result = index.top(column, k, args.where, descending=not args.ascending)
+    else:
+        result = index.select(args.where)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{len(result):,} scenarios in {elapsed * 1000:.1f} ms")
+    if not args.count:
+        for rec in index.rows(result[:args.limit]):
+            print(json.dumps(rec))
+
+
+if __name__ == '__main__':
+    main()
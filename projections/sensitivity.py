@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Global Sensitivity Analysis (Sobol indices)
+Variance-based first-order and total-order indices for every model input:
+channel caps, CPL, LTV components, qualified/closing rates and each ramp
+value. Unlike the one-at-a-time rows in "Sensitivities & Notes", the
+total-order index includes interactions (closing rate × GBP ramp, ...).
+
+Saltelli design: matrices A, B and AB_i (A with column i from B), N rows
+each, so N × (d + 2) model runs. They are stacked into one matrix and
+evaluated in chunks on the vectorized engine, across cores when the batch
+is large. Estimators: Saltelli (2010) first order, Jansen total order,
+with 95% intervals from their standard errors.
+
+Each input varies uniformly by ±SPREAD around its v2 value (rates and ramp
+values are clipped to [0, 1]); inputs whose v2 value is 0 get ZERO_BASE_HIGH.
+
+Usage:
+  python3 sensitivity.py                    # print the ranking
+  python3 sensitivity.py --samples 16384 --workers 8 --xlsx sobol.xlsx
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from projection_engine import resolve_assumptions
+from vector_engine import (RAMP_CHANNELS, monthly_ramp, scenario_inputs, summary_columns,
+                           slug)
+from uncertainty import ReplicateSampler
+
+SPREAD = 0.20
+OUTPUTS = ('q6_monthly', 'total_revenue', 'roi')
+MARKET_INPUTS = ('max_web', 'max_ppc', 'max_gbp', 'cpl',
+                 'mit_avg', 'abate_avg', 'abate_conv', 'recon_avg', 'recon_conv', 'recon_fee')
+UNIT_INTERVAL = ('qualified_rate', 'closing_rate', 'abate_conv', 'recon_conv')
+ZERO_BASE_HIGH = {'ramp': 0.05, 'recon_fee': 500}
+CHUNK_ROWS = 50_000
+PARALLEL_MIN_ROWS = 400_000
+
+
+# ============================================================
+# INPUT SPACE
+# ============================================================
+class SensitivityModel:
+    """Maps unit-cube rows to engine inputs; plain data so it pickles to workers"""
+
+    def __init__(self, assumptions=None, spread=SPREAD):
+        self.general, self.ramps, self.markets = resolve_assumptions(assumptions)
+        self.quarters = list(self.ramps)
+        self.names, self.labels, self.base, self.low, self.high = [], [], [], [], []
+
+        for field in ('qualified_rate', 'closing_rate'):
+            self._add(f"general.{field}", f"General: {field.replace('_', ' ').title()}",
+                      self.general[field], field, spread)
+        for m in self.markets:
+            for field in MARKET_INPUTS:
+                if field in m:
+                    self._add(f"{slug(m['name'])}.{field}", f"{m['name']}: {field}",
+                              m[field], field, spread)
+        for ch in RAMP_CHANNELS:
+            for q in self.quarters:
+                self._add(f"ramp.{ch}.{q}", f"Ramp {ch.upper()} {q}",
+                          self.ramps[q][ch], 'ramp', spread)
+
+        self.base = np.array(self.base)
+        self.low = np.array(self.low)
+        self.high = np.array(self.high)
+        self.dim = len(self.names)
+
+    def _add(self, name, label, base, kind, spread):
+        if base == 0:
+            low, high = 0.0, ZERO_BASE_HIGH.get(kind, 1.0)
+        else:
+            low, high = base * (1 - spread), base * (1 + spread)
+        if kind in UNIT_INTERVAL or kind == 'ramp':
+            low, high = max(low, 0.0), min(high, 1.0)
+        self.names.append(name)
+        self.labels.append(label)
+        self.base.append(base)
+        self.low.append(low)
+        self.high.append(high)
+
+    def evaluate(self, u):
+        """(n, d) unit rows -> {output: (n,)}"""
+        x = self.low + (self.high - self.low) * u
+        overrides = []
+        ramp_cols = {ch: np.tile([self.ramps[q][ch] for q in self.quarters], (len(x), 1))
+                     for ch in RAMP_CHANNELS}
+        for j, name in enumerate(self.names):
+            if name.startswith('ramp.'):
+                _, ch, q = name.split('.')
+                ramp_cols[ch][:, self.quarters.index(q)] = x[:, j]
+            else:
+                overrides.append((name, x[:, j]))
+        for ch, table in ramp_cols.items():
+            # Markets with their own curve for a channel keep it
+            for m in self.markets:
+                if ch not in (m.get('ramp_curves') or {}):
+                    overrides.append((f"{slug(m['name'])}.ramp_{ch}", monthly_ramp(table)))
+        out = summary_columns(scenario_inputs(self.markets, self.general, self.ramps, overrides),
+                              len(x))
+        return {k: np.asarray(out[k]) for k in OUTPUTS}
+
+
+def _evaluate_chunk(model, u):
+    return model.evaluate(u)
+
+
+# ============================================================
+# SOBOL INDICES
+# ============================================================
+def saltelli_matrix(model, samples, sampler='lhs', seed=0):
+    """Stack [A; B; AB_1; ...; AB_d] as one (samples × (d + 2), d) matrix"""
+    d = model.dim
+    base = ReplicateSampler(sampler, 2 * d, np.random.default_rng(seed)).next(samples)
+    a, b = base[:, :d], base[:, d:]
+    blocks = [a, b]
+    for i in range(d):
+        ab = a.copy()
+        ab[:, i] = b[:, i]
+        blocks.append(ab)
+    return np.vstack(blocks)
+
+
+def evaluate_rows(model, rows, workers=None):
+    """Evaluate a big row matrix in chunks, in a process pool when it pays off"""
+    chunks = [rows[i:i + CHUNK_ROWS] for i in range(0, len(rows), CHUNK_ROWS)]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(rows) >= PARALLEL_MIN_ROWS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_evaluate_chunk, [model] * len(chunks), chunks))
+    else:
+        parts = [model.evaluate(c) for c in chunks]
+    return {k: np.concatenate([p[k] for p in parts]) for k in OUTPUTS}
+
+
+def sobol_indices(y, samples, d):
+    """
+    First/total-order indices for one output, with 95% half-widths from the
+    standard error of each estimator's per-row terms.
+    """
+    y_a, y_b = y[:samples], y[samples:2 * samples]
+    y_ab = y[2 * samples:].reshape(d, samples)
+    var = np.var(np.concatenate([y_a, y_b]))
+    if var <= 0:
+        zeros = np.zeros(d)
+        return {'s1': zeros, 'st': zeros, 's1_ci': zeros, 'st_ci': zeros}
+
+    s1_terms = y_b * (y_ab - y_a)
+    st_terms = 0.5 * (y_a - y_ab) ** 2
+    scale = 1.96 / np.sqrt(samples) / var
+    return {
+        's1': s1_terms.mean(axis=1) / var,
+        'st': st_terms.mean(axis=1) / var,
+        's1_ci': s1_terms.std(axis=1) * scale,
+        'st_ci': st_terms.std(axis=1) * scale,
+    }
+
+
+def run_sobol(samples=8192, workers=None, sampler='lhs', seed=0, assumptions=None,
+              spread=SPREAD):
+    """
+    Returns {'model', 'samples', 'evaluations', 'ranking'}; ranking is a list of
+    per-input dicts sorted by total-order index on Q6 monthly revenue.
+    """
+    model = SensitivityModel(assumptions, spread)
+    rows = saltelli_matrix(model, samples, sampler, seed)
+    y = evaluate_rows(model, rows, workers)
+    indices = {k: sobol_indices(y[k], samples, model.dim) for k in OUTPUTS}
+
+    ranking = []
+    for j in range(model.dim):
+        entry = {'input': model.names[j], 'label': model.labels[j], 'base': model.base[j],
+                 'low': model.low[j], 'high': model.high[j]}
+        for k in OUTPUTS:
+            for stat in ('s1', 'st', 's1_ci', 'st_ci'):
+                entry[f"{k}_{stat}"] = float(indices[k][stat][j])
+        ranking.append(entry)
+    ranking.sort(key=lambda e: e['q6_monthly_st'], reverse=True)
+    return {'model': model, 'samples': samples, 'evaluations': len(rows), 'ranking': ranking}
+
+
+# ============================================================
+# WORKBOOK TAB
+# ============================================================
+def sobol_rows(result):
+    """Header, one row per ranked input and the notes"""
+    rows = [["Rank", "Input", "Base Value", "Low", "High",
+             "Q6 Monthly First-Order", "Q6 Monthly Total-Order", "Interaction Share",
+             "Total-Order ±95%", "18-Mo Revenue Total-Order", "ROI Total-Order"]]
+    for rank, e in enumerate(result['ranking'], start=1):
+        rows.append([
+            rank, e['label'], e['base'], e['low'], e['high'],
+            round(e['q6_monthly_s1'], 4), round(e['q6_monthly_st'], 4),
+            round(max(e['q6_monthly_st'] - e['q6_monthly_s1'], 0.0), 4),
+            round(e['q6_monthly_st_ci'], 4),
+            round(e['total_revenue_st'], 4), round(e['roi_st'], 4),
+        ])
+
+    rows.append([])
+    rows.append(["NOTES", "", "", "", "", "", "", "", "", "", ""])
+    rows.append(["", f"Saltelli design, N = {result['samples']:,} "
+                     f"({result['evaluations']:,} model runs)", "", "", "", "", "", "", "", "", ""])
+    rows.append(["", "First-order: share of variance from the input alone", "", "", "", "", "",
+                 "", "", "", ""])
+    rows.append(["", "Total-order: includes every interaction with other inputs", "", "", "",
+                 "", "", "", "", "", ""])
+    rows.append(["", f"Inputs vary uniformly ±{SPREAD:.0%} around the v2 value", "", "", "", "",
+                 "", "", "", "", ""])
+    return rows
+
+
+def add_sensitivity_sheet(wb, result, title="Global Sensitivity"):
+    """Ranked Sobol indices as a new tab in the v2 style"""
+    from openpyxl.styles import Font, Alignment
+    from workbook_styles import (section_fill, thin_border, pct_fmt, style_header,
+                                 auto_width)
+
+    ws = wb.create_sheet(title)
+    rows = sobol_rows(result)
+    ws.append(rows[0])
+    style_header(ws)
+    for row_data in rows[1:]:
+        ws.append(row_data)
+
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for idx, cell in enumerate(row):
+            if row[0].value in (None, ""):
+                continue
+            cell.border = thin_border
+            if row[0].value == "NOTES":
+                cell.fill = section_fill
+                cell.font = Font(bold=True)
+            elif idx >= 5:
+                cell.number_format = pct_fmt if idx != 8 else '0.0%'
+                cell.alignment = Alignment(horizontal='center')
+    auto_width(ws)
+    return ws
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Sobol first/total-order sensitivity indices")
+    parser.add_argument('--samples', type=int, default=8192, help="N rows per Saltelli matrix")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sampler', default='lhs')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--xlsx', help="write the ranking to this workbook")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = run_sobol(args.samples, args.workers, args.sampler, args.seed)
+    elapsed = time.perf_counter() - t0
+
+    print(f"  {result['model'].dim} inputs, {result['evaluations']:,} runs in {elapsed:.1f}s")
+    print(f"  {'Input':32s} {'S1':>7s} {'ST':>7s}   (Q6 monthly revenue)")
+    for e in result['ranking']:
+        print(f"  {e['label']:32s} {e['q6_monthly_s1']:7.3f} {e['q6_monthly_st']:7.3f}")
+
+    if args.xlsx:
+        from openpyxl import Workbook
+        wb = Workbook()
+        wb.remove(wb.active)
+        add_sensitivity_sheet(wb, result)
+        wb.save(args.xlsx)
+        print(f"✅ Created: {args.xlsx}")
+
+
+if __name__ == '__main__':
+    main()
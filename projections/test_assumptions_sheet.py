@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Assumptions Tab Round-Trip Tests
+Writes a v2 workbook from an assumption dict with a non-integer management
+fee, reads its Assumptions tab back with read_assumptions(), and checks that
+the fee and the resolved inputs come back unchanged.
+
+Usage:
+  python3 test_assumptions_sheet.py
+  python3 -m unittest test_assumptions_sheet -v
+"""
+
+import os
+import tempfile
+import unittest
+
+from assumptions_sheet import SHEET_TITLE, MGMT_FEE_LABEL, read_assumptions
+from create_conservative_v2 import build_workbook
+from projection_engine import resolve_assumptions
+from workbook_styles import money_fmt
+
+ASSUMPTIONS = {'general': {'mgmt_fee_monthly': 1375.20, 'closing_rate': 0.45}}
+
+
+class RoundTripTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "round_trip.xlsx")
+        wb, _ = build_workbook(ASSUMPTIONS, tabs=[SHEET_TITLE])
+        wb.save(cls.path)
+        cls.fee_row = next(row for row in wb[SHEET_TITLE].iter_rows(min_row=2)
+                           if row[1].value == MGMT_FEE_LABEL)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_fee_written_unrounded(self):
+        self.assertEqual(self.fee_row[2].value, 1375.20 * 2)
+        self.assertEqual(self.fee_row[2].number_format, money_fmt)
+        self.assertIn("$1,375.20/location", self.fee_row[3].value)
+
+    def test_fee_reads_back(self):
+        assumptions, warnings = read_assumptions(self.path)
+        self.assertEqual(warnings, [])
+        self.assertEqual(assumptions['general']['mgmt_fee_monthly'], 1375.20)
+
+    def test_resolved_inputs_read_back(self):
+        assumptions, _ = read_assumptions(self.path)
+        self.assertEqual(resolve_assumptions(assumptions), resolve_assumptions(ASSUMPTIONS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Boundary Mapping Tests
+Maps cash_breakeven_month and payback_month over a lever box where part of
+the box never breaks even (NaN corners) and checks that the summary,
+polylines and Goal Boundary heatmap tab handle those corners.
+
+Usage:
+  python3 test_boundary.py
+  python3 -m unittest test_boundary -v
+"""
+
+import json
+import math
+import unittest
+
+import numpy as np
+from openpyxl import Workbook
+
+from boundary import map_boundary, add_boundary_sheet
+
+# Low closing rates with high CPLs never break even
+AXES = [
+    {'target': 'general.closing_rate', 'range': [0.02, 0.60]},
+    {'target': '*.cpl', 'range': [200, 3000]},
+]
+
+
+class NeverReachedTest(unittest.TestCase):
+
+    def check_map(self, metric, threshold):
+        bmap = map_boundary({'metric': metric, 'threshold': threshold, 'axes': AXES,
+                             'initial': 4, 'depth': 3})
+        self.assertTrue(np.isnan(bmap.values).any(), "box should include never-reached corners")
+
+        summary = bmap.summary()
+        json.dumps(summary, allow_nan=False)
+        for line in summary['polylines']:
+            for point in line:
+                self.assertTrue(all(math.isfinite(x) for x in point))
+
+        wb = Workbook()
+        ws = add_boundary_sheet(wb, bmap, cells=12)
+        heatmap = [row[1:] for row in ws.iter_rows(min_row=4, max_row=15)]
+        never = [c for row in heatmap for c in row if c.value == "never"]
+        numbers = [c for row in heatmap for c in row if isinstance(c.value, (int, float))]
+        self.assertTrue(never and numbers)
+        self.assertEqual(len(never) + len(numbers), 12 * 12)
+        for cell in never:
+            self.assertIsNone(cell.fill.fill_type)
+        for cell in numbers:
+            self.assertIsNotNone(cell.fill.fill_type)
+
+    def test_cash_breakeven_month(self):
+        self.check_map('cash_breakeven_month', 9)
+
+    def test_payback_month(self):
+        self.check_map('payback_month', 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Microsimulation Mean Tests
+Checks that the mean simulated revenue per market matches the deterministic
+ProjectionFrame totals, with the v2 defaults and with an explicit LTV
+override on one market.
+
+Usage:
+  python3 test_microsimulation.py
+  python3 -m unittest test_microsimulation -v
+"""
+
+import unittest
+
+from microsimulation import run_microsimulation
+from projection_engine import resolve_assumptions
+from projection_frame import ProjectionFrame
+
+REPLICATIONS = 20_000
+TOLERANCE = 0.01  # the mean of 20,000 replications is within ~0.2% here
+
+
+class MeanMatchesModelTest(unittest.TestCase):
+
+    def check_means(self, assumptions):
+        general, ramps, markets = resolve_assumptions(assumptions)
+        expected = ProjectionFrame.compute(general, ramps, markets).totals()['revenue']
+        result = run_microsimulation(assumptions, replications=REPLICATIONS)
+        for market, total in zip(result['markets'], expected):
+            with self.subTest(market=market['market']):
+                mean = sum(market['monthly_revenue']['mean'])
+                self.assertAlmostEqual(mean / total, 1, delta=TOLERANCE)
+
+    def test_defaults(self):
+        self.check_means(None)
+
+    def test_ltv_override(self):
+        self.check_means({'markets': [{'name': 'Tucson', 'ltv': 20000}, {'name': 'Denver'}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Projection Service Tests
+Starts projection_service.py on an ephemeral localhost port and checks the
+/health, /project and /batch envelopes, including per-scenario errors.
+
+Usage:
+  python3 test_projection_service.py
+  python3 -m unittest test_projection_service -v
+"""
+
+import asyncio
+import http.client
+import json
+import threading
+import unittest
+
+from projection_engine import project
+from projection_service import ProjectionService
+
+
+class ProjectionServiceTest(unittest.TestCase):
+    """One service (2 workers, inline_max=2 so batches hit the pool) for all tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        cls.service = ProjectionService(workers=2, inline_max=2, chunk_size=2)
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(cls.loop)
+            cls.loop.run_until_complete(cls.service.start('127.0.0.1', 0))
+            ready.set()
+            cls.loop.run_forever()
+
+        cls.thread = threading.Thread(target=run, daemon=True)
+        cls.thread.start()
+        if not ready.wait(60):
+            raise RuntimeError("projection service did not start")
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.service.close(), cls.loop).result(60)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(10)
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection('127.0.0.1', self.service.port, timeout=60)
+        try:
+            data = body if isinstance(body, (bytes, type(None))) else json.dumps(body)
+            conn.request(method, path, body=data)
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------
+    # Envelopes
+    # ------------------------------------------------------------
+    def test_health(self):
+        status, payload = self.request('GET', '/health')
+        self.assertEqual(status, 200)
+        self.assertTrue(payload['success'])
+        self.assertEqual(payload['data'], {'status': 'ok', 'workers': 2})
+        self.assertIn('timestamp', payload['meta'])
+
+    def test_project_matches_engine(self):
+        assumptions = {'general': {'closing_rate': 0.6}}
+        status, payload = self.request('POST', '/project', assumptions)
+        self.assertEqual(status, 200)
+        self.assertTrue(payload['success'])
+        self.assertEqual(payload['data'], json.loads(json.dumps(project(assumptions))))
+
+    def test_project_defaults_without_body(self):
+        status, payload = self.request('POST', '/project')
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['data']['summary'], project(None)['summary'])
+
+    def test_project_invalid_input(self):
+        for body in ({'markets': ['Tucson']}, {'markets': [{'name': 'Nowhere'}]},
+                     {'general': 3}, {'ramps': {'Q1': {'ads': 1}}}, [1, 2]):
+            with self.subTest(body=body):
+                status, payload = self.request('POST', '/project', body)
+                self.assertEqual(status, 400)
+                self.assertFalse(payload['success'])
+                self.assertIsNone(payload['data'])
+                self.assertEqual(payload['error']['code'], 'VAL_INVALID_INPUT')
+
+    def test_invalid_json(self):
+        status, payload = self.request('POST', '/project', b'{not json')
+        self.assertEqual(status, 400)
+        self.assertEqual(payload['error']['code'], 'VAL_INVALID_INPUT')
+
+    def test_invalid_content_length(self):
+        for value in ('abc', '-1', '12abc'):
+            with self.subTest(value=value):
+                conn = http.client.HTTPConnection('127.0.0.1', self.service.port, timeout=60)
+                try:
+                    conn.putrequest('POST', '/project')
+                    conn.putheader('Content-Length', value)
+                    conn.endheaders()
+                    response = conn.getresponse()
+                    status, payload = response.status, json.loads(response.read())
+                finally:
+                    conn.close()
+                self.assertEqual(status, 400)
+                self.assertEqual(payload['error'], {'code': 'VAL_INVALID_INPUT',
+                                                    'message': 'Invalid Content-Length'})
+
+    def test_routes_and_methods(self):
+        status, payload = self.request('GET', '/project')
+        self.assertEqual((status, payload['error']['code']), (405, 'VAL_INVALID_INPUT'))
+        status, payload = self.request('GET', '/nope')
+        self.assertEqual((status, payload['error']['code']), (404, 'RES_NOT_FOUND'))
+
+    # ------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------
+    def check_batch(self, scenarios):
+        status, payload = self.request('POST', '/batch', {'scenarios': scenarios})
+        self.assertEqual(status, 200)
+        self.assertTrue(payload['success'])
+        results = payload['data']['results']
+        self.assertEqual(len(results), len(scenarios))
+        return results
+
+    def test_batch_inline_and_pooled(self):
+        for count in (2, 7):   # at and above inline_max
+            scenarios = [{'general': {'closing_rate': 0.4 + 0.02 * i}} for i in range(count)]
+            with self.subTest(count=count):
+                results = self.check_batch(scenarios)
+                for s, r in zip(scenarios, results):
+                    self.assertEqual(r['summary'], project(s)['summary'])
+
+    def test_batch_errors_are_per_scenario(self):
+        scenarios = [{}, {'markets': ['Tucson']}, {'general': {'closing_rate': 0.6}},
+                     {'markets': [{'name': 'Nowhere'}]}, {}, {}]
+        results = self.check_batch(scenarios)
+        for i in (1, 3):
+            self.assertEqual(results[i]['error']['code'], 'VAL_INVALID_INPUT')
+        for i in (0, 2, 4, 5):
+            self.assertIn('summary', results[i])
+
+    def test_batch_needs_scenarios_list(self):
+        status, payload = self.request('POST', '/batch', {'scenarios': 3})
+        self.assertEqual(status, 400)
+        self.assertEqual(payload['error']['code'], 'VAL_INVALID_INPUT')
+
+    def test_keep_alive(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.service.port, timeout=60)
+        try:
+            for _ in range(3):
+                conn.request('POST', '/project', body='{}')
+                response = conn.getresponse()
+                self.assertEqual(response.status, 200)
+                self.assertTrue(json.loads(response.read())['success'])
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Scenario Query Tests
+Runs a small scenario grid whose payback columns are NaN where payback is
+never reached, builds its indexes, and checks select() / count() / top()
+against a brute-force pass over the stored columns.
+
+Usage:
+  python3 test_scenario_query.py
+  python3 -m unittest test_scenario_query -v
+"""
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from scenario_grid import run_grid
+from scenario_query import ScenarioIndex, build_indexes, _compare
+
+# Low closing rates and high CPLs never pay back: NaN payback rows
+GRID_SPEC = {
+    'axes': [
+        {'target': 'general.closing_rate', 'range': [0.02, 0.60, 30]},
+        {'target': '*.cpl', 'range': [200, 3000, 30]},
+        {'target': 'tucson.max_gbp', 'values': [20, 30, 40, 50]},
+    ],
+    'cash_flow': True,
+}
+COLUMNS = ('payback_month', 'cash_breakeven_month', 'total_revenue', 'roi')
+OPS = ('>=', '<=', '>', '<', '==')
+
+
+class ScenarioQueryTest(unittest.TestCase):
+    """One grid and index (bins=8 so edge bins and whole bins both occur) for all tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        run_grid(GRID_SPEC, cls.tmp.name, chunk_size=1000, log=lambda message: None)
+        build_indexes(cls.tmp.name, columns=list(COLUMNS), bins=8, log=lambda message: None)
+        cls.index = ScenarioIndex(cls.tmp.name)
+        cls.values = {c: np.asarray(cls.index.columns[c]) for c in COLUMNS}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def brute(self, preds):
+        keep = np.ones(self.index.n, dtype=bool)
+        for name, op, value in preds:
+            keep &= _compare(self.values[name], op, value)
+        return np.flatnonzero(keep)
+
+    def random_predicate(self, rng, column):
+        values = self.values[column]
+        finite = values[~np.isnan(values)]
+        value = rng.choice(finite) if rng.random() < 0.7 else rng.uniform(finite.min(), finite.max())
+        return column, OPS[rng.integers(len(OPS))], float(value)
+
+    def test_grid_has_nan_paybacks(self):
+        for c in ('payback_month', 'cash_breakeven_month'):
+            nan = np.isnan(self.values[c]).sum()
+            self.assertTrue(0 < nan < self.index.n, c)
+
+    # ------------------------------------------------------------
+    # select() / count()
+    # ------------------------------------------------------------
+    def test_select_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        for _ in range(400):
+            preds = [self.random_predicate(rng, COLUMNS[rng.integers(len(COLUMNS))])
+                     for _ in range(rng.integers(1, 3))]
+            with self.subTest(preds=preds):
+                np.testing.assert_array_equal(self.index.select(preds), self.brute(preds))
+
+    def test_payback_bounds_exclude_never(self):
+        for c in ('payback_month', 'cash_breakeven_month'):
+            finite = int((~np.isnan(self.values[c])).sum())
+            self.assertEqual(self.index.count([(c, '>=', 0)]), finite)
+            self.assertEqual(self.index.count([(c, '>', -1e300)]), finite)
+            self.assertEqual(self.index.count([(c, '<', 1e999)]), finite)
+
+    def test_axis_and_metric_predicates(self):
+        preds = ['tucson.max_gbp>=30', 'payback_month>3']
+        expected = self.brute([('payback_month', '>', 3)])
+        max_gbp = self.index.grid.decode(expected)[2]
+        expected = expected[self.index.grid.axes[2].table[max_gbp] >= 30]
+        np.testing.assert_array_equal(self.index.select(preds), expected)
+
+    # ------------------------------------------------------------
+    # top()
+    # ------------------------------------------------------------
+    def check_top(self, column, k, where=(), descending=True):
+        rows = self.index.top(column, k, where, descending)
+        values = self.values[column]
+        candidates = self.brute(where)
+        candidates = candidates[~np.isnan(values[candidates])]
+        best = np.sort(values[candidates])
+        best = best[::-1][:k] if descending else best[:k]
+        self.assertFalse(np.isnan(values[rows]).any())
+        np.testing.assert_array_equal(values[rows], best)
+
+    def test_top_skips_nan(self):
+        for column in ('payback_month', 'cash_breakeven_month', 'total_revenue'):
+            for descending in (True, False):
+                with self.subTest(column=column, descending=descending):
+                    self.check_top(column, 25, descending=descending)
+                    self.check_top(column, self.index.n, descending=descending)
+
+    def test_top_k_zero_or_negative(self):
+        for k in (0, -1, -5):
+            for where in ((), [('roi', '>', 0)]):
+                with self.subTest(k=k, where=where):
+                    rows = self.index.top('total_revenue', k, where)
+                    self.assertEqual(len(rows), 0)
+                    self.assertEqual(rows.dtype, np.int64)
+
+    def test_top_with_filters(self):
+        for where, k in (([('roi', '>', 0)], 10), ([('roi', '>', 0)], 5000),
+                         ([('total_revenue', '>=', 0)], 40)):
+            for descending in (True, False):
+                with self.subTest(where=where, k=k, descending=descending):
+                    self.check_top('payback_month', k, where, descending)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Uncertainty Engine
+Probability of reaching the $300k/month Q6 goal, and the P10/P50/P90 spread
+of Q6 monthly and 18-month revenue, when the tucson/denver inputs are
+uncertain.
+
+Sampling is randomized quasi-Monte Carlo: R independent randomizations
+(replicates) of a low-discrepancy sequence are advanced in rounds, and the
+spread between replicate estimates gives the confidence intervals. Sampling
+stops as soon as every interval is tight enough; rounds are small (16 × 64
+points) so a faster sampler stops correspondingly sooner.
+
+  samplers         random | lhs | halton | sobol (sobol needs scipy)
+                   halton (the default) is digit-scrambled. With the default
+                   tolerances, 20 seeds average about 9k evaluations for
+                   halton, 14k for lhs and 42k for random, all within the
+                   tolerances of a 1.9M-evaluation reference
+  --antithetic     evaluate u and 1 - u together
+  --control-variate  linearize the deterministic model around the mean
+                   inputs (same formulas as calculate_quarter()). The inputs
+                   are independent, so the linear model's whole distribution
+                   is known (its terms convolved on a fine grid): its mean,
+                   P(goal) and percentiles correct the mean, the goal
+                   probability and P10/P50/P90 estimates, which are what the
+                   stopping rule checks, so fewer evaluations reach the
+                   same intervals
+
+Each replicate keeps running sums (goal hits, means, control-variate cross
+products) and a quantile_sketch.SketchSet per market and metric instead of
+its samples, so memory stays flat however many evaluations a run takes.
+P10/P50/P90 and their intervals come from the replicate sketches; at the end
+the replicates merge into one P5-P95 summary per column ('quantiles'), each
+with the sketch's 99% rank error bound.
+
+Usage:
+  python3 uncertainty.py --antithetic --control-variate
+  python3 uncertainty.py --prob-tol 0.002 --pct-rtol 0.002 --json
+"""
+
+import argparse
+import json
+import math
+
+import numpy as np
+
+from projection_engine import resolve_assumptions, goal_monthly
+from quantile_sketch import SketchSet, SUMMARY_PERCENTILES
+from vector_engine import (scenario_inputs, summary_columns, slug, parse_target, ALL_MARKETS,
+                           MARKET_SUMMARY_METRICS, PAYBACK_METRICS)
+
+SAMPLERS = ('random', 'lhs', 'halton', 'sobol')
+PERCENTILES = (10, 50, 90)
+REPORT_METRICS = ('q6_monthly', 'total_revenue')
+SKETCH_METRICS = REPORT_METRICS + ('total_investment', 'roi')
+SKETCH_K = 1000   # rank error ~0.1-0.3% per replicate, well inside --pct-rtol
+CONTROL_ATOMS = 1 << 14   # inverse-CDF points per input for the control distribution
+CONTROL_BINS = 1 << 18    # grid cells the control distribution is convolved on
+
+# Relative (low, mode, high) multipliers applied to each market's own value
+MARKET_UNCERTAINTY = {
+    'max_web': (0.50, 1.00, 1.20),
+    'max_ppc': (0.80, 1.00, 1.10),
+    'max_gbp': (0.60, 1.00, 1.20),
+    'cpl': (0.85, 1.00, 1.20),       # plumbing keywords -15% .. CPL +20%
+    'mit_avg': (0.85, 1.00, 1.10),
+}
+
+# Two-sided 95% Student-t critical values by replicate count
+T_CRIT = {4: 3.182, 8: 2.365, 10: 2.262, 16: 2.131, 20: 2.093, 32: 2.040, 64: 1.998}
+
+
+# ============================================================
+# UNCERTAIN INPUTS
+# ============================================================
+def default_uncertainty(market_list=None):
+    """Triangular distributions around the v2 general and per-market inputs"""
+    if market_list is None:
+        market_list = resolve_assumptions()[2]
+    specs = [
+        {'target': 'general.closing_rate', 'dist': 'triangular', 'low': 0.40, 'mode': 0.50, 'high': 0.60},
+        {'target': 'general.qualified_rate', 'dist': 'triangular', 'low': 0.40, 'mode': 0.50, 'high': 0.60},
+    ]
+    for m in market_list:
+        for field, (low, mode, high) in MARKET_UNCERTAINTY.items():
+            if field in m:
+                specs.append({'target': f"{slug(m['name'])}.{field}", 'dist': 'triangular',
+                              'low': low, 'mode': mode, 'high': high, 'relative': True})
+    return specs
+
+
+def _norm_ppf(u):
+    """Inverse standard normal CDF (Acklam's rational approximation, ~1e-9)"""
+    a = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+         1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+    b = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+         6.680131188771972e+01, -1.328068155288572e+01)
+    c = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+         -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+    d = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+         3.754408661907416e+00)
+    u = np.clip(np.asarray(u, dtype=float), 1e-12, 1 - 1e-12)
+    out = np.empty_like(u)
+    lo, hi = u < 0.02425, u > 1 - 0.02425
+    mid = ~(lo | hi)
+
+    q = u[mid] - 0.5
+    r = q * q
+    out[mid] = ((((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q /
+                (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1))
+    for mask, sign, p in ((lo, 1, u[lo]), (hi, -1, 1 - u[hi])):
+        q = np.sqrt(-2 * np.log(p))
+        out[mask] = sign * ((((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) /
+                            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1))
+    return out
+
+
+class UncertainInput:
+    """One uncertain target with an inverse-CDF transform from [0, 1)"""
+
+    def __init__(self, spec, base_value):
+        self.target = spec['target']
+        self.dist = spec.get('dist', 'triangular')
+        scale = base_value if spec.get('relative') else 1.0
+        if self.dist == 'triangular':
+            self.low, self.mode, self.high = (spec['low'] * scale, spec['mode'] * scale,
+                                              spec['high'] * scale)
+            if not self.low <= self.mode <= self.high or self.low == self.high:
+                raise ValueError(f"{self.target}: need low <= mode <= high and low < high")
+            self.mean = (self.low + self.mode + self.high) / 3
+        elif self.dist == 'uniform':
+            self.low, self.high = spec['low'] * scale, spec['high'] * scale
+            self.mean = (self.low + self.high) / 2
+        elif self.dist == 'normal':
+            self.mu, self.sd = spec['mean'] * scale, spec['sd'] * scale
+            self.mean = self.mu
+        else:
+            raise ValueError(f"{self.target}: unknown distribution {self.dist!r}")
+
+    def transform(self, u):
+        if self.dist == 'uniform':
+            return self.low + (self.high - self.low) * u
+        if self.dist == 'normal':
+            return np.maximum(self.mu + self.sd * _norm_ppf(u), 0.0)
+        a, c, b = self.low, self.mode, self.high
+        split = (c - a) / (b - a)
+        return np.where(u < split,
+                        a + np.sqrt(u * (b - a) * (c - a)),
+                        b - np.sqrt((1 - u) * (b - a) * (b - c)))
+
+
+def _base_value(spec, general, market_list):
+    """The value a relative distribution is scaled from (1.0 when absolute)"""
+    if not spec.get('relative'):
+        return 1.0
+    scope, field = parse_target(spec['target'])
+    if field in general:
+        return general[field]
+    values = {m.get(field) for m in market_list
+              if scope in ALL_MARKETS or slug(m['name']) == scope}
+    if len(values) != 1 or None in values:
+        raise ValueError(f"{spec['target']}: a relative distribution needs a single "
+                         f"base value; target one market at a time")
+    return values.pop()
+
+
+# ============================================================
+# SAMPLERS
+# ============================================================
+def _first_primes(count):
+    primes, k = [], 2
+    while len(primes) < count:
+        if all(k % p for p in primes if p * p <= k):
+            primes.append(k)
+        k += 1
+    return primes
+
+
+class ReplicateSampler:
+    """
+    One randomized point stream in [0, 1)^d. next(m) continues the stream,
+    so QMC replicates keep their low-discrepancy structure across rounds.
+    """
+
+    def __init__(self, kind, dim, rng):
+        self.kind, self.dim, self.rng = kind, dim, rng
+        self.index = 0
+        if kind == 'halton':
+            # One random digit permutation per prime base and digit position,
+            # down to double precision
+            self.primes = _first_primes(dim)
+            self.perms = [rng.permuted(np.tile(np.arange(base), (math.ceil(53 / math.log2(base)), 1)),
+                                       axis=1) for base in self.primes]
+        elif kind == 'sobol':
+            try:
+                from scipy.stats import qmc
+            except ImportError:
+                raise ImportError("sampler 'sobol' needs scipy (pip install scipy); "
+                                  "use --sampler halton otherwise")
+            self.engine = qmc.Sobol(dim, scramble=True, seed=rng)
+        elif kind not in ('random', 'lhs'):
+            raise ValueError(f"unknown sampler {kind!r}; choose from {', '.join(SAMPLERS)}")
+
+    def next(self, m):
+        if self.kind == 'random':
+            return self.rng.random((m, self.dim))
+        if self.kind == 'lhs':
+            strata = np.argsort(self.rng.random((self.dim, m)), axis=1).T
+            return (strata + self.rng.random((m, self.dim))) / m
+        if self.kind == 'sobol':
+            return self.engine.random(m)
+
+        # Halton radical inverse with randomly permuted digits. Unlike a
+        # shift, scrambling breaks up the correlated high-base dimensions.
+        idx = np.arange(self.index, self.index + m, dtype=np.int64)
+        self.index += m
+        points = np.zeros((m, self.dim))
+        for j, (base, perm) in enumerate(zip(self.primes, self.perms)):
+            i, f = idx.copy(), 1.0 / base
+            for digits in perm:
+                points[:, j] += f * digits[i % base]
+                i //= base
+                f /= base
+        return points
+
+
+# ============================================================
+# ESTIMATION
+# ============================================================
+class UncertaintyModel:
+    """Maps unit-cube samples to engine inputs and headline metrics"""
+
+    def __init__(self, specs=None, assumptions=None):
+        self.general, self.ramps, self.markets = resolve_assumptions(assumptions)
+        specs = specs if specs is not None else default_uncertainty(self.markets)
+        self.inputs = [UncertainInput(s, _base_value(s, self.general, self.markets))
+                       for s in specs]
+        self.dim = len(self.inputs)
+        self.mean_x = np.array([x.mean for x in self.inputs])
+        self.sketch_columns = list(SKETCH_METRICS) + [
+            f"{slug(m['name'])}_{c}" for m in self.markets
+            for c in MARKET_SUMMARY_METRICS if c not in PAYBACK_METRICS]
+
+    def values(self, u):
+        """(n, d) unit samples -> (n, d) input values"""
+        return np.column_stack([x.transform(u[:, j]) for j, x in enumerate(self.inputs)])
+
+    def metrics_at(self, x):
+        """(n, d) input values -> {metric: (n,)}"""
+        overrides = [(inp.target, x[:, j]) for j, inp in enumerate(self.inputs)]
+        return summary_columns(scenario_inputs(self.markets, self.general, self.ramps, overrides),
+                               len(x))
+
+    def linearization(self):
+        """f(mean) and the Jacobian at the mean inputs (central differences)"""
+        h = np.maximum(np.abs(self.mean_x) * 1e-4, 1e-6)
+        points = np.vstack([self.mean_x, self.mean_x + np.diag(h), self.mean_x - np.diag(h)])
+        out = self.metrics_at(points)
+        center, jac = {}, {}
+        for metric in REPORT_METRICS:
+            v = out[metric]
+            center[metric] = v[0]
+            jac[metric] = (v[1:1 + self.dim] - v[1 + self.dim:]) / (2 * h)
+        return center, jac
+
+
+def _sum_distribution(offset, terms, bins=CONTROL_BINS):
+    """
+    (values, cdf) of offset + the sum of independent terms, each given as
+    equally weighted atoms. Every term is spread onto a common grid (mass split
+    between the two nearest cells, which keeps its mean) and the terms are
+    convolved in one FFT product.
+    """
+    lows = [t.min() for t in terms]
+    span = sum(t.max() - t.min() for t in terms)
+    if span <= 0:
+        return np.array([offset + sum(lows)]), np.array([1.0])
+    width = span / bins
+    size = bins + 2 * len(terms) + 1
+    n_fft = 1 << (size - 1).bit_length()
+    spectrum = np.ones(n_fft // 2 + 1, dtype=complex)
+    for t, low in zip(terms, lows):
+        pos = (t - low) / width
+        i = np.floor(pos).astype(np.int64)
+        frac = pos - i
+        hist = (np.bincount(i, weights=1 - frac, minlength=i.max() + 2)
+                + np.bincount(i + 1, weights=frac, minlength=i.max() + 2))
+        spectrum *= np.fft.rfft(hist / len(t), n_fft)
+    pmf = np.clip(np.fft.irfft(spectrum, n_fft)[:size], 0.0, None)
+    return offset + sum(lows) + width * np.arange(size), np.cumsum(pmf / pmf.sum())
+
+
+class LinearControl:
+    """The linearized model as a control variate, with its distribution known"""
+
+    def __init__(self, model):
+        self.mean_x = model.mean_x
+        self.center, self.jac = model.linearization()
+        u = (np.arange(CONTROL_ATOMS) + 0.5) / CONTROL_ATOMS
+        self.distribution = {
+            m: _sum_distribution(self.center[m], [self.jac[m][j] * (x.transform(u) - x.mean)
+                                                  for j, x in enumerate(model.inputs)])
+            for m in REPORT_METRICS}
+
+    def values(self, x):
+        """{metric: (n,)} control values at (n, d) input values"""
+        return {m: self.center[m] + (x - self.mean_x) @ self.jac[m] for m in REPORT_METRICS}
+
+    def prob_at_least(self, metric, y):
+        values, cdf = self.distribution[metric]
+        return 1.0 - float(np.interp(y, values, cdf, left=0.0, right=1.0))
+
+    def quantiles(self, metric, qs):
+        values, cdf = self.distribution[metric]
+        return np.interp(qs, cdf, values)
+
+
+class ReplicateStats:
+    """Running sums and sketches for one replicate stream (no samples kept)"""
+
+    def __init__(self, columns, center, seed, control=False):
+        self.n = 0
+        self.hits = 0            # f >= goal
+        self.control_hits = 0    # g >= goal
+        self.both_hits = 0
+        self.center = center   # sums are taken around this to keep them well-conditioned
+        self.sums = {m: np.zeros(4) for m in REPORT_METRICS}   # f, g, f·g, g²
+        rng = np.random.default_rng(seed)
+        self.sketches = SketchSet(SKETCH_K, rng, columns)
+        self.controls = SketchSet(SKETCH_K, rng, REPORT_METRICS) if control else None
+
+    def update(self, out, goal, controls=None):
+        self.n += len(out['q6_monthly'])
+        hit = out['q6_monthly'] >= goal
+        self.hits += int(np.count_nonzero(hit))
+        if controls is not None:
+            control_hit = controls['q6_monthly'] >= goal
+            self.control_hits += int(np.count_nonzero(control_hit))
+            self.both_hits += int(np.count_nonzero(hit & control_hit))
+            self.controls.update(controls)
+        for m in REPORT_METRICS:
+            f = np.asarray(out[m]) - self.center[m]
+            g = controls[m] - self.center[m] if controls is not None else np.zeros_like(f)
+            self.sums[m] += (f.sum(), g.sum(), f @ g, g @ g)
+        self.sketches.update(out, self.sketches.sketches)
+
+
+def _halfwidth(estimates):
+    r = len(estimates)
+    t = T_CRIT.get(r, 1.96)
+    return t * np.std(estimates, ddof=1) / math.sqrt(r) if r > 1 else math.inf
+
+
+def run_uncertainty(sampler='halton', antithetic=False, control_variate=False,
+                    replicates=16, batch=64, prob_tol=0.005, pct_rtol=0.005,
+                    max_evals=2_000_000, goal=goal_monthly, seed=0, specs=None,
+                    assumptions=None, log=None):
+    """
+    Adaptive randomized-QMC estimate. Returns a dict with the goal probability,
+    mean and P10/P50/P90 of each REPORT_METRICS entry, their 95% half-widths,
+    the number of model evaluations, whether the tolerances were met, and
+    merged P5-P95 'quantiles' for every sketched column.
+    """
+    model = UncertaintyModel(specs, assumptions)
+    root = np.random.default_rng(seed)
+    streams = [ReplicateSampler(sampler, model.dim, np.random.default_rng(s))
+               for s in root.integers(0, 2 ** 63 - 1, size=replicates)]
+    control = LinearControl(model) if control_variate else None
+    center = control.center if control else {m: 0.0 for m in REPORT_METRICS}
+    stats = [ReplicateStats(model.sketch_columns, center, s, control is not None)
+             for s in root.integers(0, 2 ** 63 - 1, size=replicates)]
+    evals, rounds, result = 0, 0, None
+
+    while True:
+        rounds += 1
+        for stream, rep in zip(streams, stats):
+            u = stream.next(batch)
+            if antithetic:
+                u = np.vstack([u, 1.0 - u])
+            x = model.values(u)
+            out = model.metrics_at(x)
+            evals += len(u)
+            rep.update(out, goal, control.values(x) if control else None)
+
+        result = _estimate(stats, control, goal)
+        converged = (result['goal_probability_ci'] <= prob_tol and all(
+            result[m][f'{k}_ci'] <= pct_rtol * max(abs(result[m][k]), 1.0)
+            for m in REPORT_METRICS for k in ('mean',) + tuple(f'p{p}' for p in PERCENTILES)))
+        if log:
+            log(f"  round {rounds}: {evals:,} evals, P(goal) = {result['goal_probability']:.4f} "
+                f"± {result['goal_probability_ci']:.4f}")
+        if converged or evals >= max_evals:
+            break
+
+    result.update({'evaluations': evals, 'rounds': rounds, 'converged': converged,
+                   'sampler': sampler, 'antithetic': antithetic,
+                   'control_variate': control_variate, 'replicates': replicates,
+                   'inputs': [x.target for x in model.inputs],
+                   'quantiles': SketchSet.merged(rep.sketches for rep in stats).summary()})
+    return result
+
+
+def _cv_beta(f, g):
+    """Regression coefficient of f on g (0 when g does not vary)"""
+    var_g = np.var(g)
+    return float(np.mean((f - f.mean()) * (g - g.mean())) / var_g) if var_g > 0 else 0.0
+
+
+def _estimate(stats, control, goal):
+    """Combine replicate streams into point estimates and 95% half-widths"""
+    n = np.array([rep.n for rep in stats], dtype=float)
+    probs = np.array([rep.hits for rep in stats]) / n
+    if control is not None:
+        # Pooled CV coefficient of the goal indicator on the control's indicator,
+        # whose probability the control distribution gives exactly
+        pf, ph, pfh = (sum(getattr(rep, a) for rep in stats) / n.sum()
+                       for a in ('hits', 'control_hits', 'both_hits'))
+        var_h = ph - ph * ph
+        beta = (pfh - pf * ph) / var_h if var_h > 0 else 0.0
+        control_probs = np.array([rep.control_hits for rep in stats]) / n
+        probs = probs - beta * (control_probs - control.prob_at_least('q6_monthly', goal))
+    result = {'goal': goal,
+              'goal_probability': float(probs.mean()),
+              'goal_probability_ci': float(_halfwidth(probs))}
+
+    for m in REPORT_METRICS:
+        sums = np.array([rep.sums[m] for rep in stats])
+        means = sums[:, 0] / n
+        if control is not None:
+            # Pooled CV coefficient, then a CV-adjusted mean per replicate
+            sf, sg, sfg, sgg = sums.sum(axis=0) / n.sum()
+            var_g = sgg - sg * sg
+            beta = (sfg - sf * sg) / var_g if var_g > 0 else 0.0
+            means = means - beta * sums[:, 1] / n
+        means = means + stats[0].center[m]
+        entry = {'mean': float(means.mean()), 'mean_ci': float(_halfwidth(means))}
+        qs = np.array(PERCENTILES) / 100
+        pct = np.array([rep.sketches[m].quantiles(qs) for rep in stats])
+        if control is not None:
+            # Each replicate's control percentiles against the known ones,
+            # weighted by the replicate-level regression coefficient
+            control_pct = np.array([rep.controls[m].quantiles(qs) for rep in stats])
+            pct = pct - (np.array([_cv_beta(pct[:, k], control_pct[:, k])
+                                   for k in range(len(qs))])
+                         * (control_pct - control.quantiles(m, qs)))
+        for k, p in enumerate(PERCENTILES):
+            entry[f'p{p}'] = float(pct[:, k].mean())
+            entry[f'p{p}_ci'] = float(_halfwidth(pct[:, k]))
+        result[m] = entry
+    return result
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Goal probability under input uncertainty")
+    parser.add_argument('--sampler', choices=SAMPLERS, default='halton')
+    parser.add_argument('--antithetic', action='store_true')
+    parser.add_argument('--control-variate', action='store_true')
+    parser.add_argument('--replicates', type=int, default=16)
+    parser.add_argument('--batch', type=int, default=64, help="points per replicate per round")
+    parser.add_argument('--prob-tol', type=float, default=0.005,
+                        help="95%% half-width target for the goal probability")
+    parser.add_argument('--pct-rtol', type=float, default=0.005,
+                        help="relative 95%% half-width target for P10/P50/P90")
+    parser.add_argument('--max-evals', type=int, default=2_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    result = run_uncertainty(args.sampler, args.antithetic, args.control_variate,
+                             args.replicates, args.batch, args.prob_tol, args.pct_rtol,
+                             args.max_evals, seed=args.seed,
+                             log=None if args.json else print)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print()
+    print(f"  P(Q6 monthly >= ${result['goal']:,.0f}): {result['goal_probability']:.1%} "
+          f"± {result['goal_probability_ci']:.1%}")
+    for m in REPORT_METRICS:
+        e = result[m]
+        print(f"  {m:15s} mean ${e['mean']:>11,.0f}  P10 ${e['p10']:>11,.0f}  "
+              f"P50 ${e['p50']:>11,.0f}  P90 ${e['p90']:>11,.0f}")
+    print()
+    print(f"  {'':24s}" + "".join(f"{'P' + str(p):>12s}" for p in SUMMARY_PERCENTILES) + "   ±rank")
+    for column, q in result['quantiles'].items():
+        print(f"  {column:24s}" + "".join(f"{q[f'p{p}']:12,.2f}" if column.endswith('roi')
+                                          else f"{q[f'p{p}']:12,.0f}" for p in SUMMARY_PERCENTILES)
+              + f"   {q['rank_error']:.2%}")
+    status = '✅ converged' if result['converged'] else '⚠️  stopped at --max-evals'
+    print(f"  {result['evaluations']:,} evaluations in {result['rounds']} rounds ({status})")
+
+
+if __name__ == '__main__':
+    main()
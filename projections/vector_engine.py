@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Vectorized Projection Engine
+Same formulas as projection_engine.calculate_quarter(), evaluated with numpy
+over whole batches of scenarios at once and at monthly grain.
+
+Every input may be a scalar or an array with one entry per scenario; ramps
+are (months,) or (scenarios, months). Outputs are unrounded float arrays of
+shape (scenarios, months) so callers can sum, slice or roll up to quarters
+without per-row Python work. Rounding for client-facing tables stays in the
+scalar engine and the workbook writers.
+
+Payback comes from the same monthly arrays: cumulative revenue against
+cumulative spend (ad spend + management fee, the ROI cost base), one cumsum
+per scenario batch, so the sweep runners carry it on every row:
+
+  payback month              first month cumulative revenue >= cumulative spend
+  run-rate breakeven month   first month whose revenue covers that month's spend
+  cumulative ROI             cumulative revenue / cumulative spend, per month
+
+Months count from 1; NaN means not within the projection horizon.
+"""
+
+import numpy as np
+
+from projection_engine import general, ramps, markets, market_ltv, goal_monthly
+
+MONTHS_PER_QUARTER = 3
+RAMP_CHANNELS = ('ads', 'gbp', 'web')
+
+MONTHLY_METRICS = (
+    'web_leads', 'ppc_leads', 'gbp_leads', 'total_leads',
+    'ad_spend', 'mgmt_fee', 'total_cost', 'jobs', 'revenue',
+)
+
+PAYBACK_METRICS = ('payback_month', 'run_rate_breakeven_month')
+SUMMARY_METRICS = ('q6_monthly', 'total_revenue', 'total_investment', 'roi', 'goal_gap') + PAYBACK_METRICS
+MARKET_SUMMARY_METRICS = ('q6_monthly', 'total_revenue', 'total_investment') + PAYBACK_METRICS
+
+LTV_FIELDS = ('mit_avg', 'abate_avg', 'abate_conv', 'recon_avg', 'recon_conv', 'recon_fee')
+ALL_MARKETS = ('*', 'general')
+
+
+# ============================================================
+# INPUTS
+# ============================================================
+def monthly_ramp(quarterly_values):
+    """Expand per-quarter ramp values (..., quarters) to (..., months)"""
+    return np.repeat(np.asarray(quarterly_values, dtype=float), MONTHS_PER_QUARTER, axis=-1)
+
+
+def ramp_arrays(ramp_schedule=ramps):
+    """{'ads': (months,), 'gbp': ..., 'web': ...} from a Q1..Qn ramp dict"""
+    return {ch: monthly_ramp([r[ch] for r in ramp_schedule.values()])
+            for ch in RAMP_CHANNELS}
+
+
+def market_ramp_arrays(market, ramp_schedule=ramps):
+    """{'ads': (months,), ...} for one market: its compiled ramp_curves, else the shared ramps"""
+    monthly = market.get('ramp_months')
+    if not monthly:
+        return ramp_arrays(ramp_schedule)
+    return {ch: np.asarray(monthly[ch], dtype=float) for ch in RAMP_CHANNELS}
+
+
+def market_inputs(market, general=general, ramp_schedule=ramps):
+    """Flatten one market dict plus general inputs and ramps into engine inputs"""
+    inputs = {k: v for k, v in market.items() if k not in ('name', 'ramp_curves', 'ramp_months')}
+    inputs.setdefault('ltv', market_ltv(market))
+    inputs.update(general)
+    for ch, values in market_ramp_arrays(market, ramp_schedule).items():
+        inputs[f'ramp_{ch}'] = values
+    return inputs
+
+
+def default_inputs():
+    """{market name: inputs} for the v2 defaults"""
+    return {m['name']: market_inputs(m) for m in markets}
+
+
+def slug(name):
+    return str(name).strip().lower().replace(' ', '_')
+
+
+def parse_target(target):
+    """'denver.cpl' -> ('denver', 'cpl'); '*' or 'general' scope = every market"""
+    scope, _, field = str(target).partition('.')
+    if not field:
+        raise ValueError(f"target {target!r} must look like '<market>.<input>'")
+    return slug(scope), field
+
+
+def scenario_inputs(market_list, general, ramp_schedule, overrides):
+    """
+    {market name: inputs} with per-scenario overrides applied.
+    overrides: iterable of (target, values) where values is a scalar, an
+    (n,) array, or (n, months) for ramp_* fields. LTV is recalculated when a
+    job component is overridden and LTV itself is not.
+    """
+    parsed = [(parse_target(t), v) for t, v in overrides]
+    known = {slug(m['name']) for m in market_list}
+    for (scope, field), _ in parsed:
+        if scope not in ALL_MARKETS and scope not in known:
+            raise ValueError(f"unknown market {scope!r} in target for {field}")
+
+    inputs_by_market = {}
+    for market in market_list:
+        market_slug = slug(market['name'])
+        inputs = market_inputs(market, general, ramp_schedule)
+        touched = set()
+        for (scope, field), values in parsed:
+            if scope in ALL_MARKETS or scope == market_slug:
+                inputs[field] = values
+                touched.add(field)
+        if touched & set(LTV_FIELDS) and 'ltv' not in touched:
+            inputs['ltv'] = market_ltv(inputs)
+        inputs_by_market[market['name']] = inputs
+    return inputs_by_market
+
+
+def _col(value):
+    """Scalars stay scalars; per-scenario vectors become (n, 1) columns"""
+    value = np.asarray(value, dtype=float)
+    return value[:, None] if value.ndim == 1 else value
+
+
+def _ramp(value):
+    """Ramps are (months,) or already (n, months)"""
+    return np.asarray(value, dtype=float)
+
+
+# ============================================================
+# CALCULATION ENGINE
+# ============================================================
+def evaluate_market(inputs):
+    """Monthly projections for a batch of scenarios of one market"""
+    qualified_rate = _col(inputs['qualified_rate'])
+    closing_rate = _col(inputs['closing_rate'])
+
+    # Qualified leads per month (max × ramp × qualified%)
+    web_leads = _col(inputs['max_web']) * _ramp(inputs['ramp_web']) * qualified_rate
+    ppc_leads = _col(inputs['max_ppc']) * _ramp(inputs['ramp_ads']) * qualified_rate
+    gbp_leads = _col(inputs['max_gbp']) * _ramp(inputs['ramp_gbp']) * qualified_rate
+    total_leads = web_leads + ppc_leads + gbp_leads
+
+    # Costs
+    ad_spend = ppc_leads * _col(inputs['cpl'])
+    mgmt_fee = np.broadcast_to(_col(inputs['mgmt_fee_monthly']), ad_spend.shape)
+    total_cost = ad_spend + mgmt_fee
+
+    # Revenue
+    jobs = total_leads * closing_rate
+    revenue = jobs * _col(inputs['ltv'])
+
+    out = {
+        'web_leads': web_leads, 'ppc_leads': ppc_leads, 'gbp_leads': gbp_leads,
+        'total_leads': total_leads, 'ad_spend': ad_spend, 'mgmt_fee': mgmt_fee,
+        'total_cost': total_cost, 'jobs': jobs, 'revenue': revenue,
+    }
+    shape = np.broadcast_shapes(*(v.shape for v in out.values()))
+    return {k: np.broadcast_to(v, shape) for k, v in out.items()}
+
+
+def to_quarters(monthly):
+    """Sum (..., months) to (..., quarters)"""
+    monthly = np.asarray(monthly)
+    return monthly.reshape(monthly.shape[:-1] + (-1, MONTHS_PER_QUARTER)).sum(axis=-1)
+
+
+def first_month(net):
+    """1-based first month where net >= 0, NaN if none, for (..., months) series"""
+    net = np.asarray(net, dtype=float)
+    # The running maximum is sorted along each row, so the answer is a
+    # searchsorted for 0 in it; counting the entries still below 0 does that
+    # for every scenario row in one pass.
+    below = (np.maximum.accumulate(net, axis=-1) < 0).sum(axis=-1)
+    return np.where(below < net.shape[-1], below + 1.0, np.nan)
+
+
+def cumulative_roi(revenue, total_cost):
+    """Cumulative revenue / cumulative spend per month (0 until there is spend)"""
+    cum_cost = np.cumsum(total_cost, axis=-1)
+    out = np.zeros(cum_cost.shape)
+    np.divide(np.cumsum(revenue, axis=-1), cum_cost, out=out, where=cum_cost > 0)
+    return out
+
+
+def payback(revenue, total_cost):
+    """PAYBACK_METRICS for (..., months) revenue and spend series"""
+    revenue, total_cost = np.asarray(revenue, dtype=float), np.asarray(total_cost, dtype=float)
+    net = revenue - total_cost
+    return {
+        'payback_month': first_month(np.cumsum(net, axis=-1)),
+        'run_rate_breakeven_month': first_month(net),
+    }
+
+
+def summarize(market_results):
+    """
+    Scenario-level headline metrics from one or more evaluate_market() results.
+    Monthly series are summed across markets first (the Combined Summary).
+    """
+    revenue = sum(r['revenue'] for r in market_results)
+    total_cost = sum(r['total_cost'] for r in market_results)
+    q6_monthly = revenue[..., -MONTHS_PER_QUARTER:].sum(axis=-1) / MONTHS_PER_QUARTER
+    total_revenue = revenue.sum(axis=-1)
+    total_investment = total_cost.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(total_investment > 0, total_revenue / total_investment, 0.0)
+    return {
+        'q6_monthly': q6_monthly,
+        'total_revenue': total_revenue,
+        'total_investment': total_investment,
+        'roi': roi,
+        'goal_gap': q6_monthly - goal_monthly,
+        **payback(revenue, total_cost),
+    }
+
+
+def market_summary(result):
+    """Per-market headline metrics from one evaluate_market() result"""
+    revenue = result['revenue']
+    return {
+        'q6_monthly': revenue[..., -MONTHS_PER_QUARTER:].sum(axis=-1) / MONTHS_PER_QUARTER,
+        'total_revenue': revenue.sum(axis=-1),
+        'total_investment': result['total_cost'].sum(axis=-1),
+        **payback(revenue, result['total_cost']),
+    }
+
+
+def evaluate(inputs_by_market):
+    """Evaluate every market; returns (per-market monthly results, summary)"""
+    results = {name: evaluate_market(inputs) for name, inputs in inputs_by_market.items()}
+    return results, summarize(list(results.values()))
+
+
+def summary_columns(inputs_by_market, n=None, results=None):
+    """
+    Flat {column: (n,) array}: combined SUMMARY_METRICS, the combined
+    cumulative ROI at each quarter end ('cum_roi_q1', ...) and
+    '<market>_<metric>' for MARKET_SUMMARY_METRICS. Used by the sweep runners;
+    pass evaluate()'s per-market results to reuse them.
+    """
+    if results is None:
+        results, summary = evaluate(inputs_by_market)
+    else:
+        summary = summarize(list(results.values()))
+    out = dict(summary)
+    curve = cumulative_roi(sum(r['revenue'] for r in results.values()),
+                           sum(r['total_cost'] for r in results.values()))
+    for q, values in enumerate(np.moveaxis(curve[..., MONTHS_PER_QUARTER - 1::MONTHS_PER_QUARTER], -1, 0)):
+        out[f"cum_roi_q{q + 1}"] = values
+    for name, r in results.items():
+        for metric, values in market_summary(r).items():
+            out[f"{slug(name)}_{metric}"] = values
+    if n is not None:
+        out = {k: np.broadcast_to(v, (n,)) for k, v in out.items()}
+    return out
+
+
+def summary_column_names(market_list, quarters=None):
+    quarters = len(ramps) if quarters is None else quarters
+    return list(SUMMARY_METRICS) + [f"cum_roi_q{q + 1}" for q in range(quarters)] + [
+        f"{slug(m['name'])}_{c}" for m in market_list for c in MARKET_SUMMARY_METRICS]
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Watch Mode
+Keeps projection outputs current while assumption files are being edited.
+
+Watched inputs (files, or folders scanned for them), each one plan:
+  *.json  an assumption object (project() / projection_service format)
+  *.csv   an Assumptions tab saved as CSV, or the older assumptions.csv layout
+
+The watcher polls modification times (no extra dependency). A changed file
+is re-parsed alone and diffed against that plan's ProjectionGraph
+(model_graph.py): only the inputs that changed are set, so only the affected
+markets' rows recompute. Payback and cash breakeven come from monthly
+revenue, spend and collections cached per market, re-evaluated for the same
+changed markets and summed for Combined. Then, in --out-dir:
+
+  <plan>_<market>.csv    rewritten for the markets whose rows changed
+  <plan>_combined.csv    rewritten on any change
+  <plan>_summary.json    rewritten on any change (create_conservative_v2.py --json)
+  <plan>.xlsx            once the plan has been quiet for --debounce seconds,
+                         filled from a report_template.py template in a
+                         background process, so CSV/JSON never wait on it
+
+Files are written to a temporary name and renamed, so a reader never sees a
+half-written output. A file that fails to parse (often a save in progress)
+keeps its last good outputs; the error is printed and the next save retries.
+
+Usage:
+  python3 watch.py assumptions.csv --out-dir live/
+  python3 watch.py scenarios/ --out-dir live/ --interval 0.1 --debounce 5
+  python3 watch.py scenarios/ --out-dir live/ --once        # build everything and exit
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+from assumptions_sheet import read_assumptions_csv
+from cash_flow import market_cash_flow, cash_position
+from create_conservative_v2 import (market_rows, combined_rows, payback_months, summary_data,
+                                    report_rows)
+from model_graph import ProjectionGraph, resolved_graph_inputs
+from projection_engine import resolve_assumptions
+from projection_frame import ADDITIVE_METRICS
+from report_template import TemplateCache, fill
+from vector_engine import slug, market_inputs, evaluate_market, payback
+
+WATCH_SUFFIXES = ('.json', '.csv')
+DEFAULT_INTERVAL = 0.2   # seconds between polls
+DEFAULT_DEBOUNCE = 2.0   # quiet seconds before the xlsx is rebuilt
+
+
+# ============================================================
+# OUTPUTS
+# ============================================================
+def _replace(path, write):
+    """write(tmp_path), then rename over path"""
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def write_csv(path, rows):
+    def write(tmp):
+        with open(tmp, 'w', newline='') as f:
+            csv.writer(f).writerows(rows)
+    _replace(path, write)
+
+
+def write_json(path, data):
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+    _replace(path, write)
+
+
+_templates = None  # the xlsx worker's template cache
+
+
+def build_xlsx(assumptions, path):
+    """Workbook for one plan from a cached template (runs in the xlsx worker)"""
+    global _templates
+    _templates = _templates or TemplateCache()
+    t0 = time.perf_counter()
+    sheets, _ = report_rows(assumptions)
+    wb = fill(_templates.workbook(sheets, assumptions), sheets)
+    _replace(path, wb.save)
+    return path, time.perf_counter() - t0
+
+
+# ============================================================
+# PLANS
+# ============================================================
+def read_plan(path):
+    """Assumption dict from a watched file"""
+    if path.endswith('.csv'):
+        return read_assumptions_csv(path)[0]
+    with open(path) as f:
+        try:
+            assumptions = json.load(f)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path}: {exc}") from exc
+    if not isinstance(assumptions, dict):
+        raise ValueError(f"{path}: expected an assumption object")
+    return assumptions
+
+
+class WatchedPlan:
+    """One input file, its cached graph and the outputs it owns"""
+
+    def __init__(self, path, out_dir, debounce=DEFAULT_DEBOUNCE):
+        self.path = path
+        self.name = slug(os.path.splitext(os.path.basename(path))[0])
+        self.out_dir = out_dir
+        self.debounce = debounce
+        self.graph = None
+        self.assumptions = None
+        self.market_files = {}
+        self.xlsx_due = None
+        self.xlsx_job = None
+        self.monthly = None          # {'revenue', 'total_cost', 'cash_in'}: (markets, months)
+        self.market_payback = []     # payback_months() per market
+
+    def output(self, suffix):
+        return os.path.join(self.out_dir, f"{self.name}{suffix}")
+
+    def refresh(self):
+        """Re-read the file; returns (markets recomputed, paths written)"""
+        assumptions = read_plan(self.path)
+        resolved = resolve_assumptions(assumptions)
+        inputs, markets, periods = resolved_graph_inputs(*resolved)
+        if self.graph is None or markets != self.graph.markets or periods != self.graph.periods:
+            self.graph = ProjectionGraph(inputs, markets, periods)
+            self.monthly = None
+            changed = list(range(len(markets)))
+        else:
+            changed = self.graph.update(inputs).nonzero()[0].tolist()
+        self.assumptions = assumptions
+        if not changed:
+            return 0, []
+        self._update_monthly(changed, *resolved)
+        self.xlsx_due = time.monotonic() + self.debounce
+        return len(changed), self._write(changed)
+
+    def _update_monthly(self, changed, general, ramps, markets):
+        """Re-evaluate the changed markets' monthly series and payback months"""
+        if self.monthly is None:
+            shape = (len(markets), len(ramps) * 3)
+            self.monthly = {k: np.zeros(shape) for k in ('revenue', 'total_cost', 'cash_in')}
+            self.market_payback = [None] * len(markets)
+        for i in changed:
+            inputs = market_inputs(markets[i], general, ramps)
+            result = evaluate_market(inputs)
+            flow = market_cash_flow(inputs, result=result)
+            self.monthly['revenue'][i] = result['revenue']
+            self.monthly['total_cost'][i] = result['total_cost']
+            self.monthly['cash_in'][i] = flow['cash_in']
+            self.market_payback[i] = payback_months(
+                payback(result['revenue'], result['total_cost']), flow)
+
+    def payback(self):
+        """payback_data() for the plan from the cached monthly series"""
+        revenue, total_cost = self.monthly['revenue'].sum(axis=0), self.monthly['total_cost'].sum(axis=0)
+        combined = cash_position(self.monthly['cash_in'].sum(axis=0), total_cost, revenue)
+        out = {'Combined': payback_months(payback(revenue, total_cost), combined)}
+        out.update(zip(self.graph.markets, self.market_payback))
+        return out
+
+    def _write(self, changed):
+        graph = self.graph
+        frame = graph.frame()
+        totals = frame.totals()
+        total_rows = [totals[k].tolist() for k in ADDITIVE_METRICS + ('roi',)]
+
+        written = []
+        for i in changed:
+            name = graph.markets[i]
+            path = self.output(f"_{slug(name)}.csv")
+            write_csv(path, market_rows(frame, name, [col[i] for col in total_rows]))
+            written.append(path)
+        files = {graph.markets[i]: self.output(f"_{slug(graph.markets[i])}.csv")
+                 for i in range(len(graph.markets))}
+        for name, path in self.market_files.items():
+            if name not in files and os.path.exists(path):
+                os.remove(path)  # market dropped from the plan
+        self.market_files = files
+
+        # Header, quarter rows and TOTAL (the goal status rows stay in the workbook)
+        path = self.output("_combined.csv")
+        write_csv(path, combined_rows(frame)[:len(frame.periods) + 2])
+        written.append(path)
+
+        markets = [{'name': n, 'ltv': float(ltv)} for n, ltv in zip(graph.markets, graph['ltv'][:, 0])]
+        path = self.output("_summary.json")
+        write_json(path, summary_data({'markets': markets, 'frame': frame,
+                                       'summary': frame.summary(),
+                                       'payback': self.payback()}))
+        written.append(path)
+        return written
+
+    def submit_xlsx(self, pool):
+        """Queue a workbook build, dropping a queued one that has not started"""
+        if self.xlsx_job is not None:
+            self.xlsx_job.cancel()
+        self.xlsx_due = None
+        self.xlsx_job = pool.submit(build_xlsx, self.assumptions, self.output(".xlsx"))
+
+
+# ============================================================
+# WATCH LOOP
+# ============================================================
+def scan(targets, out_dir):
+    """{path: (mtime_ns, size)} for every watched file that exists now"""
+    out_dir = os.path.abspath(out_dir)
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(p for suffix in WATCH_SUFFIXES
+                         for p in glob.glob(os.path.join(target, f"*{suffix}")))
+        elif os.path.exists(target):
+            paths.append(target)
+    stats = {}
+    for path in sorted(set(paths)):
+        if os.path.dirname(os.path.abspath(path)) == out_dir:
+            continue  # our own outputs
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stats[path] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def _report_xlsx(plans, log):
+    for plan in plans.values():
+        job = plan.xlsx_job
+        if job is None or not job.done() or job.cancelled():
+            continue
+        plan.xlsx_job = None
+        try:
+            path, seconds = job.result()
+        except Exception as exc:
+            log(f"  ❌ {plan.path}: workbook failed: {exc}")
+            continue
+        log(f"  ✅ Created: {path} ({1000 * seconds:.0f}ms)")
+
+
+def _poll(targets, out_dir, debounce, plans, seen, pool, once, log):
+    """One pass: refresh changed files, queue due workbooks, report finished ones"""
+    stats = scan(targets, out_dir)
+    for path in [p for p in seen if p not in stats]:
+        del seen[path]
+        plans.pop(path, None)
+        log(f"  {path}: removed (outputs kept)")
+    for path, stamp in stats.items():
+        if seen.get(path) == stamp:
+            continue
+        seen[path] = stamp
+        plan = plans.setdefault(path, WatchedPlan(path, out_dir, debounce))
+        t0 = time.perf_counter()
+        try:
+            recomputed, written = plan.refresh()
+        except (ValueError, KeyError, OSError) as exc:
+            log(f"  ❌ {path}: {exc}")
+            continue
+        if written:
+            log(f"  {path}: {recomputed} of {len(plan.graph.markets)} markets recomputed, "
+                f"{len(written)} files in {1000 * (time.perf_counter() - t0):.0f}ms")
+
+    if pool:
+        now = time.monotonic()
+        for plan in plans.values():
+            if plan.xlsx_due is not None and (once or now >= plan.xlsx_due):
+                plan.submit_xlsx(pool)
+        _report_xlsx(plans, log)
+
+
+def watch(targets, out_dir, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE,
+          xlsx=True, once=False, log=print):
+    """Poll until interrupted (or one pass with once=True, xlsx written right away)"""
+    os.makedirs(out_dir, exist_ok=True)
+    pool = ProcessPoolExecutor(max_workers=1) if xlsx else None
+    plans, seen = {}, {}
+    try:
+        while True:
+            _poll(targets, out_dir, debounce, plans, seen, pool, once, log)
+            if once:
+                if pool:
+                    wait([p.xlsx_job for p in plans.values() if p.xlsx_job])
+                    _report_xlsx(plans, log)
+                return plans
+            time.sleep(interval)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate projection outputs as inputs change")
+    parser.add_argument('targets', nargs='+', help="assumption files (.json/.csv) or folders of them")
+    parser.add_argument('--out-dir', required=True, help="folder for the generated outputs")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between polls (default {DEFAULT_INTERVAL})")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f"quiet seconds before rebuilding the xlsx (default {DEFAULT_DEBOUNCE})")
+    parser.add_argument('--no-xlsx', action='store_true', help="CSV/JSON outputs only")
+    parser.add_argument('--once', action='store_true', help="build every output once and exit")
+    args = parser.parse_args()
+
+    if not args.once:
+        print(f"  Watching {', '.join(args.targets)} → {args.out_dir} (Ctrl-C to stop)")
+    try:
+        watch(args.targets, args.out_dir, args.interval, args.debounce,
+              xlsx=not args.no_xlsx, once=args.once)
+    except KeyboardInterrupt:
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Website Lead Capacity from the Sitemap
+Replaces the guessed max_web (20 Tucson, 35 Denver) and the hand-typed
+website ramp with estimates from the pages the app actually plans.
+
+Reads, for any number of projects at once:
+  JSON exports   the app's /api/projects/[id]/export/json responses (files or folders)
+  Postgres dump  a pg_dump of public.sitemap_nodes (COPY ... FROM stdin block;
+                 a public.projects block in the same file supplies the names)
+                 or a `\\copy sitemap_nodes TO 'nodes.csv' CSV HEADER` file
+
+Each page type has a monthly lead yield at maturity (LEADS_PER_PAGE) and
+every page matures along PAGE_MATURITY (a ramp_curves.py curve over months
+since it went live). Pages go live in cohorts:
+  dated    node metadata 'publish_month' (plan month, 1 = launch) or
+           'published_at' (date; month 1 = the project's first dated page)
+  undated  ROLLOUT: core service/standard pages at launch, location pages
+           the month after, service_location pages ROLLOUT_PACE a month after that
+
+Per project:
+  max_web   sum of every page's mature yield (website leads/month at maturity)
+  ramp_web  website leads per month ÷ max_web, from the cohort counts
+            convolved with the maturity curve (one matrix product for all
+            projects)
+
+Nodes are reduced to integer codes on load; counts are np.bincount over
+(project, month, page type) and nothing loops per project afterwards.
+
+LEADS_PER_PAGE and PAGE_MATURITY are illustrative; calibrate against
+Search Console data for live sites.
+
+Usage:
+  python3 web_capacity.py exports/                           # one row per project
+  python3 web_capacity.py --pg-dump sitemap_nodes.sql --json capacity.json
+  python3 web_capacity.py exports/ --market tucson="Tucson Restoration"
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from projection_engine import resolve_assumptions
+from vector_engine import (MONTHS_PER_QUARTER, scenario_inputs, summary_columns, slug)
+from ramp_curves import compile_curve
+
+PAGE_TYPES = ('standard', 'service', 'location', 'service_location')  # page_type enum order
+LEADS_PER_PAGE = {'standard': 0.0, 'service': 0.6, 'location': 0.4, 'service_location': 0.25}
+PAGE_MATURITY = {'curve': 'logistic', 'midpoint': 16, 'steepness': 0.30}
+ROLLOUT = {'standard': 1, 'service': 1, 'location': 2, 'service_location': 3}
+ROLLOUT_PACE = 20  # undated service_location pages published per month
+UNDATED = -1
+
+
+# ============================================================
+# LOAD
+# ============================================================
+class NodeTable:
+    """One entry per page: project code, page type code, publish info"""
+
+    def __init__(self):
+        self.projects = []
+        self._project_pos = {}
+        self.project, self.page_type, self.plan_month, self.published = [], [], [], []
+
+    def add(self, project, page_type, metadata=None):
+        if page_type not in PAGE_TYPES:
+            raise ValueError(f"unknown page_type {page_type!r} in {project}")
+        code = self._project_pos.setdefault(project, len(self.projects))
+        if code == len(self.projects):
+            self.projects.append(project)
+        metadata = metadata or {}
+        month = metadata.get('publish_month')
+        published = metadata.get('published_at') or metadata.get('publishedAt')
+        self.project.append(code)
+        self.page_type.append(PAGE_TYPES.index(page_type))
+        self.plan_month.append(int(month) if month is not None else UNDATED)
+        self.published.append(_month_ordinal(published) if published else UNDATED)
+
+    def arrays(self):
+        as_int = lambda v: np.asarray(v, dtype=np.int64)
+        return (as_int(self.project), as_int(self.page_type), as_int(self.plan_month),
+                as_int(self.published))
+
+    def __len__(self):
+        return len(self.project)
+
+
+def _month_ordinal(date):
+    """'2026-03-15...' -> months since year 0"""
+    year, month = str(date)[:7].split('-')
+    return int(year) * 12 + int(month) - 1
+
+
+def read_export(path, table):
+    """One /export/json response (with or without the {success, data} wrapper)"""
+    with open(path) as f:
+        body = json.load(f)
+    data = body.get('data', body) if isinstance(body, dict) else body
+    if not isinstance(data, dict) or 'pages' not in data:
+        raise ValueError(f"{path}: not a sitemap JSON export")
+    project = data.get('project_name') or os.path.splitext(os.path.basename(path))[0]
+    for page in data['pages']:
+        meta = dict(page.get('metadata') or {})
+        for key in ('publishMonth', 'publish_month'):
+            if key in page:
+                meta['publish_month'] = page[key]
+        for key in ('publishedAt', 'published_at'):
+            if page.get(key):
+                meta['published_at'] = page[key]
+        table.add(project, page.get('pageType') or page.get('page_type', 'standard'), meta)
+
+
+_COPY = re.compile(r'^COPY\s+(?:public\.)?(\w+)\s*\(([^)]*)\)\s+FROM\s+stdin', re.IGNORECASE)
+_ESCAPE = re.compile(r'\\(.)')
+_ESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '\\': '\\'}
+
+
+def _copy_field(text):
+    """COPY text-format field: \\N is NULL, backslash escapes otherwise"""
+    if text == r'\N':
+        return None
+    if '\\' not in text:
+        return text
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def _copy_blocks(path):
+    """{table: (columns, raw rows)} for the COPY ... FROM stdin blocks of a pg_dump"""
+    blocks, current = {}, None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if current is None:
+                m = _COPY.match(line)
+                if m:
+                    cols = [c.strip().strip('"') for c in m.group(2).split(',')]
+                    current = blocks.setdefault(m.group(1), (cols, []))[1]
+            elif line == '\\.':
+                current = None
+            else:
+                current.append(line.split('\t'))
+    return blocks
+
+
+def _columns(blocks, table, names):
+    """Unescaped values of just the named columns, per row"""
+    cols, raw = blocks[table]
+    idx = [cols.index(n) for n in names]
+    return [[_copy_field(r[i]) for i in idx] for r in raw]
+
+
+def read_pg_dump(path, table):
+    """sitemap_nodes from a plain pg_dump (COPY blocks) or a CSV with a header row"""
+    fields = ('project_id', 'page_type', 'metadata')
+    names = {}
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [[r[k] for k in fields] for r in csv.DictReader(f)]
+    else:
+        blocks = _copy_blocks(path)
+        if 'sitemap_nodes' not in blocks:
+            raise ValueError(f"{path}: no COPY block for sitemap_nodes")
+        rows = _columns(blocks, 'sitemap_nodes', fields)
+        if 'projects' in blocks:
+            names = dict(_columns(blocks, 'projects', ('id', 'name')))
+    for project_id, page_type, meta in rows:
+        table.add(names.get(project_id, project_id), page_type or 'standard',
+                  json.loads(meta) if meta and meta != '{}' else None)
+
+
+def load_nodes(targets=(), pg_dumps=()):
+    table = NodeTable()
+    for target in targets:
+        paths = (sorted(glob.glob(os.path.join(target, '*.json'))) if os.path.isdir(target)
+                 else [target])
+        for path in paths:
+            read_export(path, table)
+    for path in pg_dumps:
+        read_pg_dump(path, table)
+    return table
+
+
+# ============================================================
+# COHORTS & CAPACITY
+# ============================================================
+def publish_months(project, page_type, plan_month, published, n_projects, pace=ROLLOUT_PACE):
+    """Plan month (1-based) each page goes live"""
+    month = plan_month.copy()
+
+    # Dated pages: months after the project's first dated page
+    dated = (month == UNDATED) & (published != UNDATED)
+    first = np.full(n_projects, np.iinfo(np.int64).max)
+    np.minimum.at(first, project[dated], published[dated])
+    month[dated] = published[dated] - first[project[dated]] + 1
+
+    # Undated pages: ROLLOUT start per type, service_location staggered by pace
+    undated = month == UNDATED
+    month[undated] = np.array([ROLLOUT[t] for t in PAGE_TYPES])[page_type[undated]]
+    stagger = undated & (page_type == PAGE_TYPES.index('service_location'))
+    if stagger.any():
+        rows = np.flatnonzero(stagger)
+        rows = rows[np.argsort(project[rows], kind='stable')]
+        groups = project[rows]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+        month[rows] += rank // max(int(pace), 1)
+    return np.maximum(month, 1)
+
+
+def maturity_kernel(horizon, maturity=PAGE_MATURITY):
+    """K[c, t]: share of a page's mature yield in month t if it went live in month c"""
+    curve, _ = compile_curve(maturity, horizon)
+    age = np.arange(horizon)[None, :] - np.arange(horizon)[:, None]
+    return np.where(age >= 0, curve[0][np.clip(age, 0, horizon - 1)], 0.0)
+
+
+def capacity(table, horizon=18, rates=LEADS_PER_PAGE, maturity=PAGE_MATURITY, pace=ROLLOUT_PACE):
+    """
+    {'projects', 'pages' (P, types), 'max_web' (P,), 'web_leads' (P, horizon),
+    'ramp_web' (P, horizon)} for every project in the table
+    """
+    project, page_type, plan_month, published = table.arrays()
+    n, types = len(table.projects), len(PAGE_TYPES)
+    month = publish_months(project, page_type, plan_month, published, n, pace)
+    rate = np.array([rates[t] for t in PAGE_TYPES], dtype=float)
+
+    pages = np.bincount(project * types + page_type, minlength=n * types).reshape(n, types)
+    max_web = pages @ rate
+
+    # Yield going live per (project, month); pages after the horizon never count
+    live = month <= horizon
+    cohorts = np.bincount(project[live] * horizon + month[live] - 1,
+                          weights=rate[page_type[live]], minlength=n * horizon).reshape(n, horizon)
+    web_leads = cohorts @ maturity_kernel(horizon, maturity)
+    ramp_web = np.divide(web_leads, max_web[:, None], out=np.zeros_like(web_leads),
+                         where=max_web[:, None] > 0)
+    return {'projects': list(table.projects), 'pages': pages, 'max_web': max_web,
+            'web_leads': web_leads, 'ramp_web': ramp_web}
+
+
+def quarterly(monthly):
+    """(..., months) -> (..., quarters) averages, like the Assumptions ramp table"""
+    monthly = np.asarray(monthly)
+    return monthly.reshape(monthly.shape[:-1] + (-1, MONTHS_PER_QUARTER)).mean(axis=-1)
+
+
+def market_overrides(result, market, project):
+    """scenario_inputs overrides that give `market` the project's website capacity"""
+    i = result['projects'].index(project)
+    return [(f"{slug(market)}.max_web", float(result['max_web'][i])),
+            (f"{slug(market)}.ramp_web", result['ramp_web'][i])]
+
+
+# ============================================================
+# MAIN
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="Website lead capacity from sitemap page inventories")
+    parser.add_argument('targets', nargs='*', help="JSON exports and/or folders of them")
+    parser.add_argument('--pg-dump', action='append', default=[],
+                        help="pg_dump (or CSV) of sitemap_nodes; repeatable")
+    parser.add_argument('--horizon', type=int, default=None, help="months (default: the v2 horizon)")
+    parser.add_argument('--pace', type=int, default=ROLLOUT_PACE,
+                        help="undated service_location pages published per month")
+    parser.add_argument('--market', action='append', default=[], metavar='MARKET=PROJECT',
+                        help="show the v2 projection with this project's website capacity")
+    parser.add_argument('--json', help="write per-project capacity and ramps to this file")
+    args = parser.parse_args()
+    if not args.targets and not args.pg_dump:
+        parser.error("give JSON exports and/or --pg-dump")
+
+    general, ramps, markets = resolve_assumptions()
+    horizon = args.horizon or len(ramps) * MONTHS_PER_QUARTER
+
+    t0 = time.perf_counter()
+    try:
+        table = load_nodes(args.targets, args.pg_dump)
+        result = capacity(table, horizon, pace=args.pace)
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - t0
+
+    ramp_q = quarterly(result['ramp_web'][:, :horizon - horizon % MONTHS_PER_QUARTER])
+    print(f"  {'Project':30s}" + "".join(f"{t[:8]:>9s}" for t in PAGE_TYPES)
+          + f"{'max_web':>9s}   web ramp by quarter")
+    for i, name in enumerate(result['projects'][:50]):
+        print(f"  {name[:30]:30s}" + "".join(f"{c:9d}" for c in result['pages'][i])
+              + f"{result['max_web'][i]:9.1f}   " + " ".join(f"{r:4.0%}" for r in ramp_q[i]))
+    if len(result['projects']) > 50:
+        print(f"  … {len(result['projects']) - 50:,} more")
+    print(f"  {len(table):,} pages across {len(result['projects']):,} projects in {elapsed:.2f}s")
+
+    overrides = []
+    for pair in args.market:
+        market, _, project = pair.partition('=')
+        if project not in result['projects']:
+            parser.error(f"no project {project!r} in the inputs")
+        overrides += market_overrides(result, market, project)
+    if overrides:
+        before = summary_columns(scenario_inputs(markets, general, ramps, []), 1)
+        after = summary_columns(scenario_inputs(markets, general, ramps, overrides), 1)
+        print()
+        print(f"  Q6 monthly revenue: ${before['q6_monthly'][0]:,.0f} (v2 guess) → "
+              f"${after['q6_monthly'][0]:,.0f} (from the sitemap)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([{'project': name, 'pages': dict(zip(PAGE_TYPES, result['pages'][i].tolist())),
+                        'max_web': round(float(result['max_web'][i]), 2),
+                        'ramp_web_monthly': result['ramp_web'][i].round(4).tolist(),
+                        'ramp_web_quarterly': ramp_q[i].round(4).tolist()}
+                       for i, name in enumerate(result['projects'])], f, indent=2)
+        print(f"✅ Created: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
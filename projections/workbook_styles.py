@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Workbook Styles
+The Conservative v2 look (fills, borders, number formats) and the small
+helpers every projection tab uses, shared by create_conservative_v2.py and
+the analysis tools that add tabs of their own.
+"""
+
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+# ============================================================
+# STYLES
+# ============================================================
+header_font = Font(bold=True, color="FFFFFF", size=11)
+header_fill = PatternFill(start_color="2F5496", end_color="2F5496", fill_type="solid")
+section_fill = PatternFill(start_color="D6E4F0", end_color="D6E4F0", fill_type="solid")
+total_fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
+goal_met_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+goal_miss_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+ramp_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
+input_fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
+
+thin_border = Border(
+    left=Side(style='thin'), right=Side(style='thin'),
+    top=Side(style='thin'), bottom=Side(style='thin')
+)
+
+money_fmt = '"$"#,##0'
+pct_fmt = '0%'
+decimal_fmt = '#,##0.0'
+roi_fmt = '0.0"x"'
+
+def style_header(ws, row=1):
+    for cell in ws[row]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        cell.border = thin_border
+
+def apply_borders(ws, start_row=2):
+    for row in ws.iter_rows(min_row=start_row, max_row=ws.max_row):
+        for cell in row:
+            cell.border = thin_border
+
+def auto_width(ws, min_w=14):
+    for col in ws.columns:
+        max_len = 0
+        col_letter = col[0].column_letter
+        for cell in col:
+            try:
+                if cell.value:
+                    max_len = max(max_len, len(str(cell.value)))
+            except:
+                pass
+        ws.column_dimensions[col_letter].width = max(min_w, min(max_len + 3, 30))
@@ -0,0 +1,169 @@
+-- =====================================================
+-- PROJECTIONS
+-- =====================================================
+-- Engine results for a project, loaded by projections/pg_loader.py with
+-- COPY. A scenario is one loaded result set: a single plan (one row) or a
+-- scenario grid sweep (one row per grid scenario). Values are stored long:
+-- one row per (scenario row, metric, market, period), with market 0 =
+-- Combined and period 0 = the whole projection.
+
+-- Create projection_scenario_kind enum
+DO $$ BEGIN
+  CREATE TYPE projection_scenario_kind AS ENUM ('plan', 'grid');
+EXCEPTION
+  WHEN duplicate_object THEN null;
+END $$;
+
+-- Create projection_scenarios table
+CREATE TABLE IF NOT EXISTS public.projection_scenarios (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  project_id UUID NOT NULL REFERENCES public.projects(id) ON DELETE CASCADE,
+  name VARCHAR(255) NOT NULL,
+  kind projection_scenario_kind NOT NULL DEFAULT 'plan',
+  spec JSONB NOT NULL DEFAULT '{}',
+  fingerprint VARCHAR(64),
+  row_count BIGINT NOT NULL DEFAULT 0,
+  value_count BIGINT NOT NULL DEFAULT 0,
+  loaded_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ,
+  UNIQUE (project_id, name)
+);
+
+-- Create projection_markets table
+CREATE TABLE IF NOT EXISTS public.projection_markets (
+  scenario_id UUID NOT NULL REFERENCES public.projection_scenarios(id) ON DELETE CASCADE,
+  position SMALLINT NOT NULL,
+  name VARCHAR(255) NOT NULL,
+  PRIMARY KEY (scenario_id, position)
+);
+
+-- Create projection_periods table
+CREATE TABLE IF NOT EXISTS public.projection_periods (
+  scenario_id UUID NOT NULL REFERENCES public.projection_scenarios(id) ON DELETE CASCADE,
+  position SMALLINT NOT NULL,
+  label VARCHAR(50) NOT NULL,
+  months VARCHAR(50),
+  PRIMARY KEY (scenario_id, position)
+);
+
+-- Create projection_metrics table
+CREATE TABLE IF NOT EXISTS public.projection_metrics (
+  id SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  name VARCHAR(100) UNIQUE NOT NULL
+);
+
+-- Create projection_values table
+CREATE TABLE IF NOT EXISTS public.projection_values (
+  scenario_id UUID NOT NULL REFERENCES public.projection_scenarios(id) ON DELETE CASCADE,
+  scenario_row BIGINT NOT NULL,
+  metric_id SMALLINT NOT NULL REFERENCES public.projection_metrics(id),
+  market SMALLINT NOT NULL,
+  period SMALLINT NOT NULL,
+  value DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (scenario_id, scenario_row, metric_id, market, period)
+);
+
+-- Indexes for projection tables
+CREATE INDEX IF NOT EXISTS projection_scenarios_project_id_idx ON public.projection_scenarios(project_id);
+CREATE INDEX IF NOT EXISTS projection_values_metric_idx ON public.projection_values(scenario_id, metric_id, market, period);
+
+-- Enable RLS
+ALTER TABLE public.projection_scenarios ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.projection_markets ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.projection_periods ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.projection_metrics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.projection_values ENABLE ROW LEVEL SECURITY;
+
+-- Create updated_at trigger for projection_scenarios
+CREATE TRIGGER handle_projection_scenarios_updated_at
+  BEFORE UPDATE ON public.projection_scenarios
+  FOR EACH ROW
+  EXECUTE FUNCTION public.handle_updated_at();
+
+-- =====================================================
+-- PROJECTION POLICIES
+-- =====================================================
+-- Results are written by the loader (service role); users read the results
+-- of their own projects and may delete them.
+
+-- Users can view projection scenarios in their own projects
+CREATE POLICY "Users can view projection scenarios in own projects"
+  ON public.projection_scenarios
+  FOR SELECT
+  USING (
+    EXISTS (
+      SELECT 1 FROM public.projects
+      WHERE id = projection_scenarios.project_id
+      AND created_by = auth.uid()
+    )
+  );
+
+-- Users can delete projection scenarios in their own projects
+CREATE POLICY "Users can delete projection scenarios in own projects"
+  ON public.projection_scenarios
+  FOR DELETE
+  USING (
+    EXISTS (
+      SELECT 1 FROM public.projects
+      WHERE id = projection_scenarios.project_id
+      AND created_by = auth.uid()
+    )
+  );
+
+-- Users can view markets of their own projection scenarios
+CREATE POLICY "Users can view projection markets in own projects"
+  ON public.projection_markets
+  FOR SELECT
+  USING (
+    EXISTS (
+      SELECT 1 FROM public.projection_scenarios s
+      JOIN public.projects p ON p.id = s.project_id
+      WHERE s.id = projection_markets.scenario_id
+      AND p.created_by = auth.uid()
+    )
+  );
+
+-- Users can view periods of their own projection scenarios
+CREATE POLICY "Users can view projection periods in own projects"
+  ON public.projection_periods
+  FOR SELECT
+  USING (
+    EXISTS (
+      SELECT 1 FROM public.projection_scenarios s
+      JOIN public.projects p ON p.id = s.project_id
+      WHERE s.id = projection_periods.scenario_id
+      AND p.created_by = auth.uid()
+    )
+  );
+
+-- Anyone authenticated can view metric names
+CREATE POLICY "Anyone can view projection metrics"
+  ON public.projection_metrics
+  FOR SELECT
+  USING (auth.uid() IS NOT NULL);
+
+-- Users can view values of their own projection scenarios
+CREATE POLICY "Users can view projection values in own projects"
+  ON public.projection_values
+  FOR SELECT
+  USING (
+    EXISTS (
+      SELECT 1 FROM public.projection_scenarios s
+      JOIN public.projects p ON p.id = s.project_id
+      WHERE s.id = projection_values.scenario_id
+      AND p.created_by = auth.uid()
+    )
+  );
+
+-- Comments for documentation
+COMMENT ON TABLE public.projection_scenarios IS 'Loaded projection result sets (a plan or a scenario grid) per project';
+COMMENT ON COLUMN public.projection_scenarios.kind IS 'Kind: plan (one row) or grid (one row per grid scenario)';
+COMMENT ON COLUMN public.projection_scenarios.spec IS 'Assumptions (plan) or grid meta with axes (grid) as JSONB';
+COMMENT ON COLUMN public.projection_scenarios.fingerprint IS 'Hash of the loaded inputs; an unchanged reload is skipped';
+COMMENT ON COLUMN public.projection_scenarios.loaded_at IS 'Set when a load commits; NULL while none has';
+COMMENT ON TABLE public.projection_markets IS 'Market names by position; position 0 is Combined';
+COMMENT ON TABLE public.projection_periods IS 'Period labels by position; position 0 is the whole projection';
+COMMENT ON TABLE public.projection_metrics IS 'Metric names (revenue, roi, payback_month, ...)';
+COMMENT ON TABLE public.projection_values IS 'One value per scenario row, metric, market and period';
+COMMENT ON COLUMN public.projection_values.scenario_row IS 'Grid scenario number (0 for a plan)';
@@ -18,6 +18,7 @@ export type UserRole = 'user' | 'admin'
 export type ProjectStatus = 'draft' | 'crawled' | 'compared' | 'finalized' | 'archived'
 export type PageType = 'standard' | 'service' | 'location' | 'service_location'
 export type NodeSource = 'template' | 'client'
+export type ProjectionScenarioKind = 'plan' | 'grid'
 
 // =====================================================
 // TABLE TYPES
@@ -178,12 +179,131 @@ export interface Database {
           updated_at?: string | null
         }
       }
+      projection_scenarios: {
+        Row: {
+          id: string
+          project_id: string
+          name: string
+          kind: ProjectionScenarioKind
+          spec: Json
+          fingerprint: string | null
+          row_count: number
+          value_count: number
+          loaded_at: string | null
+          created_at: string
+          updated_at: string | null
+        }
+        Insert: {
+          id?: string
+          project_id: string
+          name: string
+          kind?: ProjectionScenarioKind
+          spec?: Json
+          fingerprint?: string | null
+          row_count?: number
+          value_count?: number
+          loaded_at?: string | null
+          created_at?: string
+          updated_at?: string | null
+        }
+        Update: {
+          id?: string
+          project_id?: string
+          name?: string
+          kind?: ProjectionScenarioKind
+          spec?: Json
+          fingerprint?: string | null
+          row_count?: number
+          value_count?: number
+          loaded_at?: string | null
+          created_at?: string
+          updated_at?: string | null
+        }
+      }
+      projection_markets: {
+        Row: {
+          scenario_id: string
+          position: number
+          name: string
+        }
+        Insert: {
+          scenario_id: string
+          position: number
+          name: string
+        }
+        Update: {
+          scenario_id?: string
+          position?: number
+          name?: string
+        }
+      }
+      projection_periods: {
+        Row: {
+          scenario_id: string
+          position: number
+          label: string
+          months: string | null
+        }
+        Insert: {
+          scenario_id: string
+          position: number
+          label: string
+          months?: string | null
+        }
+        Update: {
+          scenario_id?: string
+          position?: number
+          label?: string
+          months?: string | null
+        }
+      }
+      projection_metrics: {
+        Row: {
+          id: number
+          name: string
+        }
+        Insert: {
+          id?: number
+          name: string
+        }
+        Update: {
+          id?: number
+          name?: string
+        }
+      }
+      projection_values: {
+        Row: {
+          scenario_id: string
+          scenario_row: number
+          metric_id: number
+          market: number
+          period: number
+          value: number
+        }
+        Insert: {
+          scenario_id: string
+          scenario_row: number
+          metric_id: number
+          market: number
+          period: number
+          value: number
+        }
+        Update: {
+          scenario_id?: string
+          scenario_row?: number
+          metric_id?: number
+          market?: number
+          period?: number
+          value?: number
+        }
+      }
     }
     Enums: {
       user_role: UserRole
       project_status: ProjectStatus
       page_type: PageType
       node_source: NodeSource
+      projection_scenario_kind: ProjectionScenarioKind
     }
   }
 }
@@ -250,6 +370,12 @@ export type SitemapNode = Database['public']['Tables']['sitemap_nodes']['Row']
 export type SitemapNodeInsert = Database['public']['Tables']['sitemap_nodes']['Insert']
 export type SitemapNodeUpdate = Database['public']['Tables']['sitemap_nodes']['Update']
 
+export type ProjectionScenario = Database['public']['Tables']['projection_scenarios']['Row']
+export type ProjectionMarket = Database['public']['Tables']['projection_markets']['Row']
+export type ProjectionPeriod = Database['public']['Tables']['projection_periods']['Row']
+export type ProjectionMetric = Database['public']['Tables']['projection_metrics']['Row']
+export type ProjectionValue = Database['public']['Tables']['projection_values']['Row']
+
 // =====================================================
 // COMPARISON RESULT TYPES
 // =====================================================